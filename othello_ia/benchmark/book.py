@@ -0,0 +1,52 @@
+'''
+Book
+
+Time of the opening book lookups against the search
+of the same positions
+'''
+
+import time
+
+def measure_lookup(book, bitboards):
+  '''
+  Time the lookups of many positions
+
+  Params:
+    book      : OpeningBook instance
+    bitboards : List of tuples ( own, opp )
+
+  Return:
+    Microseconds per lookup
+  '''
+
+  start = time.time()
+
+  for own, opp in bitboards:
+    book.lookup( own, opp )
+
+  return ( time.time() - start ) * 1e6 / max( len( bitboards ), 1 )
+
+def measure_play(bot, boards):
+  '''
+  Time the play of many positions
+
+  Params:
+    bot    : DunkBot instance
+    boards : List of tuples ( board, color )
+
+  Return:
+    List of tuples ( move, seconds, book ), one for each
+    position, book is True when the move came from the book
+  '''
+
+  results = []
+
+  for board, color in boards:
+    start = time.time()
+    move = tuple( bot.play( board, color ) )
+    seconds = time.time() - start
+
+    book_move = bool( bot.search_report ) and bot.search_report[0]["depth"] == 0
+    results.append( ( move, seconds, book_move ) )
+
+  return results
@@ -0,0 +1,167 @@
+'''
+Counts
+
+Disc counts kept on each movement against counting the
+whole board. The score of the game screen is read on
+every frame, and the empty squares of the search board
+on every leaf of the pattern evaluation
+'''
+
+import random
+import time
+
+from dunk_bot import bitboard
+
+def scan_score(bot, board):
+  '''
+  Score of a board looping over the 64 squares,
+  as count_board_score did before the counts
+
+  Params:
+    bot   : DunkBot instance
+    board : Board array
+
+  Return:
+    Tuple ( score_black, score_white )
+  '''
+
+  score_black = 0
+  score_white = 0
+
+  for place in board:
+    if place == bot.BLACK:
+      score_black += 1
+    elif place == bot.WHITE:
+      score_white += 1
+
+  return score_black, score_white
+
+def verify_counts(bot, board, games, seed = 0):
+  '''
+  Play random games keeping a BoardState and a search
+  board, checking their counts against the board on
+  each movement
+
+  Params:
+    bot   : DunkBot instance
+    board : Start board array
+    games : Amount of games
+    seed  : Seed of the random movements
+
+  Defaults:
+    seed  : 0
+
+  Return:
+    Amount of movements with wrong counts
+  '''
+
+  rng = random.Random( seed )
+  failures = 0
+
+  for _ in xrange( games ):
+    game_board = board.copy()
+    state = bot.create_board_state( game_board )
+    search_board = bitboard.SearchBoard( *bot.create_bitboard( game_board ) )
+
+    color = bot.BLACK
+    passes = 0
+
+    while passes < 2:
+      moves = bot.list_moves( game_board, color )
+
+      if moves.size == 0:
+        passes += 1
+      else:
+        passes = 0
+
+        move = moves[ rng.randrange( len( moves ) ) ]
+        own, opp = bot.create_bitboard( game_board )
+
+        if color == bot.WHITE:
+          own, opp = opp, own
+
+        square = int( move[0] + move[1] * 8 )
+        search_board.play( square, bitboard.get_flips( own, opp, square ), color == bot.BLACK )
+
+        bot.set_color_position( game_board, move, color, state )
+
+        black, white = scan_score( bot, game_board )
+
+        if ( black, white ) != state.score() or state.empties != 64 - black - white:
+          failures += 1
+        elif sorted( state.empty_squares ) != [ idx for idx, place in enumerate( game_board ) if place == bot.EMPTY ]:
+          failures += 1
+        elif search_board.empties != 64 - black - white:
+          failures += 1
+
+      color = bot.opposity_color( color )
+
+    # Undo the whole game on the search board
+    while search_board.ply:
+      search_board.undo()
+
+    if search_board.empties != 64 - bitboard.count( search_board.black | search_board.white ):
+      failures += 1
+
+  return failures
+
+def time_call(function, repeat):
+  '''
+  Mean time of a call
+
+  Params:
+    function : Function without arguments
+    repeat   : Amount of calls
+
+  Return:
+    Seconds of each call
+  '''
+
+  start = time.time()
+
+  for _ in xrange( repeat ):
+    function()
+
+  return ( time.time() - start ) / repeat
+
+def measure_frame(bot, board, repeat):
+  '''
+  Time of the score of a frame
+
+  Params:
+    bot    : DunkBot instance
+    board  : Board array
+    repeat : Amount of calls of each way
+
+  Return:
+    Dictionary with the seconds of a scan, of the
+    numpy count and of the BoardState
+  '''
+
+  state = bot.create_board_state( board )
+
+  return {
+    "scan": time_call( lambda: scan_score( bot, board ), repeat ),
+    "numpy": time_call( lambda: bot.count_board_score( board ), repeat ),
+    "state": time_call( lambda: bot.count_board_score( board, state ), repeat )
+  }
+
+def measure_node(board, repeat):
+  '''
+  Time of reading the empty squares on a leaf
+
+  Params:
+    board  : bitboard.SearchBoard
+    repeat : Amount of reads of each way
+
+  Return:
+    Dictionary with the seconds of a popcount and
+    of the kept amount
+  '''
+
+  count = bitboard.count
+
+  return {
+    "popcount": time_call( lambda: 64 - count( board.black | board.white ), repeat ),
+    "kept": time_call( lambda: board.empties, repeat )
+  }
@@ -0,0 +1,72 @@
+'''
+Endgame
+
+Solves the endgame positions of the corpus with the
+EndgameSolver on both modes. Positions with few empties
+are checked against a plain negamax without pruning
+'''
+
+import time
+
+from dunk_bot import bitboard
+from dunk_bot.endgame import EndgameSolver, final_score
+
+# Max amount of empties checked with the reference search
+REFERENCE_EMPTIES = 9
+
+def reference_solve(own, opp, passed = False):
+  '''
+  Negamax search until the end of the game, without
+  pruning nor ordering
+
+  Params:
+    own    : Bitboard of the color to play
+    opp    : Bitboard of the opposity color
+    passed : True if the last movement was a pass
+
+  Return:
+    Final disc difference from the view of own
+  '''
+
+  moves = bitboard.get_moves( own, opp )
+
+  if not moves:
+    if passed:
+      return final_score( own, opp )
+
+    return -reference_solve( opp, own, True )
+
+  best_value = -65
+
+  for square in bitboard.iter_squares( moves ):
+    flips = bitboard.get_flips( own, opp, square )
+    best_value = max( best_value, -reference_solve( opp & ~flips, own | flips | ( 1 << square ) ) )
+
+  return best_value
+
+def measure(own, opp, mode):
+  '''
+  Solve a position
+
+  Params:
+    own  : Bitboard of the color to play
+    opp  : Bitboard of the opposity color
+    mode : Mode of the solver
+
+  Return:
+    Dictionary with the value, move, nodes and time
+  '''
+
+  solver = EndgameSolver( mode )
+
+  start = time.time()
+  value, move = solver.solve( own, opp )
+  seconds = time.time() - start
+
+  return {
+    "value": value,
+    "move": move,
+    "nodes": solver.nodes,
+    "time": seconds,
+    "rate": solver.nodes / seconds if seconds else 0.0
+  }
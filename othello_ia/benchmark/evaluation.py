@@ -0,0 +1,152 @@
+'''
+Evaluation
+
+Cost per board of the evaluators when the boards are
+evaluated one by one and in batches of several sizes,
+cost of each term of the FeatureEvaluator and a check
+of the stable pieces
+'''
+
+import random
+import time
+
+import numpy as np
+
+from dunk_bot import bitboard
+from dunk_bot.evaluation import FeatureEvaluator, get_stable
+
+def measure(evaluator, black, white, batch_size, repeat = 5):
+  '''
+  Evaluate all boards in batches of a fixed size
+
+  Params:
+    evaluator  : Evaluator instance
+    black      : Array of uint64 black bitboards
+    white      : Array of uint64 white bitboards
+    batch_size : Amount of boards on each batch
+    repeat     : Amount of times all boards are evaluated
+
+  Defaults:
+    repeat     : 5
+
+  Return:
+    Microseconds used by each board
+  '''
+
+  amount = len( black ) - len( black ) % batch_size
+
+  start = time.time()
+
+  for _ in xrange( repeat ):
+    for idx in xrange( 0, amount, batch_size ):
+      evaluator.evaluate_bitboards( black[ idx:idx + batch_size ], white[ idx:idx + batch_size ] )
+
+  return ( time.time() - start ) * 1e6 / ( amount * repeat )
+
+def measure_search(bot, boards):
+  '''
+  Search a list of positions
+
+  Params:
+    bot    : DunkBot instance
+    boards : List of tuples ( board, color )
+
+  Return:
+    A tuple with two values:
+      nodes : Amount of searched nodes
+      time  : Seconds used by the searches
+  '''
+
+  nodes = 0
+  start = time.time()
+
+  for board, color in boards:
+    bot.play( board, color )
+    nodes += bot.nodes
+
+  return nodes, time.time() - start
+
+def measure_terms(weights, black, white, batch_size):
+  '''
+  Cost of each term of a FeatureEvaluator, evaluated alone
+
+  Params:
+    weights    : Dictionary with the weights of all terms
+    black      : Array of uint64 black bitboards
+    white      : Array of uint64 white bitboards
+    batch_size : Amount of boards on each batch
+
+  Return:
+    List of tuples ( term, microseconds per board )
+  '''
+
+  results = []
+
+  for term in ( "position", ) + FeatureEvaluator.TERMS:
+    term_weights = { "phases": weights.get( "phases", 1 ), "weights": {} }
+
+    if term == "position":
+      term_weights["position"] = weights["position"]
+    else:
+      term_weights["weights"][ term ] = weights["weights"][ term ]
+
+    results.append( ( term, measure( FeatureEvaluator( term_weights ), black, white, batch_size ) ) )
+
+  return results
+
+def verify_stable(bitboards, games, seed = 0):
+  '''
+  Play random games from many boards, checking that
+  the stable pieces never change of color
+
+  Params:
+    bitboards : List of tuples ( black, white ), black
+                plays first
+    games     : Amount of random games from each board
+    seed      : Seed of the random movements
+
+  Defaults:
+    seed      : 0
+
+  Return:
+    A tuple with two values:
+      stable     : Amount of stable pieces found
+      violations : Amount of games where a stable
+                   piece was flipped
+  '''
+
+  generator = random.Random( seed )
+
+  stable = 0
+  violations = 0
+
+  for black, white in bitboards:
+    stable_black = int( get_stable( [ black ], [ white ] )[0] )
+    stable_white = int( get_stable( [ white ], [ black ] )[0] )
+
+    stable += bitboard.count( stable_black ) + bitboard.count( stable_white )
+
+    for game in xrange( games ):
+      own, opp = black, white
+      own_stable, opp_stable = stable_black, stable_white
+      passes = 0
+
+      while passes < 2:
+        moves = bitboard.get_moves( own, opp )
+
+        if moves:
+          passes = 0
+          square = generator.choice( list( bitboard.iter_squares( moves ) ) )
+          flips = bitboard.get_flips( own, opp, square )
+          own, opp = own | flips | ( 1 << square ), opp & ~flips
+
+          if opp_stable & ~opp:
+            violations += 1
+            break
+        else:
+          passes += 1
+
+        own, opp = opp, own
+        own_stable, opp_stable = opp_stable, own_stable
+
+  return stable, violations
@@ -0,0 +1,177 @@
+'''
+Expand
+
+Compares the children created by the original expansion,
+one child for each ( piece, direction ) pair that reaches
+an empty square, with the current DunkBot.expand, one
+child for each legal square
+'''
+
+import time
+
+from movegen import reference_play
+
+def count_children(bot, board, color):
+  '''
+  Count the children created by the original expansion
+  and the unique squares they play
+
+  Params:
+    bot   : DunkBot instance
+    board : Board array
+    color : Color to expand
+
+  Return:
+    A tuple with two values:
+      generated : Amount of ( piece, direction ) children
+      unique    : Amount of distinct legal squares
+  '''
+
+  color = bot.transform_color( color )
+  generated = 0
+  unique = set()
+
+  for base_position in bot.get_color_positions( board, color ):
+    for action in bot.ACTIONS:
+
+      valid, final_position = bot.execute_action(
+        base_position = base_position,
+        board = board,
+        action = action,
+        current_color = color
+      )
+
+      if valid:
+        generated += 1
+        unique.add( tuple( final_position ) )
+
+  return generated, len( unique )
+
+def legacy_expand(bot, board, color):
+  '''
+  Original expansion, copying and changing the
+  board array for every ( piece, direction ) pair
+
+  Params:
+    bot   : DunkBot instance
+    board : Board array
+    color : Color to expand
+
+  Return:
+    List of children boards
+  '''
+
+  children = []
+
+  for base_position in bot.get_color_positions( board, color ):
+    for action in bot.ACTIONS:
+
+      valid, final_position = bot.execute_action(
+        base_position = base_position,
+        board = board,
+        action = action,
+        current_color = color
+      )
+
+      if valid:
+        new_board = board.copy()
+        reference_play( bot, new_board, tuple( final_position ), color )
+        children.append( new_board )
+
+  return children
+
+def legacy_walk(bot, board, color, depth):
+  '''
+  Count the nodes of the full tree created by
+  the original expansion
+
+  Params:
+    bot   : DunkBot instance
+    board : Board array
+    color : Color to play
+    depth : Depth of the tree
+
+  Return:
+    Amount of nodes created
+  '''
+
+  if depth == 0:
+    return 0
+
+  nodes = 0
+  other_color = bot.opposity_color( color )
+
+  for child in legacy_expand( bot, board, color ):
+    nodes += 1 + legacy_walk( bot, child, other_color, depth - 1 )
+
+  return nodes
+
+def walk(bot, node, color, depth):
+  '''
+  Count the nodes of the full tree created by
+  DunkBot.expand
+
+  Params:
+    bot   : DunkBot instance
+    node  : Node created by DunkBot.create_node
+    color : Color to play
+    depth : Depth of the tree
+
+  Return:
+    Amount of nodes created
+  '''
+
+  if depth == 0:
+    return 0
+
+  nodes = 0
+  other_color = bot.opposity_color( color )
+
+  for child in bot.expand( node, color ):
+    nodes += 1 + walk( bot, child, other_color, depth - 1 )
+
+  return nodes
+
+def measure(bot, board, color, depth):
+  '''
+  Expand the full tree of a position with both expansions
+
+  Params:
+    bot   : DunkBot instance
+    board : Board array
+    color : Color to play
+    depth : Depth of the tree
+
+  Return:
+    Dictionary with the children counts of the position,
+    the tree sizes, times and nodes per second of each expansion
+  '''
+
+  color = bot.transform_color( color )
+  generated, unique = count_children( bot, board, color )
+
+  start = time.time()
+  legacy_nodes = legacy_walk( bot, board, color, depth )
+  legacy_time = time.time() - start
+
+  root_node = bot.create_node(
+    board = bot.create_bitboard( board ),
+    parent = None,
+    action = None,
+    move = None
+  )
+
+  start = time.time()
+  nodes = walk( bot, root_node, color, depth )
+  new_time = time.time() - start
+
+  return {
+    "generated": generated,
+    "unique": unique,
+    "legacy_nodes": legacy_nodes,
+    "legacy_time": legacy_time,
+    "legacy_rate": legacy_nodes / legacy_time if legacy_time else 0.0,
+    "nodes": nodes,
+    "time": new_time,
+    "rate": nodes / new_time if new_time else 0.0
+  }
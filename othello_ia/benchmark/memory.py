@@ -0,0 +1,176 @@
+'''
+Memory
+
+Peak memory of the search with a board copy on every
+node, as done by the original search over DunkBot.expand,
+against the make/unmake search on a single SearchBoard
+
+Uses tracemalloc when the interpreter has it. Without it
+the amount of live objects tracked by the garbage collector
+is sampled while the search runs
+'''
+
+import gc
+
+try:
+  import tracemalloc
+except ImportError:
+  tracemalloc = None
+
+# Nodes between two samples of the live objects
+SAMPLE_NODES = 32
+
+class Sampler(object):
+  """
+  Sampler
+
+  Keeps the peak of the memory used by a search
+  """
+
+  def __init__(self):
+    self.nodes = 0
+    self.base = 0
+    self.peak = 0
+
+  def start(self):
+    '''
+    Start the measurement
+    '''
+
+    gc.collect()
+    self.nodes = 0
+
+    if tracemalloc is not None:
+      tracemalloc.start()
+      self.base = tracemalloc.get_traced_memory()[0]
+    else:
+      self.base = len( gc.get_objects() )
+
+    self.peak = self.base
+
+  def sample(self):
+    '''
+    Count a node, sampling the used memory
+    '''
+
+    self.nodes += 1
+
+    if tracemalloc is None and not self.nodes % SAMPLE_NODES:
+      self.peak = max( self.peak, len( gc.get_objects() ) )
+
+  def stop(self):
+    '''
+    Stop the measurement
+
+    Return:
+      Peak of bytes allocated with tracemalloc, or peak
+      of live objects otherwise, above the start
+    '''
+
+    if tracemalloc is not None:
+      self.peak = tracemalloc.get_traced_memory()[1]
+      tracemalloc.stop()
+
+    return self.peak - self.base
+
+def unit():
+  '''
+  Unit of the values measured by the Sampler
+  '''
+
+  return "bytes" if tracemalloc is not None else "live objects"
+
+def copy_search(bot, node, color, depth, alpha, beta, maximize, sampler):
+  '''
+  Alpha-Beta search creating a node with a board copy for
+  each child, as the original DunkBot search
+
+  Params:
+    bot      : DunkBot instance
+    node     : Node created by DunkBot.create_node
+    color    : Color to play
+    depth    : Max depth of the search
+    alpha    : The best Max Value
+    beta     : The best Min Value
+    maximize : True on Max nodes
+    sampler  : Sampler measuring the search
+
+  Return:
+    Value of the node
+  '''
+
+  sampler.sample()
+
+  if node["depth"] == depth:
+    return node["score"]
+
+  expand_list = bot.expand( node, color )
+  expand_list.sort( key=lambda node: node["score"], reverse=maximize )
+
+  other_color = bot.opposity_color( color )
+
+  for child_node in expand_list:
+    value = copy_search( bot, child_node, other_color, depth, alpha, beta, not maximize, sampler )
+
+    if maximize:
+      alpha = max( alpha, value )
+    else:
+      beta = min( beta, value )
+
+    if alpha >= beta:
+      break
+
+  return alpha if maximize else beta
+
+def measure(bot, board, color, depth):
+  '''
+  Measure the peak memory of both searches on a position
+
+  Params:
+    bot   : DunkBot instance, without transposition table
+    board : Board array
+    color : Color to play
+    depth : Depth of the search
+
+  Return:
+    Dictionary with the peak memory and nodes of each search
+  '''
+
+  color = bot.transform_color( color )
+  sampler = Sampler()
+
+  root_node = bot.create_node(
+    board = bot.create_bitboard( board ),
+    parent = None,
+    action = None,
+    move = None
+  )
+
+  sampler.start()
+  copy_search( bot, root_node, color, depth, float("-inf"), float("inf"), True, sampler )
+  copy_peak = sampler.stop()
+  copy_nodes = sampler.nodes
+
+  # Sample on each node counted by the bot
+  count_node = bot.count_node
+
+  def sampled_count_node():
+    sampler.sample()
+    count_node()
+
+  bot.count_node = sampled_count_node
+  bot.max_depth = depth
+
+  try:
+    sampler.start()
+    bot.select_move( root_node, color )
+    peak = sampler.stop()
+  finally:
+    del bot.count_node
+
+  return {
+    "copy_peak": copy_peak,
+    "copy_nodes": copy_nodes,
+    "peak": peak,
+    "nodes": sampler.nodes
+  }
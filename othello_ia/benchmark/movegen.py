@@ -0,0 +1,207 @@
+'''
+Move Generation
+
+Checks the bitboard move generation of DunkBot against
+the original board array implementation, which walks the
+board square by square
+'''
+
+import random
+import time
+
+import numpy as np
+
+def reference_moves(bot, board, color):
+  '''
+  List the movements of a color walking each piece
+  of that color on each direction
+
+  Params:
+    bot   : DunkBot instance
+    board : Board array
+    color : Color to list the movements
+
+  Return:
+    Set of ( x, y ) movements
+  '''
+
+  color = bot.transform_color( color )
+  moves = set()
+
+  for base_position in bot.get_color_positions( board, color ):
+    for action in bot.ACTIONS:
+
+      valid, final_position = bot.execute_action(
+        base_position = base_position,
+        board = board,
+        action = action,
+        current_color = color
+      )
+
+      if valid:
+        moves.add( tuple( final_position ) )
+
+  return moves
+
+def reference_play(bot, board, position, color):
+  '''
+  Place a piece and change the pieces on all directions,
+  walking the board array square by square
+
+  Params:
+    bot      : DunkBot instance
+    board    : Board where the pieces will be changed
+    position : Position where the piece is placed
+    color    : Color to be setted on the board
+  '''
+
+  for action in bot.ACTIONS:
+
+    test_position = np.array( position ) + action
+    cover = False
+
+    while True:
+      try:
+        local_state = bot.get_value( board, *test_position )
+
+        if local_state == color:
+
+          if cover:
+            bot.set_color_direction(
+              board = board,
+              base_position = np.array( position ),
+              final_position = test_position,
+              action = action,
+              color = color
+            )
+
+          break
+
+        elif local_state == bot.EMPTY:
+          break
+
+        cover = True
+        test_position += action
+
+      except IndexError, e:
+        break
+
+  bot.set_value( board, position[0], position[1], color )
+
+def random_positions(bot, games, seed = 0):
+  '''
+  Create positions by playing random games
+
+  Params:
+    bot   : DunkBot instance
+    games : Amount of random games
+    seed  : Seed of the random generator
+
+  Defaults:
+    seed  : 0
+
+  Return:
+    Generator of tuples ( board, color ), one for
+    each ply of each game
+  '''
+
+  generator = random.Random( seed )
+
+  start = np.array( [ bot.EMPTY ] * 64 )
+  start[ [ 27, 36 ] ] = bot.WHITE
+  start[ [ 28, 35 ] ] = bot.BLACK
+
+  for game in xrange( games ):
+    board = start.copy()
+    color = bot.BLACK
+    passes = 0
+
+    while passes < 2:
+      yield board.copy(), color
+
+      moves = bot.list_moves( board, color )
+
+      if moves.size == 0:
+        passes += 1
+      else:
+        passes = 0
+        move = moves[ generator.randrange( len( moves ) ) ]
+        bot.set_color_position( board, move, color )
+
+      color = bot.opposity_color( color )
+
+def verify(bot, positions):
+  '''
+  Compare the movements and the resulting boards of the
+  bitboard engine with the reference implementation
+
+  Params:
+    bot       : DunkBot instance
+    positions : Iterable of tuples ( board, color )
+
+  Return:
+    A tuple with two values:
+      checked    : Amount of positions checked
+      mismatches : List of tuples ( board, color, reason )
+  '''
+
+  checked = 0
+  mismatches = []
+
+  for board, color in positions:
+    color = bot.transform_color( color )
+    checked += 1
+
+    moves = set( tuple( move ) for move in bot.list_moves( board, color ) )
+    expected = reference_moves( bot, board, color )
+
+    if moves != expected:
+      mismatches.append( ( board, color, "moves %s != %s" % ( sorted(moves), sorted(expected) ) ) )
+      continue
+
+    for move in expected:
+      new_board = board.copy()
+      bot.set_color_position( new_board, np.array( move ), color )
+
+      expected_board = board.copy()
+      reference_play( bot, expected_board, move, color )
+
+      if (new_board != expected_board).any():
+        mismatches.append( ( board, color, "board after %s" % (move,) ) )
+
+  return checked, mismatches
+
+def measure(bot, positions, repeat = 10):
+  '''
+  Measure the time used to list the movements with
+  the reference implementation and with the bitboards
+
+  Params:
+    bot       : DunkBot instance
+    positions : List of tuples ( board, color )
+    repeat    : Amount of times each position is listed
+
+  Defaults:
+    repeat    : 10
+
+  Return:
+    A tuple with two values:
+      reference_rate : Positions per second of the reference
+      bitboard_rate  : Positions per second of the bitboards
+  '''
+
+  amount = float( len( positions ) * repeat )
+
+  start = time.time()
+  for _ in xrange( repeat ):
+    for board, color in positions:
+      reference_moves( bot, board, color )
+  reference_time = time.time() - start
+
+  start = time.time()
+  for _ in xrange( repeat ):
+    for board, color in positions:
+      bot.list_moves( board, color )
+  bitboard_time = time.time() - start
+
+  return amount / reference_time, amount / bitboard_time
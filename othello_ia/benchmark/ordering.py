@@ -0,0 +1,67 @@
+'''
+Ordering
+
+Nodes searched and cutoffs produced by the first child
+with each move ordering policy
+'''
+
+import time
+
+from dunk_bot.ordering import MoveOrdering
+
+# Name and the enabled policies of each configuration
+CONFIGURATIONS = [
+  ( "static",  {} ),
+  ( "pv",      { "pv": True } ),
+  ( "killers", { "killers": True } ),
+  ( "history", { "history": True } ),
+  ( "corners", { "corners": True } ),
+  ( "all",     { "pv": True, "killers": True, "history": True, "corners": True } ),
+]
+
+def create_ordering(policies):
+  '''
+  Create a MoveOrdering with only some policies enabled
+
+  Params:
+    policies : Dictionary of the enabled policies
+
+  Return:
+    The MoveOrdering
+  '''
+
+  options = dict.fromkeys( [ "pv", "killers", "history", "corners" ], False )
+  options.update( policies )
+
+  return MoveOrdering( **options )
+
+def measure(bot_class, boards, depth, policies):
+  '''
+  Search a list of positions with a move ordering
+
+  Params:
+    bot_class : Class of the bot, DunkBot
+    boards    : List of tuples ( board, color )
+    depth     : Depth of the search
+    policies  : Dictionary of the enabled policies
+
+  Return:
+    Dictionary with the nodes, time, cutoffs and
+    first child cutoffs of all searches
+  '''
+
+  ordering = create_ordering( policies )
+  bot = bot_class( max_depth = depth, ordering = ordering )
+
+  result = { "nodes": 0, "time": 0.0, "cutoffs": 0, "first_cutoffs": 0 }
+
+  for board, color in boards:
+    start = time.time()
+    bot.play( board, color )
+
+    result["time"] += time.time() - start
+    result["nodes"] += bot.nodes
+    result["cutoffs"] += ordering.cutoffs
+    result["first_cutoffs"] += ordering.first_cutoffs
+
+  return result
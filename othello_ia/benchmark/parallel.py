@@ -0,0 +1,50 @@
+'''
+Parallel
+
+Scaling of the root splitting search with the amount
+of worker processes
+'''
+
+import time
+
+from dunk_bot.book import START_BLACK, START_WHITE
+
+def measure(bot_class, boards, depth, workers):
+  '''
+  Search a list of positions at a fixed depth
+
+  Params:
+    bot_class : Class of the bot, DunkBot
+    boards    : List of tuples ( board, color )
+    depth     : Depth of the search
+    workers   : Amount of worker processes
+
+  Return:
+    A tuple with three values:
+      moves : List of the selected movements
+      nodes : Amount of searched nodes
+      time  : Seconds used by the searches
+  '''
+
+  bot = bot_class( max_depth = depth, workers = workers )
+
+  # Start the worker processes before measuring, on the
+  # start position, so the tables do not hold deeper
+  # results of the measured positions
+  if workers > 1:
+    bot.play( bot.create_board( ( START_BLACK, START_WHITE ) ), bot.BLACK )
+
+  moves = []
+  nodes = 0
+
+  start = time.time()
+
+  try:
+    for board, color in boards:
+      moves.append( tuple( bot.play( board, color ) ) )
+      nodes += bot.nodes
+
+  finally:
+    bot.close()
+
+  return moves, nodes, time.time() - start
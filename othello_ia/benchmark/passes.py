@@ -0,0 +1,87 @@
+'''
+Passes
+
+Reference search of boards with passes and finished games,
+a plain minimax without pruning, tables or ordering, with
+the same scores of the DunkBot search:
+
+  - A color without movements passes, using one ply
+  - Two passes in a row finish the game
+  - A finished game, or a full board at the max depth, is
+    scored by the final disc difference
+  - Other boards at the max depth keep the score of the
+    last movement
+'''
+
+from dunk_bot import bitboard
+from dunk_bot.endgame import final_score
+
+def reference_search(bot, own, opp, root, depth, score = 0, ply = 0):
+  '''
+  Minimax value of a board
+
+  Params:
+    bot   : DunkBot instance, for the weights
+    own   : Bitboard of the color to play
+    opp   : Bitboard of the opposity color
+    root  : True if own is the root color
+    depth : Max depth of the search
+    score : Score of the last movement
+    ply   : Depth of the board
+
+  Defaults:
+    score : 0
+    ply   : 0
+
+  Return:
+    Value from the view of the root color
+  '''
+
+  sign = 1 if root else -1
+
+  if ply == depth:
+    if own | opp == bitboard.FULL:
+      return sign * bot.TERMINAL_WEIGHT * final_score( own, opp )
+
+    return score
+
+  moves = bitboard.get_moves( own, opp )
+
+  if not moves:
+    if not bitboard.get_moves( opp, own ):
+      return sign * bot.TERMINAL_WEIGHT * final_score( own, opp )
+
+    return reference_search( bot, opp, own, not root, depth, score, ply + 1 )
+
+  values = []
+
+  for square in bitboard.iter_squares( moves ):
+    flips = bitboard.get_flips( own, opp, square )
+    child_score = bitboard.count( flips ) + bot.POSITION_WEIGHTS[ square ]
+
+    values.append( reference_search(
+      bot, opp & ~flips, own | flips | ( 1 << square ), not root, depth, child_score, ply + 1
+    ) )
+
+  return max( values ) if root else min( values )
+
+def search_value(bot, board, color, depth):
+  '''
+  Root value of the search of a bot at a fixed depth
+
+  Params:
+    bot   : DunkBot instance, without endgame solver
+    board : Board array
+    color : Color to play
+    depth : Depth of the search
+
+  Return:
+    A tuple with two values:
+      value : Root value of the last depth
+      move  : Movement selected
+  '''
+
+  bot.max_depth = depth
+  move = bot.play( board, color )
+
+  return bot.search_report[-1]["value"], tuple( move )
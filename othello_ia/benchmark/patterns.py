@@ -0,0 +1,128 @@
+'''
+Patterns
+
+Checks of the PatternEvaluator: the seeded tables score
+like the position table, and the indices kept by the
+PatternBoard match the ones computed from the board
+after random movements and their undo
+'''
+
+import random
+import time
+
+import numpy as np
+
+from dunk_bot import bitboard
+from dunk_bot.patterns import PatternBoard, get_indices
+
+def verify_indices(bitboards, plies, seed = 0):
+  '''
+  Play random movements on a PatternBoard, comparing its
+  indices with the ones of the board after each play and
+  each undo
+
+  Params:
+    bitboards : List of tuples ( black, white ), black
+                plays first
+    plies     : Max amount of movements from each board
+    seed      : Seed of the random movements
+
+  Defaults:
+    seed      : 0
+
+  Return:
+    A tuple with two values:
+      checks   : Amount of compared boards
+      failures : Amount of boards with other indices
+  '''
+
+  generator = random.Random( seed )
+  board = PatternBoard( 0, 0 )
+
+  checks = 0
+  failures = 0
+
+  def check():
+    expected = get_indices( [ board.black ], [ board.white ] )[0]
+    return 0 if np.array_equal( board.indices, expected ) else 1
+
+  for black, white in bitboards:
+    board.reset( black, white )
+    black_to_move = True
+
+    for ply in xrange( plies ):
+      own, opp = ( board.black, board.white ) if black_to_move else ( board.white, board.black )
+      moves = bitboard.get_moves( own, opp )
+
+      if moves:
+        square = generator.choice( list( bitboard.iter_squares( moves ) ) )
+        board.play( square, bitboard.get_flips( own, opp, square ), black_to_move )
+      else:
+        board.play_pass( black_to_move )
+
+      black_to_move = not black_to_move
+
+      checks += 1
+      failures += check()
+
+    while board.ply:
+      board.undo()
+
+      checks += 1
+      failures += check()
+
+  return checks, failures
+
+def measure_board(evaluator, bitboards, repeat = 5):
+  '''
+  Cost of a movement, its evaluation and its undo
+  on a PatternBoard
+
+  Params:
+    evaluator : PatternEvaluator instance
+    bitboards : List of tuples ( black, white ), black
+                plays first
+    repeat    : Amount of times each movement is played
+
+  Defaults:
+    repeat    : 5
+
+  Return:
+    A tuple with two values:
+      play     : Microseconds of a play and its undo
+      evaluate : Microseconds of an evaluation
+  '''
+
+  board = evaluator.create_search_board()
+  moves = []
+
+  for black, white in bitboards:
+    for square in bitboard.iter_squares( bitboard.get_moves( black, white ) ):
+      moves.append( ( black, white, square, bitboard.get_flips( black, white, square ) ) )
+
+  play_time = 0.0
+  evaluate_time = 0.0
+
+  for black, white, square, flips in moves:
+    board.reset( black, white )
+
+    start = time.time()
+
+    for _ in xrange( repeat ):
+      board.play( square, flips, True )
+      board.undo()
+
+    play_time += time.time() - start
+
+    board.play( square, flips, True )
+
+    start = time.time()
+
+    for _ in xrange( repeat ):
+      evaluator.evaluate_board( board )
+
+    evaluate_time += time.time() - start
+
+  amount = len( moves ) * repeat
+
+  return play_time * 1e6 / amount, evaluate_time * 1e6 / amount
@@ -0,0 +1,205 @@
+'''
+Perft
+
+Counts the leaves of the game tree until a fixed depth,
+without evaluation nor pruning, to check the movement
+generation against known counts and to measure its raw
+speed in leaves per second
+
+A pass is a movement of the tree, so a color without
+movements adds a ply. A finished game is a leaf even
+before the max depth
+
+The tree is walked by three implementations:
+
+  bitboard : get_moves and get_flips on plain bitboards
+  search   : generate_moves of DunkBot on its SearchBoard,
+             with play and undo, as the search does
+  expand   : expand of DunkBot, creating a node per child
+'''
+
+import time
+
+from dunk_bot import bitboard
+
+# Leaves of the start position at each depth
+KNOWN_COUNTS = ( 1, 4, 12, 56, 244, 1396, 8200, 55092, 390216, 3005288 )
+
+def perft(own, opp, depth):
+  '''
+  Count the leaves with the bitboard functions
+
+  Params:
+    own   : Bitboard of the color to play
+    opp   : Bitboard of the opposity color
+    depth : Remaining depth
+
+  Return:
+    Amount of leaves
+  '''
+
+  if depth == 0:
+    return 1
+
+  moves = bitboard.get_moves( own, opp )
+
+  if not moves:
+    if not bitboard.get_moves( opp, own ):
+      return 1
+
+    return perft( opp, own, depth - 1 )
+
+  # The children of the last ply are counted
+  # without playing them
+  if depth == 1:
+    return bitboard.count( moves )
+
+  leaves = 0
+
+  for square in bitboard.iter_squares( moves ):
+    flips = bitboard.get_flips( own, opp, square )
+    leaves += perft( opp & ~flips, own | flips | ( 1 << square ), depth - 1 )
+
+  return leaves
+
+def divide(own, opp, depth):
+  '''
+  Count the leaves under each root movement
+
+  Params:
+    own   : Bitboard of the color to play
+    opp   : Bitboard of the opposity color
+    depth : Depth from the root
+
+  Return:
+    List of tuples ( square, leaves ), with the
+    square None for a pass
+  '''
+
+  moves = bitboard.get_moves( own, opp )
+
+  if not moves:
+    if not bitboard.get_moves( opp, own ) or depth == 0:
+      return []
+
+    return [ ( None, perft( opp, own, depth - 1 ) ) ]
+
+  result = []
+
+  for square in bitboard.iter_squares( moves ):
+    flips = bitboard.get_flips( own, opp, square )
+    result.append( ( square, perft( opp & ~flips, own | flips | ( 1 << square ), depth - 1 ) ) )
+
+  return result
+
+def perft_search(bot, color, depth):
+  '''
+  Count the leaves with the movement generation of the
+  search, on the current search board of the bot
+
+  Params:
+    bot   : DunkBot instance
+    color : Color to play on the search board
+    depth : Remaining depth
+
+  Return:
+    Amount of leaves
+  '''
+
+  if depth == 0:
+    return 1
+
+  board = bot.search_board
+  children = bot.generate_moves( color )
+  other_color = bot.opposity_color( color )
+  black = color == bot.BLACK
+
+  if not children:
+    if not bot.has_moves( other_color ):
+      return 1
+
+    board.play_pass( black )
+    leaves = perft_search( bot, other_color, depth - 1 )
+    board.undo()
+
+    return leaves
+
+  if depth == 1:
+    return len( children )
+
+  leaves = 0
+
+  for score, square, flips in children:
+    board.play( square, flips, black )
+    leaves += perft_search( bot, other_color, depth - 1 )
+    board.undo()
+
+  return leaves
+
+def perft_expand(bot, node, color, depth):
+  '''
+  Count the leaves with the expand function of the bot
+
+  Params:
+    bot   : DunkBot instance
+    node  : Node of the board, see create_node
+    color : Color to play
+    depth : Remaining depth
+
+  Return:
+    Amount of leaves
+  '''
+
+  if depth == 0:
+    return 1
+
+  children = bot.expand( node, color )
+  other_color = bot.opposity_color( color )
+
+  if not children:
+    if not bot.expand( node, other_color ):
+      return 1
+
+    return perft_expand( bot, node, other_color, depth - 1 )
+
+  if depth == 1:
+    return len( children )
+
+  return sum( perft_expand( bot, child, other_color, depth - 1 ) for child in children )
+
+def measure(bot, black, white, color, depth, method):
+  '''
+  Count the leaves of a board with an implementation
+
+  Params:
+    bot    : DunkBot instance
+    black  : Black bitboard
+    white  : White bitboard
+    color  : Color to play
+    depth  : Depth of the count
+    method : bitboard, search or expand
+
+  Return:
+    A tuple with two values:
+      leaves  : Amount of leaves
+      seconds : Time of the count
+  '''
+
+  start = time.time()
+
+  if method == "bitboard":
+    own, opp = ( black, white ) if color == bot.BLACK else ( white, black )
+    leaves = perft( own, opp, depth )
+
+  elif method == "search":
+    bot.search_board.reset( black, white )
+    leaves = perft_search( bot, color, depth )
+
+  elif method == "expand":
+    node = bot.create_node( ( black, white ), None, None, None )
+    leaves = perft_expand( bot, node, color, depth )
+
+  else:
+    raise ValueError( "Unknown perft method: %s" % method )
+
+  return leaves, time.time() - start
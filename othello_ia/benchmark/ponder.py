@@ -0,0 +1,82 @@
+'''
+Ponder
+
+Response time of the bot after a movement of the opponent,
+searching cold against pondering while the opponent thinks.
+The opponent plays a random movement after a fixed think
+time, so the movement may not be pondered yet
+
+The history and killers left by the other pondered boards
+can break ties between movements of the same value another
+way, so the searches are compared by their value
+'''
+
+import random
+import time
+
+from dunk_bot.ponder import Ponderer
+
+def measure(bot_class, boards, depth, think_time, seed = 0):
+  '''
+  Measure the response time with and without pondering
+
+  Params:
+    bot_class  : Class of the bot, DunkBot
+    boards     : List of tuples ( board, color ), with the
+                 opponent of the bot to play
+    depth      : Max depth of the bot
+    think_time : Seconds the opponent thinks
+    seed       : Seed of the movements of the opponent
+
+  Defaults:
+    seed       : 0
+
+  Return:
+    Dictionary with the cold and pondered response times,
+    the hits and the pondered boards with the same value
+  '''
+
+  rng = random.Random( seed )
+
+  result = { "boards": 0, "cold": 0.0, "ponder": 0.0, "hits": 0, "same": 0 }
+
+  for board, color in boards:
+    cold_bot = bot_class( max_depth = depth, endgame_empties = 0 )
+    ponder_bot = bot_class( max_depth = depth, endgame_empties = 0 )
+
+    bot_color = cold_bot.opposity_color( cold_bot.transform_color( color ) )
+    moves = cold_bot.list_moves( board, color )
+
+    if moves.size == 0: continue
+
+    child = board.copy()
+    cold_bot.set_color_position( child, moves[ rng.randrange( len( moves ) ) ], cold_bot.transform_color( color ) )
+
+    if cold_bot.list_moves( child, bot_color ).size == 0: continue
+
+    start = time.time()
+    cold_bot.play( child, bot_color )
+    result["cold"] += time.time() - start
+
+    ponderer = Ponderer( ponder_bot, bot_color )
+    ponderer.start( board )
+    time.sleep( think_time )
+
+    # The response starts when the opponent plays
+    start = time.time()
+    ponderer.stop()
+
+    move, report = ponderer.take( child )
+
+    if move is None:
+      ponder_bot.play( child, bot_color )
+      report = ponder_bot.search_report
+    else:
+      result["hits"] += 1
+
+    result["ponder"] += time.time() - start
+
+    result["boards"] += 1
+    result["same"] += report[-1]["value"] == cold_bot.search_report[-1]["value"]
+
+  return result
@@ -0,0 +1,91 @@
+'''
+Positions
+
+Corpus of fixed positions used by the benchmarks. Each
+position is stored on the positions folder on the same
+text format read by utils.convert_board_from_file
+'''
+
+import os
+import utils
+
+POSITIONS_DIR = os.path.join( os.path.dirname( os.path.abspath(__file__) ), "positions" )
+
+# Position name and the color to play
+POSITIONS = [
+  ( "opening_01", "black" ),
+  ( "opening_02", "white" ),
+  ( "opening_03", "white" ),
+  ( "opening_04", "white" ),
+  ( "opening_05", "black" ),
+  ( "opening_06", "white" ),
+  ( "midgame_01", "black" ),
+  ( "midgame_02", "white" ),
+  ( "midgame_03", "black" ),
+  ( "midgame_04", "white" ),
+  ( "midgame_05", "black" ),
+  ( "midgame_06", "white" ),
+  ( "midgame_07", "black" ),
+  ( "midgame_08", "white" ),
+  ( "midgame_09", "black" ),
+  ( "midgame_10", "white" ),
+  ( "midgame_11", "black" ),
+  ( "midgame_12", "white" ),
+  ( "endgame_01", "black" ),
+  ( "endgame_02", "white" ),
+  ( "endgame_03", "black" ),
+  ( "endgame_04", "white" ),
+  ( "endgame_05", "black" ),
+  ( "endgame_06", "white" ),
+  ( "endgame_07", "black" ),
+  ( "endgame_08", "white" ),
+  ( "endgame_09", "black" ),
+  ( "endgame_10", "white" ),
+
+  # A color must pass on the root or inside the
+  # first plies, or the game is already over
+  ( "passes_01", "black" ),
+  ( "passes_02", "white" ),
+  ( "passes_03", "white" ),
+  ( "passes_04", "white" ),
+  ( "passes_05", "white" ),
+  ( "passes_06", "white" ),
+  ( "passes_07", "white" ),
+  ( "passes_08", "white" ),
+]
+
+def load_board(name):
+  '''
+  Load the board of a position of the corpus
+
+  Params:
+    name : Name of the position
+
+  Return:
+    Board array of the position
+  '''
+
+  board_file = open( os.path.join( POSITIONS_DIR, name ), "r" )
+
+  return utils.convert_board_from_file( board_file )
+
+def load_positions(category = None):
+  '''
+  Load the positions of the corpus
+
+  Params:
+    category : Only load the positions with this prefix,
+               like "opening", "midgame", "endgame" or "passes"
+
+  Defaults:
+    category : None, load all positions
+
+  Return:
+    List of tuples ( name, board, color )
+  '''
+
+  return [
+    ( name, load_board( name ), color )
+    for name, color in POSITIONS
+    if category is None or name.startswith( category )
+  ]
@@ -0,0 +1,43 @@
+'''
+PVS
+
+Compares the Max and Min alpha-beta functions with the
+Principal Variation Search, both must find the same root
+value, PVS should search fewer nodes
+'''
+
+import time
+
+def measure(bot_class, boards, depth, algorithm, tt_size):
+  '''
+  Search a list of positions with an algorithm
+
+  Params:
+    bot_class : Class of the bot, DunkBot
+    boards    : List of tuples ( board, color )
+    depth     : Depth of the search
+    algorithm : Algorithm of the bot
+    tt_size   : Size of the transposition table, 0 without it
+
+  Return:
+    A tuple with three values:
+      values : Root value of each position
+      nodes  : Amount of searched nodes
+      time   : Seconds spent on all searches
+  '''
+
+  bot = bot_class( max_depth = depth, tt_size = tt_size, algorithm = algorithm, endgame_empties = 0 )
+
+  values = []
+  nodes = 0
+  seconds = 0.0
+
+  for board, color in boards:
+    start = time.time()
+    bot.play( board, color )
+    seconds += time.time() - start
+
+    nodes += bot.nodes
+    values.append( bot.search_report[-1]["value"] )
+
+  return values, nodes, seconds
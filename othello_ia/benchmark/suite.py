@@ -0,0 +1,220 @@
+'''
+Suite
+
+Searches the opening, midgame and endgame positions of the
+corpus from depth 1 to a max depth, keeping for each depth
+the nodes, the time to reach it and the best movement, and
+writes them on a JSON report. A report can be compared with
+a saved baseline to flag the regressions
+
+The search runs without book nor endgame solver, so every
+depth of every position is searched the same way
+'''
+
+import json
+import platform
+import time
+
+from benchmark import positions
+
+# Version of the report format
+REPORT_VERSION = 1
+
+# Categories of the corpus searched by the suite
+CATEGORIES = ( "opening", "midgame", "endgame" )
+
+# Times below this amount of seconds are too noisy
+# to be compared
+MIN_TIME = 0.2
+
+def run(bot_class, depth, repeat = 1, options = None):
+  '''
+  Search all positions of the suite
+
+  Params:
+    bot_class : Class of the bot, DunkBot
+    depth     : Max depth of the searches
+    repeat    : Times each position is searched, the
+                fastest time of each depth is kept
+    options   : Extra constructor arguments of the bot
+
+  Defaults:
+    repeat    : 1
+    options   : None
+
+  Return:
+    Dictionary with the report
+  '''
+
+  options = dict( options or {} )
+  options.setdefault( "endgame_empties", 0 )
+
+  report = {
+    "version": REPORT_VERSION,
+    "depth": depth,
+    "options": dict( ( key, repr( value ) ) for key, value in options.iteritems() ),
+    "python": platform.python_version(),
+    "created": time.strftime( "%Y-%m-%d %H:%M:%S" ),
+    "positions": {},
+    "categories": {}
+  }
+
+  for category in CATEGORIES:
+    nodes = 0
+    seconds = 0.0
+    time_to_depth = [ 0.0 ] * depth
+
+    for name, board, color in positions.load_positions( category ):
+      depths = None
+
+      for _ in xrange( repeat ):
+        # A new bot each time, so the tables left by
+        # other searches do not change the result
+        bot = bot_class( max_depth = depth, **options )
+        bot.play( board, color )
+
+        searched = [ {
+          "depth": item["depth"],
+          "nodes": item["nodes"],
+          "time": item["time"],
+          "move": list( item["move"] ),
+          "value": item["value"]
+        } for item in bot.search_report ]
+
+        if depths is None:
+          depths = searched
+        else:
+          for kept, item in zip( depths, searched ):
+            kept["time"] = min( kept["time"], item["time"] )
+
+      elapsed = 0.0
+
+      for item in depths:
+        elapsed += item["time"]
+        item["time_to_depth"] = elapsed
+        time_to_depth[ item["depth"] - 1 ] += elapsed
+
+      report["positions"][ name ] = { "color": color, "depths": depths }
+
+      nodes += sum( item["nodes"] for item in depths )
+      seconds += elapsed
+
+    report["categories"][ category ] = {
+      "nodes": nodes,
+      "time": seconds,
+      "nodes_per_second": nodes / seconds if seconds else 0.0,
+      "time_to_depth": time_to_depth
+    }
+
+  nodes = sum( item["nodes"] for item in report["categories"].itervalues() )
+  seconds = sum( item["time"] for item in report["categories"].itervalues() )
+
+  report["total"] = {
+    "nodes": nodes,
+    "time": seconds,
+    "nodes_per_second": nodes / seconds if seconds else 0.0
+  }
+
+  return report
+
+def save_report(report, path):
+  '''
+  Write a report on a JSON file
+
+  Params:
+    report : Dictionary with the report
+    path   : Path of the JSON file
+  '''
+
+  report_file = open( path, "w" )
+
+  try:
+    json.dump( report, report_file, indent=2, sort_keys=True )
+  finally:
+    report_file.close()
+
+def load_report(path):
+  '''
+  Read a report from a JSON file
+
+  Params:
+    path : Path of the JSON file
+
+  Return:
+    Dictionary with the report
+  '''
+
+  report_file = open( path, "r" )
+
+  try:
+    report = json.load( report_file )
+  finally:
+    report_file.close()
+
+  if report.get( "version" ) != REPORT_VERSION:
+    raise ValueError( "Unknown report version on %s" % path )
+
+  return report
+
+def compare(report, baseline, tolerance = 0.1):
+  '''
+  Compare a report with a baseline
+
+  Time is noisy, so nodes per second and time to depth
+  are regressions only beyond the tolerance, and times
+  under MIN_TIME are not compared. Nodes and
+  movements are exact, any difference means the search
+  itself changed and is listed apart
+
+  Params:
+    report    : Dictionary with the new report
+    baseline  : Dictionary with the baseline report
+    tolerance : Allowed relative loss of speed
+
+  Defaults:
+    tolerance : 0.1
+
+  Return:
+    A tuple with two lists of text lines:
+      regressions : Speed lost beyond the tolerance
+      changes     : Different nodes or movements
+  '''
+
+  regressions = []
+  changes = []
+
+  def check_speed(label, new, old):
+    if old and new < old * ( 1.0 - tolerance ):
+      regressions.append( "%s nodes/s %.0f -> %.0f (%+.1f%%)" % ( label, old, new, 100.0 * ( new / old - 1.0 ) ) )
+
+  def check_time(label, new, old):
+    if old >= MIN_TIME and new > old * ( 1.0 + tolerance ):
+      regressions.append( "%s %.4f s -> %.4f s (%+.1f%%)" % ( label, old, new, 100.0 * ( new / old - 1.0 ) ) )
+
+  check_speed( "total", report["total"]["nodes_per_second"], baseline["total"]["nodes_per_second"] )
+
+  for category, old in sorted( baseline["categories"].iteritems() ):
+    new = report["categories"].get( category )
+
+    if new is None: continue
+
+    check_speed( category, new["nodes_per_second"], old["nodes_per_second"] )
+
+    for depth, ( new_time, old_time ) in enumerate( zip( new["time_to_depth"], old["time_to_depth"] ) ):
+      check_time( "%s time to depth %d" % ( category, depth + 1 ), new_time, old_time )
+
+  for name, old in sorted( baseline["positions"].iteritems() ):
+    new = report["positions"].get( name )
+
+    if new is None: continue
+
+    for new_depth, old_depth in zip( new["depths"], old["depths"] ):
+      if new_depth["move"] != old_depth["move"]:
+        changes.append( "%s depth %d move %s -> %s" % (
+          name, old_depth["depth"], tuple( old_depth["move"] ), tuple( new_depth["move"] ) ) )
+
+      if new_depth["nodes"] != old_depth["nodes"]:
+        changes.append( "%s depth %d nodes %d -> %d" % (
+          name, old_depth["depth"], old_depth["nodes"], new_depth["nodes"] ) )
+
+  return regressions, changes
@@ -0,0 +1,111 @@
+'''
+Symmetry
+
+Checks the symmetry transforms, round trips of the
+squares and the movements through all 8 symmetries,
+and measures the cost of the canonical form
+'''
+
+import random
+import time
+
+from dunk_bot import bitboard
+from dunk_bot import symmetry
+
+def table_canonical(own, opp):
+  '''
+  Canonical form with the square by square transforms,
+  reference of symmetry.canonical
+  '''
+
+  return min(
+    ( symmetry.transform_bits_table( own, transform ), symmetry.transform_bits_table( opp, transform ), transform )
+    for transform in xrange(8)
+  )
+
+def verify(bitboards, seed = 0):
+  '''
+  Check the transforms on many boards
+
+  Params:
+    bitboards : List of tuples ( own, opp )
+    seed      : Seed of the random bitboards
+
+  Defaults:
+    seed      : 0
+
+  Return:
+    List of the failed checks
+  '''
+
+  failures = []
+
+  # Squares
+  for transform in xrange(8):
+    for square in xrange(64):
+      moved = symmetry.transform_square( square, transform )
+
+      if symmetry.inverse_square( moved, transform ) != square:
+        failures.append( "square %d transform %d" % ( square, transform ) )
+
+  # Bitboards against the square tables
+  generator = random.Random( seed )
+
+  for idx in xrange( 1000 ):
+    bits = generator.getrandbits( 64 )
+
+    for transform in xrange(8):
+      if symmetry.transform_bits( bits, transform ) != symmetry.transform_bits_table( bits, transform ):
+        failures.append( "bits %x transform %d" % ( bits, transform ) )
+
+  # Boards and their movements
+  for own, opp in bitboards:
+    moves = bitboard.get_moves( own, opp )
+    canonical = symmetry.canonical( own, opp )
+
+    if canonical != table_canonical( own, opp ):
+      failures.append( "canonical %x %x" % ( own, opp ) )
+
+    for transform in xrange(8):
+      moved_own = symmetry.transform_bits( own, transform )
+      moved_opp = symmetry.transform_bits( opp, transform )
+
+      if bitboard.get_moves( moved_own, moved_opp ) != symmetry.transform_bits( moves, transform ):
+        failures.append( "moves %x %x transform %d" % ( own, opp, transform ) )
+
+      # Every symmetric board has the same canonical form,
+      # and the movements come back to the same squares
+      moved_canonical = symmetry.canonical( moved_own, moved_opp )
+
+      if moved_canonical[ :2 ] != canonical[ :2 ]:
+        failures.append( "symmetric canonical %x %x transform %d" % ( own, opp, transform ) )
+
+      for square in bitboard.iter_squares( moves ):
+        canonical_move = symmetry.transform_square( symmetry.transform_square( square, transform ),
+          moved_canonical[2] )
+
+        back = symmetry.inverse_square( symmetry.inverse_square( canonical_move, moved_canonical[2] ), transform )
+
+        if back != square:
+          failures.append( "move %d %x %x transform %d" % ( square, own, opp, transform ) )
+
+  return failures
+
+def measure(function, bitboards):
+  '''
+  Time a canonical form function
+
+  Params:
+    function  : Function of ( own, opp )
+    bitboards : List of tuples ( own, opp )
+
+  Return:
+    Microseconds per board
+  '''
+
+  start = time.time()
+
+  for own, opp in bitboards:
+    function( own, opp )
+
+  return ( time.time() - start ) * 1e6 / max( len( bitboards ), 1 )
@@ -0,0 +1,192 @@
+'''
+Analysis
+
+Batch analysis of many positions. Positions are read as a
+stream, searched on a pool of processes with a bounded
+amount of positions in flight, and the results are given
+back on the input order, so the memory stays flat with any
+amount of positions
+
+Two input forms are read, and can be mixed:
+
+  compact : One line with the 64 characters of the board
+            and the color, like "...BW... black"
+  board   : The 8 lines of the board files, followed by
+            a line with the color
+
+Empty lines and lines starting with # are ignored
+'''
+
+import collections
+import multiprocessing
+
+from dunk_bot import DunkBot
+from service import parse_board
+
+# Bot of the worker process
+worker_bot = None
+worker_time_limit = None
+
+def read_positions(lines):
+  '''
+  Read the positions of a stream of lines
+
+  Params:
+    lines : Iterable of text lines, like a file
+
+  Return:
+    Generator of tuples ( board, color ), with the 64
+    characters of the board. Incomplete positions are
+    given with the board None and the error as color
+  '''
+
+  rows = []
+
+  for number, line in enumerate( lines ):
+    line = line.strip()
+
+    if not line or line.startswith( "#" ):
+      continue
+
+    fields = line.split()
+
+    if not rows and len( fields ) == 2 and len( fields[0] ) == 64:
+      yield fields[0], fields[1]
+
+    elif len( rows ) < 8 and len( fields ) == 1 and len( line ) == 8:
+      rows.append( line )
+
+    elif len( rows ) == 8 and len( fields ) == 1:
+      yield "".join( rows ), line
+      rows = []
+
+    else:
+      yield None, "Unexpected line %d" % ( number + 1 )
+      rows = []
+
+  if rows:
+    yield None, "Incomplete board at the end of the input"
+
+def init_worker(options, time_limit):
+  '''
+  Initializer of the pool processes
+
+  Params:
+    options    : Constructor arguments of the bot
+    time_limit : Seconds for each position, or None
+  '''
+
+  global worker_bot, worker_time_limit
+
+  worker_bot = DunkBot( use_logging = True, **options )
+  worker_time_limit = time_limit
+
+def analyse(position):
+  '''
+  Search a position on the worker bot
+
+  Params:
+    position : Tuple ( board, color ) of read_positions
+
+  Return:
+    Dictionary with the move, score, depth, nodes and
+    time, or with the error
+  '''
+
+  board, color = position
+
+  if board is None:
+    return { "error": color }
+
+  bot = worker_bot
+
+  try:
+    board = parse_board( board )
+    color = bot.transform_color( color )
+  except ( ValueError, KeyError ), e:
+    return { "error": "Invalid position: %s" % e }
+
+  move = bot.play( board, color, worker_time_limit )
+
+  completed = [ report for report in bot.search_report if report["completed"] ]
+  last = completed[-1] if completed else None
+
+  return {
+    "color": color,
+    "move": [ int( value ) for value in move ],
+    "score": last["value"] if last else None,
+    "depth": last["depth"] if last else 0,
+    "source": bot.stats.source,
+    "nodes": bot.stats.nodes,
+    "time": bot.stats.time
+  }
+
+def analyse_stream(positions, workers = 1, options = None, time_limit = None, max_pending = None):
+  '''
+  Search a stream of positions on a pool of processes
+
+  Params:
+    positions   : Iterable of tuples ( board, color )
+    workers     : Amount of worker processes
+    options     : Constructor arguments of the bots
+    time_limit  : Seconds for each position
+    max_pending : Max amount of positions in flight
+
+  Defaults:
+    workers     : 1
+    options     : None, default bots
+    time_limit  : None, search until the max depth
+    max_pending : None, 4 for each worker
+
+  Return:
+    Generator of the result dictionaries of analyse,
+    on the input order, with the index of the position
+  '''
+
+  if max_pending is None:
+    max_pending = 4 * workers
+
+  pool = multiprocessing.Pool(
+    processes = workers,
+    initializer = init_worker,
+    initargs = ( options or {}, time_limit )
+  )
+
+  pending = collections.deque()
+
+  try:
+    for index, position in enumerate( positions ):
+      pending.append( ( index, pool.apply_async( analyse, ( position, ) ) ) )
+
+      # The oldest position is waited for before reading
+      # more, keeping the order and the memory bounded
+      if len( pending ) >= max_pending:
+        yield result_of( *pending.popleft() )
+
+    while pending:
+      yield result_of( *pending.popleft() )
+
+  finally:
+    pool.terminate()
+    pool.join()
+
+def result_of(index, async_result):
+  '''
+  Wait for the result of a position
+
+  Params:
+    index        : Index of the position on the input
+    async_result : multiprocessing.AsyncResult of analyse
+
+  Return:
+    The result dictionary, with the index
+  '''
+
+  try:
+    result = async_result.get()
+  except Exception, e:
+    result = { "error": "Search failed: %s" % e }
+
+  result["index"] = index
+
+  return result
@@ -0,0 +1,352 @@
+'''
+Arena
+
+Headless matches between two bot configurations. Each
+opening position is played twice, with the colors swapped,
+and the games are spread over a pool of processes
+
+A configuration is written as comma separated options:
+
+  depth=4,evaluator=features,time=0.5,algorithm=pvs
+
+  depth     : max_depth of the bot
+  time      : Seconds for each movement, no limit by default
+  evaluator : none, batch, features or patterns, with an
+              optional weight file like patterns:weights.bin
+  algorithm : minimax or pvs
+  endgame   : endgame_empties of the bot
+  tt        : Entries of the transposition table
+'''
+
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+import bitboard
+import symmetry
+from dunk_bot import DunkBot
+from endgame import final_score
+from evaluation import BatchEvaluator, FeatureEvaluator, load_weights
+from patterns import PatternEvaluator
+
+# Pieces of the start position
+START_BLACK = bitboard.square_bit( 4, 3 ) | bitboard.square_bit( 3, 4 )
+START_WHITE = bitboard.square_bit( 3, 3 ) | bitboard.square_bit( 4, 4 )
+
+# Bots of the worker process, one for each configuration
+worker_bots = None
+
+def create_evaluator(text):
+  '''
+  Create an evaluator by its name
+
+  Params:
+    text : none, batch, features or patterns, with an
+           optional weight file after a colon
+
+  Return:
+    Evaluator instance, or None
+  '''
+
+  name, _, path = text.partition( ":" )
+
+  if name == "none":
+    return None
+  if name == "batch":
+    return BatchEvaluator( DunkBot.POSITION_MODIFIER )
+  if name == "features":
+    return FeatureEvaluator( load_weights( path ) if path else None )
+  if name == "patterns":
+    if path:
+      return PatternEvaluator( path )
+    return PatternEvaluator( position_weights = DunkBot.POSITION_MODIFIER )
+
+  raise ValueError( "Unknown evaluator: %s" % text )
+
+def parse_config(text):
+  '''
+  Convert a configuration text to bot options
+
+  Params:
+    text : Comma separated options, see the module
+
+  Return:
+    A tuple with two values:
+      options    : Constructor arguments of DunkBot
+      time_limit : Seconds for each movement, or None
+  '''
+
+  options = {}
+  time_limit = None
+
+  for item in text.split( "," ):
+    if not item.strip(): continue
+
+    key, _, value = item.strip().partition( "=" )
+
+    if key == "depth":
+      options["max_depth"] = int( value )
+    elif key == "time":
+      time_limit = float( value )
+    elif key == "evaluator":
+      options["evaluator"] = create_evaluator( value )
+    elif key == "algorithm":
+      options["algorithm"] = value
+    elif key == "endgame":
+      options["endgame_empties"] = int( value )
+    elif key == "tt":
+      options["tt_size"] = int( value )
+    else:
+      raise ValueError( "Unknown option: %s" % key )
+
+  return options, time_limit
+
+def create_openings(amount, plies, seed = 0):
+  '''
+  Create distinct opening positions by random movements
+  from the start position. Symmetric positions are
+  counted once
+
+  Params:
+    amount : Amount of openings
+    plies  : Amount of random movements
+    seed   : Seed of the random movements
+
+  Defaults:
+    seed   : 0
+
+  Return:
+    List of tuples ( black, white, black_to_move )
+  '''
+
+  generator = random.Random( seed )
+
+  openings = []
+  seen = set()
+  attempts = 0
+
+  while len( openings ) < amount and attempts < amount * 100:
+    attempts += 1
+
+    own, opp = START_BLACK, START_WHITE
+    black_to_move = True
+
+    for ply in xrange( plies ):
+      moves = bitboard.get_moves( own, opp )
+
+      if not moves: break
+
+      square = generator.choice( list( bitboard.iter_squares( moves ) ) )
+      flips = bitboard.get_flips( own, opp, square )
+
+      own, opp = opp & ~flips, own | flips | ( 1 << square )
+      black_to_move = not black_to_move
+
+    if not bitboard.get_moves( own, opp ): continue
+
+    key = symmetry.canonical( own, opp )[ :2 ]
+
+    if key in seen: continue
+
+    seen.add( key )
+
+    black, white = ( own, opp ) if black_to_move else ( opp, own )
+    openings.append( ( black, white, black_to_move ) )
+
+  return openings
+
+def init_worker(configs):
+  '''
+  Initializer of the pool processes
+
+  Params:
+    configs : List of tuples ( options, time_limit )
+  '''
+
+  global worker_bots
+
+  # The bots report each movement on the output
+  sys.stdout = open( os.devnull, "w" )
+
+  worker_bots = [ ( DunkBot( **options ), time_limit ) for options, time_limit in configs ]
+
+def play_game(task):
+  '''
+  Play a game between the two bots of the worker
+
+  Params:
+    task : Tuple with:
+             black, white  : Bitboards of the opening
+             black_to_move : True if black plays first
+             first_black   : True if the first configuration
+                             plays black
+
+  Return:
+    A tuple with two values:
+      score : Final disc difference, from the view of
+              the first configuration
+      stats : List with a tuple ( moves, nodes, seconds )
+              for each configuration
+  '''
+
+  black, white, black_to_move, first_black = task
+
+  stats = [ [ 0, 0, 0.0 ], [ 0, 0, 0.0 ] ]
+  color = DunkBot.BLACK if black_to_move else DunkBot.WHITE
+
+  while True:
+    own, opp = ( black, white ) if color == DunkBot.BLACK else ( white, black )
+    moves = bitboard.get_moves( own, opp )
+
+    if not moves:
+      if not bitboard.get_moves( opp, own ):
+        break
+
+      color = DunkBot.WHITE if color == DunkBot.BLACK else DunkBot.BLACK
+      continue
+
+    player = 0 if ( color == DunkBot.BLACK ) == first_black else 1
+    bot, time_limit = worker_bots[ player ]
+
+    start = time.time()
+    x, y = bot.play( bot.create_board( ( black, white ) ), color, time_limit )
+
+    stats[ player ][0] += 1
+    stats[ player ][1] += bot.nodes
+    stats[ player ][2] += time.time() - start
+
+    square = int( x + y * 8 )
+
+    if not moves & ( 1 << square ):
+      raise ValueError( "Illegal movement %d of the configuration %d" % ( square, player + 1 ) )
+
+    flips = bitboard.get_flips( own, opp, square )
+    own, opp = own | flips | ( 1 << square ), opp & ~flips
+
+    black, white = ( own, opp ) if color == DunkBot.BLACK else ( opp, own )
+    color = DunkBot.WHITE if color == DunkBot.BLACK else DunkBot.BLACK
+
+  score = final_score( black, white )
+
+  return ( score if first_black else -score ), [ tuple( item ) for item in stats ]
+
+def elo(score):
+  '''
+  Elo difference of a mean score
+
+  Params:
+    score : Mean points per game, 1 for a win and
+            0.5 for a draw
+
+  Return:
+    Elo difference, infinite for 0 or 1
+  '''
+
+  if score <= 0.0: return float("-inf")
+  if score >= 1.0: return float("inf")
+
+  return -400.0 * math.log10( 1.0 / score - 1.0 )
+
+def match_result(scores, confidence = 1.96):
+  '''
+  Summary of the games of a match
+
+  Params:
+    scores     : List of final disc differences, from the
+                 view of the first configuration
+    confidence : Amount of standard errors of the interval
+
+  Defaults:
+    confidence : 1.96, 95% interval
+
+  Return:
+    Dictionary with wins, draws, losses, the mean score,
+    the Elo difference and its interval ( elo_low, elo_high )
+  '''
+
+  games = len( scores )
+
+  wins = sum( 1 for score in scores if score > 0 )
+  draws = sum( 1 for score in scores if score == 0 )
+  losses = games - wins - draws
+
+  points = [ 1.0 if score > 0 else 0.5 if score == 0 else 0.0 for score in scores ]
+  mean = sum( points ) / games if games else 0.5
+
+  variance = sum( ( point - mean ) ** 2 for point in points ) / games if games else 0.0
+  error = confidence * math.sqrt( variance / games ) if games else 0.0
+
+  return {
+    "games": games,
+    "wins": wins,
+    "draws": draws,
+    "losses": losses,
+    "score": mean,
+    "elo": elo( mean ),
+    "elo_low": elo( mean - error ),
+    "elo_high": elo( mean + error )
+  }
+
+def play_match(configs, openings, workers = 1, callback = None):
+  '''
+  Play every opening twice, with the colors swapped
+
+  Params:
+    configs  : List of two tuples ( options, time_limit )
+    openings : List of tuples ( black, white, black_to_move )
+    workers  : Amount of processes
+    callback : Function called after each game with the
+               amount of games played and the score
+
+  Defaults:
+    workers  : 1
+    callback : None
+
+  Return:
+    A tuple with two values:
+      result : Dictionary of match_result
+      stats  : List with a dictionary for each configuration,
+               with the moves, nodes per second and seconds
+               per move
+  '''
+
+  tasks = [
+    ( black, white, black_to_move, first_black )
+    for black, white, black_to_move in openings
+    for first_black in ( True, False )
+  ]
+
+  pool = multiprocessing.Pool(
+    processes = workers,
+    initializer = init_worker,
+    initargs = ( configs, )
+  )
+
+  scores = []
+  totals = [ [ 0, 0, 0.0 ], [ 0, 0, 0.0 ] ]
+
+  try:
+    for score, stats in pool.imap_unordered( play_game, tasks ):
+      scores.append( score )
+
+      for total, item in zip( totals, stats ):
+        for idx in xrange(3):
+          total[ idx ] += item[ idx ]
+
+      if callback is not None:
+        callback( len( scores ), score )
+
+  finally:
+    pool.terminate()
+    pool.join()
+
+  stats = [ {
+    "moves": moves,
+    "nodes_per_second": nodes / seconds if seconds else 0.0,
+    "seconds_per_move": seconds / moves if moves else 0.0
+  } for moves, nodes, seconds in totals ]
+
+  return match_result( scores ), stats
@@ -0,0 +1,366 @@
+'''
+Bitboard
+
+Board representation with one 64 bits integer per
+color. The bit of a square is the same index used by
+DunkBot.get_value, ( x + y * 8 ), so bit 0 is the
+top left corner and bit 63 the bottom right one.
+'''
+
+import numpy as np
+
+# All the 64 squares of the board
+FULL = 0xFFFFFFFFFFFFFFFF
+
+# Board without the A and H columns. Used to avoid
+# wrapping between rows on horizontal and diagonal shifts
+INNER = 0x7E7E7E7E7E7E7E7E
+
+# Directions as ( dx, dy ), same order of DunkBot.ACTIONS
+DIRECTIONS = [
+  (  0, -1 ), # UP
+  (  0,  1 ), # DOWN
+  ( -1,  0 ), # LEFT
+  (  1,  0 ), # RIGHT
+  ( -1, -1 ), # UP_LEFT
+  (  1, -1 ), # UP_RIGHT
+  ( -1,  1 ), # DOWN_LEFT
+  (  1,  1 ), # DOWN_RIGHT
+]
+
+def square_bit(x, y):
+  '''
+  Return the bit of a position on the board
+
+  Params:
+    x : X position on the board
+    y : Y position on the board
+
+  Return:
+    Bit mask with only the position setted
+  '''
+
+  return 1 << ( x + y * 8 )
+
+def square_position(square):
+  '''
+  Convert a square index to a board position
+
+  Params:
+    square : Index of the square (0-63)
+
+  Return:
+    Tuple with the ( x, y ) position
+  '''
+
+  return square % 8, square / 8
+
+def create_rays():
+  '''
+  Build, for each square, the list of bits reached
+  when walking on each direction until the border
+
+  Return:
+    Tuple indexed by square with a tuple of rays
+  '''
+
+  rays = []
+
+  for square in xrange(64):
+    x, y = square_position( square )
+    square_rays = []
+
+    for dx, dy in DIRECTIONS:
+      ray = []
+      tx, ty = x + dx, y + dy
+
+      while 0 <= tx <= 7 and 0 <= ty <= 7:
+        ray.append( square_bit( tx, ty ) )
+        tx, ty = tx + dx, ty + dy
+
+      if len( ray ) > 1:
+        square_rays.append( tuple( ray ) )
+
+    rays.append( tuple( square_rays ) )
+
+  return tuple( rays )
+
+# Only rays with at least two squares can flip pieces
+RAYS = create_rays()
+
+def count(bits):
+  '''
+  Count the amount of setted bits
+
+  Params:
+    bits : Bitboard to be counted
+
+  Return:
+    Number of pieces on the bitboard
+  '''
+
+  return bin( bits ).count( "1" )
+
+def iter_squares(bits):
+  '''
+  Iterate over the square indexes setted on a bitboard,
+  from the lowest to the highest
+
+  Params:
+    bits : Bitboard to be iterated
+
+  Return:
+    Generator of square indexes
+  '''
+
+  while bits:
+    bit = bits & -bits
+    yield bit.bit_length() - 1
+    bits ^= bit
+
+def get_moves(own, opp):
+  '''
+  Shift and mask legal move generation
+
+  Params:
+    own : Bitboard of the color to play
+    opp : Bitboard of the opposity color
+
+  Return:
+    Bitboard with all legal movements of own
+  '''
+
+  empty = ~( own | opp ) & FULL
+  inner = opp & INNER
+  moves = 0
+
+  # Vertical
+  t = opp & ( own << 8 )
+  t |= opp & ( t << 8 ); t |= opp & ( t << 8 ); t |= opp & ( t << 8 )
+  t |= opp & ( t << 8 ); t |= opp & ( t << 8 )
+  moves |= t << 8
+
+  t = opp & ( own >> 8 )
+  t |= opp & ( t >> 8 ); t |= opp & ( t >> 8 ); t |= opp & ( t >> 8 )
+  t |= opp & ( t >> 8 ); t |= opp & ( t >> 8 )
+  moves |= t >> 8
+
+  # Horizontal
+  t = inner & ( own << 1 )
+  t |= inner & ( t << 1 ); t |= inner & ( t << 1 ); t |= inner & ( t << 1 )
+  t |= inner & ( t << 1 ); t |= inner & ( t << 1 )
+  moves |= t << 1
+
+  t = inner & ( own >> 1 )
+  t |= inner & ( t >> 1 ); t |= inner & ( t >> 1 ); t |= inner & ( t >> 1 )
+  t |= inner & ( t >> 1 ); t |= inner & ( t >> 1 )
+  moves |= t >> 1
+
+  # Diagonals
+  t = inner & ( own << 7 )
+  t |= inner & ( t << 7 ); t |= inner & ( t << 7 ); t |= inner & ( t << 7 )
+  t |= inner & ( t << 7 ); t |= inner & ( t << 7 )
+  moves |= t << 7
+
+  t = inner & ( own >> 7 )
+  t |= inner & ( t >> 7 ); t |= inner & ( t >> 7 ); t |= inner & ( t >> 7 )
+  t |= inner & ( t >> 7 ); t |= inner & ( t >> 7 )
+  moves |= t >> 7
+
+  t = inner & ( own << 9 )
+  t |= inner & ( t << 9 ); t |= inner & ( t << 9 ); t |= inner & ( t << 9 )
+  t |= inner & ( t << 9 ); t |= inner & ( t << 9 )
+  moves |= t << 9
+
+  t = inner & ( own >> 9 )
+  t |= inner & ( t >> 9 ); t |= inner & ( t >> 9 ); t |= inner & ( t >> 9 )
+  t |= inner & ( t >> 9 ); t |= inner & ( t >> 9 )
+  moves |= t >> 9
+
+  return moves & empty
+
+def get_flips(own, opp, square):
+  '''
+  Compute the pieces flipped by a movement
+
+  Params:
+    own    : Bitboard of the color to play
+    opp    : Bitboard of the opposity color
+    square : Index of the square where the piece
+             will be placed
+
+  Return:
+    Bitboard with the opposity pieces that change
+    of color. Zero if the movement is not valid
+  '''
+
+  flips = 0
+
+  for ray in RAYS[ square ]:
+    line = 0
+
+    for bit in ray:
+      if opp & bit:
+        line |= bit
+      else:
+        if own & bit:
+          flips |= line
+        break
+
+  return flips
+
+def from_array(board, value):
+  '''
+  Convert a board array, as created by
+  utils.convert_board_from_file, to a bitboard
+
+  Params:
+    board : Board array
+    value : Value on the board that will be setted
+            on the bitboard
+
+  Return:
+    Bitboard with the squares that hold the value
+  '''
+
+  bits = 0
+
+  for square in np.flatnonzero( board == value ):
+    bits |= 1 << int( square )
+
+  return bits
+
+def to_array(bitboards, empty):
+  '''
+  Convert bitboards back to a board array, in the
+  same format of utils.convert_board_from_file
+
+  Params:
+    bitboards : List of tuples ( bits, value ) with
+                the value to be setted on each bitboard
+    empty     : Value of the squares not setted on any
+                bitboard
+
+  Return:
+    The board array
+  '''
+
+  board = np.array( [ empty ] * 64 )
+
+  for bits, value in bitboards:
+    for square in iter_squares( bits ):
+      board[ square ] = value
+
+  return board
+
+class SearchBoard(object):
+  """
+  SearchBoard
+
+  Single mutable board used by the search. Movements are
+  applied with play and reverted with undo, keeping the
+  flipped pieces of each ply on preallocated stacks. A
+  pass is stacked with the square None
+
+  The amount of empty squares is kept by play and undo,
+  so it is read without counting the bitboards
+  """
+
+  __slots__ = ( "black", "white", "empties", "ply", "squares", "flips", "colors" )
+
+  def __init__(self, black, white, max_ply = 128):
+    '''
+    SearchBoard Constructor
+
+    Params:
+      black   : Black bitboard
+      white   : White bitboard
+      max_ply : Max amount of stacked movements
+
+    Defaults:
+      max_ply : 128
+    '''
+
+    self.black = black
+    self.white = white
+    self.empties = 64 - count( black | white )
+    self.ply = 0
+
+    self.squares = [ 0 ] * max_ply
+    self.flips = [ 0 ] * max_ply
+    self.colors = [ False ] * max_ply
+
+  def reset(self, black, white):
+    '''
+    Set a new position, cleaning the stacked movements
+
+    Params:
+      black : Black bitboard
+      white : White bitboard
+    '''
+
+    self.black = black
+    self.white = white
+    self.empties = 64 - count( black | white )
+    self.ply = 0
+
+  def play(self, square, flips, black):
+    '''
+    Apply a movement on the board
+
+    Params:
+      square : Index of the square of the new piece
+      flips  : Bitboard of the pieces to change
+      black  : True if the black color is playing
+    '''
+
+    ply = self.ply
+
+    self.squares[ ply ] = square
+    self.flips[ ply ] = flips
+    self.colors[ ply ] = black
+    self.ply = ply + 1
+    self.empties -= 1
+
+    if black:
+      self.black ^= flips | ( 1 << square )
+      self.white ^= flips
+    else:
+      self.white ^= flips | ( 1 << square )
+      self.black ^= flips
+
+  def play_pass(self, black):
+    '''
+    Stack a pass, the board does not change
+
+    Params:
+      black : True if the black color is passing
+    '''
+
+    ply = self.ply
+
+    self.squares[ ply ] = None
+    self.flips[ ply ] = 0
+    self.colors[ ply ] = black
+    self.ply = ply + 1
+
+  def undo(self):
+    '''
+    Revert the last movement applied on the board
+    '''
+
+    ply = self.ply - 1
+    self.ply = ply
+
+    if self.squares[ ply ] is None:
+      return
+
+    flips = self.flips[ ply ]
+    self.empties += 1
+
+    if self.colors[ ply ]:
+      self.black ^= flips | ( 1 << self.squares[ ply ] )
+      self.white ^= flips
+    else:
+      self.white ^= flips | ( 1 << self.squares[ ply ] )
+      self.black ^= flips
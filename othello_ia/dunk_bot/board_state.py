@@ -0,0 +1,80 @@
+'''
+Board State
+
+Disc counts of a board array, kept up to date by
+DunkBot.set_color_position, so the score and the empty
+squares are read without scanning the 64 squares
+'''
+
+import bitboard
+
+class BoardState(object):
+  """
+  BoardState
+
+  Black, white and empty counts of a board, with
+  the list of the empty squares
+  """
+
+  __slots__ = ( "black", "white", "empty_squares" )
+
+  def __init__(self, black, white):
+    '''
+    BoardState Constructor
+
+    Params:
+      black : Black bitboard of the board
+      white : White bitboard of the board
+    '''
+
+    self.black = bitboard.count( black )
+    self.white = bitboard.count( white )
+    self.empty_squares = list( bitboard.iter_squares( ~( black | white ) & bitboard.FULL ) )
+
+  @property
+  def empties(self):
+    return len( self.empty_squares )
+
+  def place(self, square, flipped, black):
+    '''
+    Count a movement played on the board
+
+    Params:
+      square  : Index of the square of the new piece
+      flipped : Amount of flipped pieces
+      black   : True if the black color is playing
+    '''
+
+    self.empty_squares.remove( square )
+
+    if black:
+      self.black += flipped + 1
+      self.white -= flipped
+    else:
+      self.white += flipped + 1
+      self.black -= flipped
+
+  def score(self):
+    '''
+    Current score of each color
+
+    Return:
+      Tuple ( score_black, score_white )
+    '''
+
+    return self.black, self.white
+
+  def copy(self):
+    '''
+    Copy of the state, for a copy of the board
+
+    Return:
+      BoardState instance
+    '''
+
+    state = BoardState.__new__( BoardState )
+    state.black = self.black
+    state.white = self.white
+    state.empty_squares = list( self.empty_squares )
+
+    return state
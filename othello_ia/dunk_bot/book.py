@@ -0,0 +1,366 @@
+'''
+Book
+
+Opening book stored on a sorted binary file. Positions are
+kept on their canonical symmetry, from the view of the color
+to play, so transposed and mirrored openings share a record
+
+The file starts with a header ( magic, amount of records )
+followed by fixed size records sorted by position:
+
+  own    : uint64 bitboard of the color to play
+  opp    : uint64 bitboard of the opposity color
+  move   : uint8 square of the best movement
+  depth  : uint8 depth of the search that selected it
+  weight : uint16 amount of times it was seen
+
+The file is read through mmap and searched with a binary
+search, so opening the book does not parse anything
+
+Movements on text files use the usual notation, a column
+letter from a to h and a row number from 1 to 8, like f5
+'''
+
+import mmap
+import random
+import struct
+
+import bitboard
+import symmetry
+
+MAGIC = "DBK1"
+
+HEADER = struct.Struct( "<4sI" )
+RECORD = struct.Struct( "<QQBBH" )
+KEY = struct.Struct( "<QQ" )
+
+# Pieces of the start position
+START_BLACK = bitboard.square_bit( 4, 3 ) | bitboard.square_bit( 3, 4 )
+START_WHITE = bitboard.square_bit( 3, 3 ) | bitboard.square_bit( 4, 4 )
+
+def parse_move(text):
+  '''
+  Convert a movement on the text notation to a square
+
+  Params:
+    text : Movement like f5
+
+  Return:
+    Index of the square
+  '''
+
+  text = text.lower()
+
+  if len( text ) != 2 or text[0] not in "abcdefgh" or text[1] not in "12345678":
+    raise ValueError( "Invalid movement: %s" % text )
+
+  return ( ord( text[0] ) - ord( "a" ) ) + ( int( text[1] ) - 1 ) * 8
+
+def format_move(square):
+  '''
+  Convert a square to the text notation
+
+  Params:
+    square : Index of the square
+
+  Return:
+    Movement like f5
+  '''
+
+  x, y = bitboard.square_position( square )
+
+  return "%s%d" % ( "abcdefgh"[ x ], y + 1 )
+
+def parse_line(line):
+  '''
+  Convert a line of movements to squares. Movements may
+  be joined, like f5d6c3, or separated by spaces
+
+  Params:
+    line : Text line, everything after # is ignored
+
+  Return:
+    List of squares
+  '''
+
+  text = "".join( line.split( "#" )[0].split() )
+
+  return [ parse_move( text[ idx:idx + 2 ] ) for idx in xrange( 0, len( text ), 2 ) ]
+
+class BookBuilder(object):
+  """
+  BookBuilder
+
+  Collects the movements of the book positions
+  and writes the book file
+  """
+
+  def __init__(self):
+    # Weight and depth of each movement, indexed
+    # by canonical position and square
+    self.entries = {}
+
+  def add(self, own, opp, square, depth = 0, weight = 1):
+    '''
+    Add a movement of a position
+
+    Params:
+      own    : Bitboard of the color to play
+      opp    : Bitboard of the opposity color
+      square : Square of the movement
+      depth  : Depth of the search that selected it,
+               0 for movements from a text file
+      weight : Times the movement was seen
+
+    Defaults:
+      depth  : 0
+      weight : 1
+    '''
+
+    own, opp, transform = symmetry.canonical( own, opp )
+    square = symmetry.transform_square( square, transform )
+
+    moves = self.entries.setdefault( ( own, opp ), {} )
+    previous_weight, previous_depth = moves.get( square, ( 0, 0 ) )
+
+    moves[ square ] = ( previous_weight + weight, max( previous_depth, depth ) )
+
+  def add_line(self, squares, max_plies = None):
+    '''
+    Add the positions of a game from the start position
+
+    Params:
+      squares   : Squares played, passes are implicit
+      max_plies : Max amount of movements added
+
+    Defaults:
+      max_plies : None, the whole line
+    '''
+
+    own, opp = START_BLACK, START_WHITE
+
+    for ply, square in enumerate( squares ):
+      if max_plies is not None and ply >= max_plies:
+        break
+
+      # Pass when the color to play has no movements
+      if not bitboard.get_moves( own, opp ):
+        own, opp = opp, own
+
+      flips = bitboard.get_flips( own, opp, square )
+
+      if not flips or ( own | opp ) & ( 1 << square ):
+        raise ValueError( "Illegal movement %s on ply %d" % ( format_move( square ), ply + 1 ) )
+
+      self.add( own, opp, square )
+
+      own, opp = opp & ~flips, own | flips | ( 1 << square )
+
+  def add_self_play(self, bot, games, plies, variety = 0.25, seed = 0):
+    '''
+    Add the positions of games played by a bot. Each
+    position is searched once, on its canonical form
+
+    Params:
+      bot     : DunkBot instance, without book, searching
+                with its max_depth
+      games   : Amount of games
+      plies   : Amount of movements of each game
+      variety : Chance of a random movement instead of
+                the best one, so the games differ
+      seed    : Seed of the random movements
+
+    Defaults:
+      variety : 0.25
+      seed    : 0
+    '''
+
+    generator = random.Random( seed )
+    searched = {}
+
+    for game in xrange( games ):
+      black, white = START_BLACK, START_WHITE
+      color = bot.BLACK
+
+      for ply in xrange( plies ):
+        own, opp = ( black, white ) if color == bot.BLACK else ( white, black )
+        moves = bitboard.get_moves( own, opp )
+
+        if not moves:
+          if not bitboard.get_moves( opp, own ):
+            break
+
+          color = bot.opposity_color( color )
+          continue
+
+        key_own, key_opp, transform = symmetry.canonical( own, opp )
+
+        if ( key_own, key_opp ) not in searched:
+          x, y = bot.play( bot.create_board( ( black, white ) ), color )
+          square = int( x + y * 8 )
+
+          searched[ ( key_own, key_opp ) ] = symmetry.transform_square( square, transform )
+          self.add( own, opp, square, depth = bot.max_depth )
+        else:
+          square = symmetry.inverse_square( searched[ ( key_own, key_opp ) ], transform )
+
+        if generator.random() < variety:
+          square = generator.choice( list( bitboard.iter_squares( moves ) ) )
+
+        flips = bitboard.get_flips( own, opp, square )
+        own, opp = own | flips | ( 1 << square ), opp & ~flips
+
+        black, white = ( own, opp ) if color == bot.BLACK else ( opp, own )
+        color = bot.opposity_color( color )
+
+  def write(self, path):
+    '''
+    Write the book file, keeping for each position the
+    movement seen more times, then the deepest one
+
+    Params:
+      path : Path of the book file
+
+    Return:
+      Amount of records written
+    '''
+
+    records = []
+
+    for ( own, opp ), moves in self.entries.iteritems():
+      square, ( weight, depth ) = max( moves.iteritems(), key=lambda item: ( item[1], -item[0] ) )
+      records.append( ( own, opp, square, min( depth, 0xFF ), min( weight, 0xFFFF ) ) )
+
+    records.sort()
+
+    book_file = open( path, "wb" )
+
+    try:
+      book_file.write( HEADER.pack( MAGIC, len( records ) ) )
+
+      for record in records:
+        book_file.write( RECORD.pack( *record ) )
+
+    finally:
+      book_file.close()
+
+    return len( records )
+
+class OpeningBook(object):
+  """
+  OpeningBook
+
+  Read only access to a book file
+  """
+
+  def __init__(self, path):
+    '''
+    OpeningBook Constructor
+
+    Params:
+      path : Path of the book file
+    '''
+
+    self.path = path
+
+    book_file = open( path, "rb" )
+
+    try:
+      self.data = mmap.mmap( book_file.fileno(), 0, access=mmap.ACCESS_READ )
+    finally:
+      book_file.close()
+
+    magic, self.size = HEADER.unpack_from( self.data, 0 )
+
+    if magic != MAGIC or len( self.data ) != HEADER.size + self.size * RECORD.size:
+      self.data.close()
+      raise ValueError( "Invalid book file: %s" % path )
+
+    self.reset_counters()
+
+  def reset_counters(self):
+    '''
+    Reset the lookup counters
+    '''
+
+    self.hits = 0
+    self.misses = 0
+
+  def find(self, own, opp):
+    '''
+    Binary search of a canonical position
+
+    Params:
+      own : Canonical bitboard of the color to play
+      opp : Canonical bitboard of the opposity color
+
+    Return:
+      The record tuple or None
+    '''
+
+    data = self.data
+    key = ( own, opp )
+    low, high = 0, self.size
+
+    while low < high:
+      middle = ( low + high ) >> 1
+      offset = HEADER.size + middle * RECORD.size
+      record_key = KEY.unpack_from( data, offset )
+
+      if record_key < key:
+        low = middle + 1
+      elif record_key > key:
+        high = middle
+      else:
+        return RECORD.unpack_from( data, offset )
+
+    return None
+
+  def lookup(self, own, opp):
+    '''
+    Best movement of a position
+
+    Params:
+      own : Bitboard of the color to play
+      opp : Bitboard of the opposity color
+
+    Return:
+      Square of the movement, None when the position
+      is not on the book
+    '''
+
+    canonical_own, canonical_opp, transform = symmetry.canonical( own, opp )
+    record = self.find( canonical_own, canonical_opp )
+
+    if record is None:
+      self.misses += 1
+      return None
+
+    self.hits += 1
+
+    return symmetry.inverse_square( record[2], transform )
+
+  def stats(self):
+    '''
+    Counters of the lookups
+
+    Return:
+      Dictionary with the amount of records,
+      hits, misses and the hit rate
+    '''
+
+    lookups = self.hits + self.misses
+
+    return {
+      "size": self.size,
+      "hits": self.hits,
+      "misses": self.misses,
+      "hit_rate": float( self.hits ) / lookups if lookups else 0.0
+    }
+
+  def close(self):
+    '''
+    Release the mapped file
+    '''
+
+    self.data.close()
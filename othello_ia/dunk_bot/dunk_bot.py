@@ -1,7 +1,35 @@
 
+import logging
 import numpy as np
 import time
 
+import bitboard
+import parallel
+from board_state import BoardState
+from endgame import EndgameSolver, final_score
+from ordering import MoveOrdering
+from stats import SearchStats, profile_call
+from transposition import TranspositionTable, zobrist_hash
+
+try:
+  from time import monotonic as wall_clock
+except ImportError:
+  from time import time as wall_clock
+
+# Logger of the messages of the bot, with use_logging
+logger = logging.getLogger( "dunk_bot" )
+logger.addHandler( logging.NullHandler() )
+
+class SearchTimeout(Exception):
+  """
+  SearchTimeout
+
+  Raised inside the search when the deadline of
+  the current play is reached, or when the play
+  is stopped from another thread
+  """
+  pass
+
 class DunkBot(object):
   """
   DunkBot
@@ -48,20 +76,198 @@ class DunkBot(object):
      4, -4,  2,  2,  2,  2, -4,  4
   ])
 
-  def __init__(self, max_depth = 4):
+  # Value of each disc of difference on a finished game,
+  # above any score of the unfinished boards
+  TERMINAL_WEIGHT = 1000
+
+  # Search algorithms
+  ALGORITHM_MINIMAX = "minimax"
+  ALGORITHM_PVS = "pvs"
+
+  # Width of the null window of the PVS search
+  PVS_WINDOW = 1e-6
+
+  # Min depth searched with the worker processes,
+  # shallower depths are faster on a single process
+  PARALLEL_DEPTH = 4
+
+  # Subtracted from the shared alpha on the workers, so
+  # movements that tie with the best are searched exactly
+  PARALLEL_MARGIN = 1e-6
+
+  # Nodes searched between two checks of the deadline
+  # and of the stop event
+  CHECK_INTERVAL = 256
+
+  # Position modifier as a tuple, faster to be
+  # indexed by square on the search
+  POSITION_WEIGHTS = tuple( POSITION_MODIFIER.tolist() )
+
+  def __init__(self, max_depth = 4, tt_size = 2 ** 18, tt_replacement = TranspositionTable.REPLACE_DEPTH,
+               evaluator = None, workers = 1, ordering = None, algorithm = ALGORITHM_MINIMAX,
+               endgame_empties = 12, endgame_mode = EndgameSolver.MODE_EXACT, book = None,
+               timing = False, profile = False, use_logging = False):
     """
     Dunk Constructor
 
     Params:
-      max_depth   : Max depth of MiniMax search
+      max_depth       : Max depth of MiniMax search
+      tt_size         : Max entries of the transposition table,
+                        0 disables the table
+      tt_replacement  : Replacement policy of the transposition
+                        table, see TranspositionTable
+      evaluator       : evaluation.Evaluator of the boards at the
+                        max depth, like evaluation.FeatureEvaluator.
+                        The children of the nodes before the max
+                        depth are all evaluated on a single batch,
+                        unless the evaluator is incremental, like
+                        patterns.PatternEvaluator
+      workers         : Amount of processes searching the root
+                        movements. The first movement is searched
+                        before splitting the others over the workers
+      ordering        : MoveOrdering with the move ordering policies
+      algorithm       : ALGORITHM_MINIMAX, Max and Min alpha-beta
+                        functions, or ALGORITHM_PVS, Principal
+                        Variation Search on a negamax function
+      endgame_empties : Max amount of empty squares solved until
+                        the end of the game by the EndgameSolver,
+                        0 disables the solver
+      endgame_mode    : EndgameSolver.MODE_EXACT or
+                        EndgameSolver.MODE_WLD
+      book            : book.OpeningBook checked before
+                        any search
+      timing          : Measure the time of the movement generation
+                        and of the evaluations on the SearchStats
+      profile         : Run each play under cProfile, keeping the
+                        profile on the SearchStats
+      use_logging     : Send the messages to the dunk_bot logger
+                        instead of printing them
 
     Defaults:
-      max_depth   : 4
+      max_depth       : 4
+      tt_size         : 2 ** 18
+      tt_replacement  : TranspositionTable.REPLACE_DEPTH
+      evaluator       : None, score the boards by the pieces
+                        changed by the last movement, see
+                        calculate_score
+      workers         : 1, search on a single process
+      ordering        : MoveOrdering with all policies enabled
+      algorithm       : ALGORITHM_MINIMAX
+      endgame_empties : 12
+      endgame_mode    : EndgameSolver.MODE_EXACT
+      book            : None, always search
+      timing          : False
+      profile         : False
+      use_logging     : False
     """
 
+    if algorithm not in ( self.ALGORITHM_MINIMAX, self.ALGORITHM_PVS ):
+      raise ValueError( "Unknown search algorithm: %s" % algorithm )
+
+    self.use_logging = use_logging
+    self.timing = timing
+    self.profile = profile
+
     self.max_depth = max_depth
+    self.evaluator = evaluator
+    self.algorithm = algorithm
+    self.ordering = ordering if ordering is not None else MoveOrdering()
+
+    # The worker processes are started on the first
+    # parallel search, with a copy of the bot settings
+    self.workers = workers
+    self.splitter = None
+    self.search_id = 0
+    self.worker_options = {
+      "max_depth": max_depth,
+      "tt_size": tt_size,
+      "tt_replacement": tt_replacement,
+      "evaluator": evaluator,
+      "ordering": self.ordering,
+      "algorithm": algorithm
+    }
+
+    self.transposition_table = None
+    self.transposition_color = None
+
+    # Nodes of the solver are counted as search nodes,
+    # so the deadline of the play also stops it
+    self.endgame_empties = endgame_empties
+    self.endgame = EndgameSolver( endgame_mode, self.count_node )
+
+    self.book = book
+
+    # Board changed in place by the search
+    if evaluator is not None:
+      self.search_board = evaluator.create_search_board()
+    else:
+      self.search_board = bitboard.SearchBoard( 0, 0 )
+
+    # Color that started the search
+    self.root_color = None
+
+    # Iterative deepening state
+    self.deadline = None
+    self.stop_event = None
+    self.nodes = 0
+    self.next_check = self.CHECK_INTERVAL
+    self.root_move = None
+    self.root_best = None
+    self.search_report = []
+
+    if tt_size > 0:
+      self.transposition_table = TranspositionTable(
+        size = tt_size,
+        replacement = tt_replacement
+      )
 
-    print "Init with max depth: ",  self.max_depth
+    # Counters of the last play
+    self.stats = SearchStats()
+
+    if timing:
+      self.generate_moves = self.timed( self.generate_moves, "movegen_time" )
+      self.evaluate_leaves = self.timed( self.evaluate_leaves, "evaluation_time" )
+      self.leaf_value = self.timed( self.leaf_value, "evaluation_time" )
+
+    self.log( "Init with max depth:  %s" % self.max_depth )
+
+  def log( self, message ):
+    '''
+    Print a message, or send it to the logger
+    with use_logging
+
+    Params:
+      message : Text of the message
+    '''
+
+    if self.use_logging:
+      logger.info( message )
+    else:
+      print message
+
+  def timed( self, method, counter ):
+    '''
+    Wrap a method to add its time to a counter
+    of the SearchStats
+
+    Params:
+      method  : Bound method
+      counter : Name of the SearchStats attribute
+
+    Return:
+      The wrapped method
+    '''
+
+    def wrapper( *args, **kwargs ):
+      start = wall_clock()
+
+      try:
+        return method( *args, **kwargs )
+      finally:
+        stats = self.stats
+        setattr( stats, counter, getattr( stats, counter ) + wall_clock() - start )
+
+    return wrapper
 
   @property
   def max_depth(self):
@@ -70,6 +276,7 @@ class DunkBot(object):
   @max_depth.setter
   def max_depth(self, value):
       self._max_depth = value
+      self.search_depth = value
 
   def opposity_color(self, color):
     '''
@@ -121,12 +328,17 @@ class DunkBot(object):
 
     print board.reshape((8,8))
 
-  def count_board_score(self, board):
+  def count_board_score(self, board, state = None):
     '''
     Count the current score for each color
 
     Params:
       board : Board used to count the score
+      state : BoardState of the board, kept by
+              set_color_position
+
+    Defaults:
+      state : None, count the pieces of the board
 
     Return:
       Tuple with the current score with
@@ -135,17 +347,28 @@ class DunkBot(object):
       (score_black, score_white)
     '''
 
-    score_black = 0
-    score_white = 0
+    if state is not None:
+      return state.score()
 
-    for place in board:
-      if place == self.BLACK:
-        score_black += 1
-      elif place == self.WHITE:
-        score_white += 1
+    score_black = int( np.count_nonzero( board == self.BLACK ) )
+    score_white = int( np.count_nonzero( board == self.WHITE ) )
 
     return score_black, score_white
 
+  def create_board_state(self, board):
+    '''
+    Create the BoardState of a board, to be
+    kept by set_color_position
+
+    Params:
+      board : Board array
+
+    Return:
+      BoardState instance
+    '''
+
+    return BoardState( *self.create_bitboard( board ) )
+
   def get_value(self, board, x, y):
     '''
     Get the value of a position on a board
@@ -194,6 +417,9 @@ class DunkBot(object):
     '''
     Return a list of position of a determined color
 
+    Kept as the reference implementation for the
+    bitboard engine
+
     Params:
       board : Board to search the color
       color : Color to be searched
@@ -214,7 +440,7 @@ class DunkBot(object):
 
     return color_positions
 
-  def set_color_position(self, board, position, color):
+  def set_color_position(self, board, position, color, state = None):
     '''
     Change all pieces on the board that are vertical,
     horizontal or diagonal with the passed position
@@ -224,44 +450,41 @@ class DunkBot(object):
       position : Final position used as anchor for
                  changing
       color    : Color to be setted on the board
+      state    : BoardState of the board, updated
+                 with the changed pieces
+
+    Defaults:
+      state    : None
     '''
 
     if (position == self.NOPE_MOVE).all(): return
 
-    for action in self.ACTIONS:
-
-      test_position = position + action
+    x, y = position
 
-      while True:
-        try:
-          local_state = self.get_value( board, *test_position )
+    if not (0 <= x <= 7 and 0 <= y <= 7):
+        raise IndexError
 
-          if local_state == color:
+    own = bitboard.from_array( board, color )
+    opp = bitboard.from_array( board, self.opposity_color( color ) )
 
-            self.set_color_direction(
-              board = board,
-              base_position = position,
-              final_position = test_position,
-              action = action,
-              color = color
-            )
+    flips = bitboard.get_flips( own, opp, x + y * 8 )
 
-            break
+    board[ x + y * 8 ] = color
 
-          elif local_state == self.EMPTY:
-            break
-
-          test_position += action
-
-        except IndexError, e:
-            break
+    for square in bitboard.iter_squares( flips ):
+      board[ square ] = color
 
+    if state is not None:
+      state.place( x + y * 8, bitboard.count( flips ), color == self.BLACK )
 
   def set_color_direction(self, board, base_position, final_position, action, color):
     '''
     Set color to the board in the direction of the action
     from the base_position until reach the final_position
 
+    Walks the board array one square at time. Kept as the
+    reference implementation for the bitboard engine
+
     Params:
       board          : Board where the color will be setted
       base_position  : Starting position for changing
@@ -305,24 +528,66 @@ class DunkBot(object):
     score = 0
 
     if parent:
-        diff = parent["board"] != board
+        black, white = board
+        parent_black, parent_white = parent["board"]
+
+        diff = ( parent_black ^ black ) | ( parent_white ^ white )
 
         score = 0
-        score += np.count_nonzero( diff ) - 1
+        score += bitboard.count( diff ) - 1
         score += self.get_value( self.POSITION_MODIFIER, *move )
 
     return score
 
+  def create_bitboard(self, board):
+    '''
+    Convert a board array, as read by utils.convert_board_from_file,
+    to the bitboard representation used on the search
+
+    Params:
+      board : Board array to be converted
+
+    Return:
+      Tuple with the black and white bitboards
+
+      (black, white)
+    '''
+
+    return (
+      bitboard.from_array( board, self.BLACK ),
+      bitboard.from_array( board, self.WHITE )
+    )
+
+  def create_board(self, bitboards):
+    '''
+    Convert a bitboard tuple back to a board array
+
+    Params:
+      bitboards : Tuple with the black and white bitboards
+
+    Return:
+      Board array on the same format of
+      utils.convert_board_from_file
+    '''
+
+    black, white = bitboards
+
+    return bitboard.to_array(
+      [ (black, self.BLACK), (white, self.WHITE) ],
+      self.EMPTY
+    )
+
   def create_node(self, board, parent, action, move):
     '''
     Create a new node based the new board
 
     Params:
       board  : New created board that this node will
-               represent
+               represent, as a ( black, white ) bitboard tuple
       parent : Parent node from the current node was
                originated
-      action : Action used the create the new node
+      action : Bitboard with the pieces flipped to create
+               the new node
       move   : Final position where the new pieces
                will be placed
 
@@ -345,6 +610,9 @@ class DunkBot(object):
     '''
     Test if a action movement based on a position and color is valid
 
+    Walks the board array one square at time. Kept as the
+    reference implementation for the bitboard engine
+
     Params:
       base_position : Starting position to init the movement
       board         : Board where the movement will be tested
@@ -391,6 +659,9 @@ class DunkBot(object):
     Exapnd a node based on a color. Create all valid new board
     derived from the base node board
 
+    Each legal square creates a single node, with the
+    movements generated on the bitboard representation
+
     Params:
       node  : Node to be expanded
       color : Color used to expand the current board
@@ -401,41 +672,205 @@ class DunkBot(object):
 
     result_list = []
 
-    color_positions = self.get_color_positions( node["board"], color )
+    black, white = node["board"]
 
-    for base_position in color_positions:
+    if color == self.BLACK:
+      own, opp = black, white
+    else:
+      own, opp = white, black
 
-      for action in self.ACTIONS:
+    moves = bitboard.get_moves( own, opp )
 
-        valid, final_position = self.execute_action(
-          base_position = base_position,
-          board = node["board"],
-          action = action,
-          current_color = color
-        )
+    for square in bitboard.iter_squares( moves ):
 
-        if valid:
+      flips = bitboard.get_flips( own, opp, square )
+      bit = 1 << square
 
-          new_board = node["board"].copy()
+      if color == self.BLACK:
+        new_board = ( black | bit | flips, white ^ flips )
+      else:
+        new_board = ( black ^ flips, white | bit | flips )
 
-          self.set_color_position(
-            board = new_board,
-            position = final_position,
-            color = color
-          )
-
-          result_list.append(
-            self.create_node(
-              board = new_board,
-              parent = node,
-              action = action,
-              move = final_position
-            )
-          )
+      result_list.append(
+        self.create_node(
+          board = new_board,
+          parent = node,
+          action = flips,
+          move = np.array( bitboard.square_position( square ) )
+        )
+      )
 
     return result_list
 
   # MiniMax Alpha-Beta Implementation
+  #
+  # The search keeps a single SearchBoard, applying each
+  # movement before searching the child and reverting it
+  # after, instead of creating a node with a board copy
+  # for every child
+
+  def generate_moves( self, color ):
+    '''
+    Generate the movements of a color on the search board
+
+    Params:
+      color : Color to play
+
+    Return:
+      List of tuples ( score, square, flips ), where score
+      is the same of calculate_score for the child
+    '''
+
+    board = self.search_board
+
+    if color == self.BLACK:
+      own, opp = board.black, board.white
+    else:
+      own, opp = board.white, board.black
+
+    moves = bitboard.get_moves( own, opp )
+    weights = self.POSITION_WEIGHTS
+    get_flips = bitboard.get_flips
+    count = bitboard.count
+
+    children = []
+
+    while moves:
+      bit = moves & -moves
+      moves ^= bit
+      square = bit.bit_length() - 1
+
+      flips = get_flips( own, opp, square )
+      children.append( ( count( flips ) + weights[ square ], square, flips ) )
+
+    stats = self.stats
+    stats.expanded += 1
+    stats.children += len( children )
+
+    return children
+
+  def evaluate_leaves( self, color, children ):
+    '''
+    Evaluate on a single batch all children of the
+    search board, from the view of the root color
+
+    Params:
+      color    : Color playing the children movements
+      children : List of generated movements
+
+    Return:
+      List of scores, one for each child
+    '''
+
+    board = self.search_board
+
+    self.stats.leaf_evaluations += len( children )
+
+    flips = np.array( [ child[2] for child in children ], dtype=np.uint64 )
+    bits = np.array( [ 1 << child[1] for child in children ], dtype=np.uint64 )
+
+    black = np.uint64( board.black )
+    white = np.uint64( board.white )
+
+    if color == self.BLACK:
+      black, white = black | flips | bits, white ^ flips
+    else:
+      black, white = black ^ flips, white | flips | bits
+
+    self.nodes += len( children )
+
+    return self.evaluator.evaluate_bitboards(
+      black, white, self.root_color == self.BLACK, color != self.BLACK
+    ).tolist()
+
+  def has_moves( self, color ):
+    '''
+    Check if a color can play on the search board
+
+    Params:
+      color : Color to check
+
+    Return:
+      True if the color has at least one movement
+    '''
+
+    board = self.search_board
+
+    if color == self.BLACK:
+      return bitboard.get_moves( board.black, board.white ) != 0
+
+    return bitboard.get_moves( board.white, board.black ) != 0
+
+  def terminal_value( self ):
+    '''
+    Value of a finished game on the search board, the
+    final disc difference with the empty squares given
+    to the winner
+
+    Return:
+      Value from the view of the root color
+    '''
+
+    board = self.search_board
+
+    if self.root_color == self.BLACK:
+      return self.TERMINAL_WEIGHT * final_score( board.black, board.white )
+
+    return self.TERMINAL_WEIGHT * final_score( board.white, board.black )
+
+  def leaf_value( self, color, score ):
+    '''
+    Value of the search board at the max depth
+
+    Params:
+      color : Color to play on the search board
+      score : Score of the movement that created
+              the search board
+
+    Return:
+      Value from the view of the root color
+    '''
+
+    board = self.search_board
+
+    self.stats.leaf_evaluations += 1
+
+    if board.black | board.white == bitboard.FULL:
+      return self.terminal_value()
+
+    # Only boards after a pass, or every board with an
+    # incremental evaluator, reach the max depth without
+    # a batch evaluation
+    if self.evaluator is not None:
+      return self.evaluator.evaluate_board( board, self.root_color == self.BLACK, color == self.BLACK )
+
+    return score
+
+  def batch_leaves( self, ply, children ):
+    '''
+    Check if the children of the search board are
+    evaluated on a single batch
+
+    Params:
+      ply      : Depth of the search board
+      children : List of generated movements
+
+    Return:
+      True with an evaluator that is not incremental, on
+      the ply before the max depth, unless the children
+      fill the board
+    '''
+
+    if self.evaluator is None or self.evaluator.incremental:
+      return False
+
+    if ply + 1 != self.search_depth or not children:
+      return False
+
+    board = self.search_board
+    empties = ~( board.black | board.white ) & bitboard.FULL
+
+    return empties & ( empties - 1 ) != 0
 
   def select_move( self, root_node, color ):
     '''
@@ -451,115 +886,643 @@ class DunkBot(object):
       The best movement available after the search
     '''
 
-    value, node = self.select_max_value(
-      node = root_node,
+    black, white = root_node["board"]
+    self.search_board.reset( black, white )
+    self.root_color = color
+
+    value, square = self.search_root( color )
+
+    if square is None:
+      return self.NOPE_MOVE
+
+    return np.array( bitboard.square_position( square ) )
+
+  def search_root( self, color ):
+    '''
+    Search the search board at the current search depth,
+    with the selected algorithm
+
+    Params:
+      color : Color to play on the search board
+
+    Return:
+      A tuple with two values:
+        value : Value of the best movement
+        move  : Best square
+    '''
+
+    if self.workers > 1 and self.search_depth >= self.PARALLEL_DEPTH:
+      return self.select_root_parallel( color )
+
+    if self.algorithm == self.ALGORITHM_PVS:
+      return self.select_pvs_value(
+        color = color,
+        ply = 0,
+        alpha = float("-inf"),
+        beta = float("inf"),
+        score = 0
+      )
+
+    return self.select_max_value(
       color = color,
+      ply = 0,
+      alpha = float("-inf"),
+      beta = float("inf"),
+      score = 0
+    )
+
+  def search_reply( self, color, alpha, beta, score ):
+    '''
+    Search the search board after a root movement,
+    with the selected algorithm
+
+    Params:
+      color : Color replying to the root movement
+      alpha : The best Max Value
+      beta  : The best Min Value
+      score : Score of the root movement
+
+    Return:
+      Value of the board from the view of the root color
+    '''
+
+    if self.algorithm == self.ALGORITHM_PVS:
+      value, move = self.select_pvs_value(
+        color = color,
+        ply = 1,
+        alpha = -beta,
+        beta = -alpha,
+        score = score
+      )
+
+      return -value
+
+    value, move = self.select_min_value(
+      color = color,
+      ply = 1,
+      alpha = alpha,
+      beta = beta,
+      score = score
+    )
+
+    return value
+
+  def select_root_parallel( self, color ):
+    '''
+    Max value search of the root splitting the movements
+    over the worker processes
+
+    The first movement is searched on this process, then
+    the others are searched by the workers with its value
+    as alpha. The root is ordered as on the serial search,
+    see ordering, and as there the first movement with the
+    best value is selected
+
+    Can raise a SearchTimeout if the deadline is reached,
+    with root_best holding the best movement already
+    fully searched
+
+    Params:
+      color : Color to play on the search board
+
+    Return:
+      A tuple with two values:
+        alpha : Best Max Value
+        move  : Best square
+    '''
+
+    board = self.search_board
+    black, white = board.black, board.white
+
+    children = self.generate_moves( color )
+
+    self.ordering.order(
+      children, color != self.BLACK, 0, None, self.root_move, True
+    )
+
+    if not children:
+      return float("-inf"), None
+
+    # Young brothers wait for the eldest one
+    child_score, square, flips = children[0]
+
+    board.play( square, flips, color == self.BLACK )
+
+    value = self.search_reply(
+      color = self.opposity_color( color ),
       alpha = float("-inf"),
-      beta = float("inf")
+      beta = float("inf"),
+      score = child_score
     )
 
-    return node["move"] if node else self.NOPE_MOVE
+    board.undo()
+
+    best_value, best_move = value, square
+    self.root_best = ( best_value, best_move )
+
+    self.ordering.clear_pv( 0 )
+    self.ordering.update_pv( 0, square, self.search_depth == 1 )
+
+    if self.splitter is None:
+      self.splitter = parallel.RootSplitter( self.__class__, self.worker_options, self.workers )
+
+    self.search_id += 1
+
+    tasks = [
+      ( self.search_id, black, white, color, square, flips, child_score,
+        self.search_depth, self.deadline, self.PARALLEL_MARGIN )
+      for child_score, square, flips in children[1:]
+    ]
+
+    results = self.splitter.search( tasks, best_value )
+
+    timeout = False
+
+    for task, ( value, alpha, nodes ) in zip( tasks, results ):
+      self.nodes += nodes
+
+      if value is None:
+        timeout = True
+
+      elif value > alpha and value > best_value:
+        best_value, best_move = value, task[4]
+        self.root_best = ( best_value, best_move )
+
+        # The variation found by the worker is not known
+        self.ordering.update_pv( 0, best_move, True )
+
+    if timeout:
+      raise SearchTimeout
+
+    return best_value, best_move
+
+  def close( self ):
+    '''
+    Stop the worker processes of the parallel search
+    '''
+
+    if self.splitter is not None:
+      self.splitter.close()
+      self.splitter = None
+
+  def count_node( self ):
+    '''
+    Count a searched node and check the deadline
+    and the stop event of the current play
+
+    Can raise a SearchTimeout if the deadline
+    is reached or the play is stopped
+    '''
+
+    self.nodes += 1
+
+    if self.nodes >= self.next_check:
+      self.check_deadline()
+
+  def reset_nodes( self ):
+    '''
+    Start counting the nodes of a new search
+    '''
+
+    self.nodes = 0
+    self.next_check = self.CHECK_INTERVAL
+
+  def check_deadline( self ):
+    '''
+    Check the deadline and the stop event of the
+    current play, the next check is CHECK_INTERVAL
+    nodes later. The batches of leaves count many
+    nodes at once, so the check is on a threshold
+    and not on a multiple of the interval
+
+    Can raise a SearchTimeout if the deadline
+    is reached or the play is stopped
+    '''
+
+    self.next_check = self.nodes + self.CHECK_INTERVAL
+
+    if self.deadline is not None and wall_clock() >= self.deadline:
+      raise SearchTimeout
+
+    if self.stop_event is not None and self.stop_event.is_set():
+      raise SearchTimeout
+
+  def probe_transposition( self, color, ply, alpha, beta ):
+    '''
+    Search the current board on the transposition table
 
-  def select_max_value( self, node, color, alpha, beta ):
+    Params:
+      color : Color to play on the board
+      ply   : Depth of the board on the search
+      alpha : The best Max Value
+      beta  : The best Min Value
+
+    Return:
+      A tuple with five values:
+        key   : Hash of the board, None without table
+        value : Stored value if it ends the search of
+                the board, None otherwise
+        alpha : Alpha narrowed by the stored bound
+        beta  : Beta narrowed by the stored bound
+        move  : Best square stored for the board, or None
+    '''
+
+    if self.transposition_table is None:
+      return None, None, alpha, beta, None
+
+    board = self.search_board
+    key = zobrist_hash( board.black, board.white, color == self.BLACK )
+
+    entry = self.transposition_table.probe( key )
+
+    if entry is None:
+      return key, None, alpha, beta, None
+
+    depth, value, bound, move = entry
+
+    # The root always search to find the best movement
+    if ply > 0 and depth >= self.search_depth - ply:
+
+      if bound == TranspositionTable.EXACT:
+        return key, value, alpha, beta, move
+      elif bound == TranspositionTable.LOWER:
+        alpha = max( alpha, value )
+      elif bound == TranspositionTable.UPPER:
+        beta = min( beta, value )
+
+      if alpha >= beta:
+        return key, value, alpha, beta, move
+
+    return key, None, alpha, beta, move
+
+  def select_max_value( self, color, ply, alpha, beta, score ):
     '''
     Max value search part of the MiniMax Alpha-Beta search
 
     Params:
-      node  : Base node on the Max value search
-      color : Color to expand on the board
+      color : Color to play on the search board
+      ply   : Depth of the search board
       alpha : The best Max Value
       beta  : The best Min Value
+      score : Score of the movement that created
+              the search board
 
     Return:
       A tuple with two values:
         alpha : Best Max Value
-        node  : Best node on the current search
+        move  : Best square on the current search
     '''
 
-    if node["depth"] == self.max_depth:
-      return node["score"], node
+    self.count_node()
 
-    expand_list = self.expand(
-      node = node,
-      color = color
-    )
+    if ply == self.search_depth:
+      return self.leaf_value( color, score ), None
+
+    alpha_start, beta_start = alpha, beta
 
-    expand_list.sort( key=lambda node: node["score"] )
-    expand_list.reverse()
+    ordering = self.ordering
+    ordering.clear_pv( ply )
 
+    key, value, alpha, beta, tt_move = self.probe_transposition( color, ply, alpha, beta )
+
+    if value is not None:
+      return value, tt_move
+
+    children = self.generate_moves( color )
+
+    board = self.search_board
+    black = color == self.BLACK
     other_color = self.opposity_color( color )
 
-    best_node = None
+    # Pass, or the end of the game if both colors can not play
+    if not children:
+
+      if not self.has_moves( other_color ):
+        return self.terminal_value(), None
 
-    for child_node in expand_list:
+      board.play_pass( black )
 
-      min_value, min_node = self.select_min_value(
-        node = child_node,
+      min_value, min_move = self.select_min_value(
         color = other_color,
+        ply = ply + 1,
         alpha = alpha,
-        beta = beta
+        beta = beta,
+        score = score
       )
 
+      board.undo()
+
+      ordering.update_pv( ply, None, ply + 1 == self.search_depth )
+
+      return min_value, None
+
+    if ply == 0:
+      pv_move = self.root_move
+    else:
+      pv_move = self.ordering.pv_move( ply, self.search_board.squares )
+
+    ordering.order( children, color != self.BLACK, ply, tt_move, pv_move, True )
+
+    best_move = None
+
+    leaf_values = None
+
+    if self.batch_leaves( ply, children ):
+      leaf_values = self.evaluate_leaves( color, children )
+
+    for idx, ( child_score, square, flips ) in enumerate( children ):
+
+      if leaf_values is not None:
+        min_value = leaf_values[ idx ]
+
+      else:
+        board.play( square, flips, black )
+
+        min_value, min_move = self.select_min_value(
+          color = other_color,
+          ply = ply + 1,
+          alpha = alpha,
+          beta = beta,
+          score = child_score
+        )
+
+        board.undo()
+
       if min_value > alpha:
         alpha = min_value
+        best_move = square
 
-        if node["depth"] == 0:
-          best_node = child_node
+        ordering.update_pv( ply, square, leaf_values is not None )
+
+        if ply == 0:
+          self.root_best = ( alpha, square )
 
       if alpha >= beta:
+        ordering.record_cutoff( color != self.BLACK, ply, square, self.search_depth - ply, idx )
         break
 
-    return alpha, best_node
+    if key is not None:
+
+      if alpha <= alpha_start:
+        bound = TranspositionTable.UPPER
+      elif alpha >= beta_start:
+        bound = TranspositionTable.LOWER
+      else:
+        bound = TranspositionTable.EXACT
+
+      self.transposition_table.store(
+        key, self.search_depth - ply, alpha, bound, best_move
+      )
 
-  def select_min_value( self, node, color, alpha, beta ):
+    return alpha, best_move
+
+  def select_min_value( self, color, ply, alpha, beta, score ):
     '''
     Min value search part of the MiniMax Alpha-Beta search
 
     Params:
-      node  : Base node on the Max value search
-      color : Color to expand on the board
+      color : Color to play on the search board
+      ply   : Depth of the search board
       alpha : The best Max Value
       beta  : The best Min Value
+      score : Score of the movement that created
+              the search board
 
     Return:
       A tuple with two values:
         beta : Best Min Value
-        node  : Best node on the current search
+        move : Best square on the current search
     '''
 
-    if node["depth"] == self.max_depth:
-      return node["score"], node
+    self.count_node()
 
-    expand_list = self.expand(
-      node = node,
-      color = color
-    )
+    if ply == self.search_depth:
+      return self.leaf_value( color, score ), None
+
+    alpha_start, beta_start = alpha, beta
 
-    expand_list.sort( key=lambda node: node["score"] )
+    ordering = self.ordering
+    ordering.clear_pv( ply )
 
+    key, value, alpha, beta, tt_move = self.probe_transposition( color, ply, alpha, beta )
+
+    if value is not None:
+      return value, tt_move
+
+    children = self.generate_moves( color )
+
+    board = self.search_board
+    black = color == self.BLACK
     other_color = self.opposity_color( color )
 
-    best_node = None
+    # Pass, or the end of the game if both colors can not play
+    if not children:
+
+      if not self.has_moves( other_color ):
+        return self.terminal_value(), None
 
-    for child_node in expand_list:
+      board.play_pass( black )
 
-      max_value, max_node = self.select_max_value(
-        node = child_node,
+      max_value, max_move = self.select_max_value(
         color = other_color,
+        ply = ply + 1,
         alpha = alpha,
-        beta = beta
+        beta = beta,
+        score = score
       )
 
+      board.undo()
+
+      ordering.update_pv( ply, None, ply + 1 == self.search_depth )
+
+      return max_value, None
+
+    pv_move = self.ordering.pv_move( ply, self.search_board.squares )
+
+    ordering.order( children, color != self.BLACK, ply, tt_move, pv_move, False )
+
+    best_move = None
+
+    leaf_values = None
+
+    if self.batch_leaves( ply, children ):
+      leaf_values = self.evaluate_leaves( color, children )
+
+    for idx, ( child_score, square, flips ) in enumerate( children ):
+
+      if leaf_values is not None:
+        max_value = leaf_values[ idx ]
+
+      else:
+        board.play( square, flips, black )
+
+        max_value, max_move = self.select_max_value(
+          color = other_color,
+          ply = ply + 1,
+          alpha = alpha,
+          beta = beta,
+          score = child_score
+        )
+
+        board.undo()
+
       if max_value < beta:
         beta = max_value
+        best_move = square
 
-        if node["depth"] == 0:
-          best_node = child_node
+        ordering.update_pv( ply, square, leaf_values is not None )
 
       if beta <= alpha:
+        ordering.record_cutoff( color != self.BLACK, ply, square, self.search_depth - ply, idx )
+        break
+
+    if key is not None:
+
+      if beta >= beta_start:
+        bound = TranspositionTable.LOWER
+      elif beta <= alpha_start:
+        bound = TranspositionTable.UPPER
+      else:
+        bound = TranspositionTable.EXACT
+
+      self.transposition_table.store(
+        key, self.search_depth - ply, beta, bound, best_move
+      )
+
+    return beta, best_move
+
+  # Principal Variation Search Implementation
+
+  def select_pvs_value( self, color, ply, alpha, beta, score ):
+    '''
+    Principal Variation Search, on a negamax function. The
+    first child is searched with the full window, the others
+    with a null window, searched again when they fail high
+
+    Params:
+      color : Color to play on the search board
+      ply   : Depth of the search board
+      alpha : Best value of the color to play
+      beta  : Best value of the opposity color, negated
+      score : Score of the movement that created
+              the search board
+
+    Return:
+      A tuple with two values:
+        alpha : Best value from the view of the color to play
+        move  : Best square on the current search
+    '''
+
+    self.count_node()
+
+    root_view = color == self.root_color
+
+    if ply == self.search_depth:
+      value = self.leaf_value( color, score )
+      return ( value if root_view else -value ), None
+
+    alpha_start, beta_start = alpha, beta
+
+    ordering = self.ordering
+    ordering.clear_pv( ply )
+
+    key, value, alpha, beta, tt_move = self.probe_transposition( color, ply, alpha, beta )
+
+    if value is not None:
+      return value, tt_move
+
+    children = self.generate_moves( color )
+
+    board = self.search_board
+    black = color == self.BLACK
+    other_color = self.opposity_color( color )
+
+    # Pass, or the end of the game if both colors can not play
+    if not children:
+
+      if not self.has_moves( other_color ):
+        value = self.terminal_value()
+        return ( value if root_view else -value ), None
+
+      board.play_pass( black )
+
+      value, move = self.select_pvs_value( other_color, ply + 1, -beta, -alpha, score )
+
+      board.undo()
+
+      ordering.update_pv( ply, None, ply + 1 == self.search_depth )
+
+      return -value, None
+
+    if ply == 0:
+      pv_move = self.root_move
+    else:
+      pv_move = ordering.pv_move( ply, self.search_board.squares )
+
+    ordering.order( children, color != self.BLACK, ply, tt_move, pv_move, root_view )
+
+    best_move = None
+
+    leaf_values = None
+
+    if self.batch_leaves( ply, children ):
+      leaf_values = self.evaluate_leaves( color, children )
+
+      if not root_view:
+        leaf_values = [ -leaf_value for leaf_value in leaf_values ]
+
+    for idx, ( child_score, square, flips ) in enumerate( children ):
+
+      if leaf_values is not None:
+        child_value = leaf_values[ idx ]
+
+      else:
+        board.play( square, flips, black )
+
+        if idx == 0:
+          child_value, child_move = self.select_pvs_value( other_color, ply + 1, -beta, -alpha, child_score )
+          child_value = -child_value
+
+        else:
+          child_value, child_move = self.select_pvs_value(
+            other_color, ply + 1, -alpha - self.PVS_WINDOW, -alpha, child_score
+          )
+          child_value = -child_value
+
+          # Fail high, search again with the full window
+          if alpha < child_value < beta:
+            child_value, child_move = self.select_pvs_value( other_color, ply + 1, -beta, -alpha, child_score )
+            child_value = -child_value
+
+        board.undo()
+
+      if child_value > alpha:
+        alpha = child_value
+        best_move = square
+
+        ordering.update_pv( ply, square, leaf_values is not None )
+
+        if ply == 0:
+          self.root_best = ( alpha, square )
+
+      if alpha >= beta:
+        ordering.record_cutoff( color != self.BLACK, ply, square, self.search_depth - ply, idx )
         break
 
-    return beta, best_node
+    if key is not None:
+
+      if alpha <= alpha_start:
+        bound = TranspositionTable.UPPER
+      elif alpha >= beta_start:
+        bound = TranspositionTable.LOWER
+      else:
+        bound = TranspositionTable.EXACT
+
+      self.transposition_table.store(
+        key, self.search_depth - ply, alpha, bound, best_move
+      )
+
+    return alpha, best_move
 
   def list_moves( self, board, color ):
     '''
@@ -576,28 +1539,89 @@ class DunkBot(object):
 
     color = self.transform_color( color )
 
-    source_node = self.create_node(
-      board = board,
-      parent = None,
-      action = None,
-      move = None
-    )
+    black, white = self.create_bitboard( board )
 
-    expand_list = self.expand(
-      node = source_node,
-      color = color
-    )
+    if color == self.BLACK:
+      moves = bitboard.get_moves( black, white )
+    else:
+      moves = bitboard.get_moves( white, black )
 
-    return np.array( [ node["move"] for node in expand_list ] )
+    return np.array( [
+      bitboard.square_position( square )
+      for square in bitboard.iter_squares( moves )
+    ] )
 
-  def play( self, board, color ):
+  def play( self, board, color, time_limit = None, stop = None ):
     '''
     Entry point for the bot thinking process
 
+    Searches with iterative deepening, from depth 1 until
+    max_depth, starting each depth by the best movement
+    of the previous one. With a time limit the search in
+    progress is aborted at the deadline and the best
+    fully searched movement is returned
+
+    Positions found on the book are played without search.
+    With endgame_empties or less empty squares the board
+    is solved by the EndgameSolver. When the solver reaches
+    the deadline the depth limited search runs instead
+
+    The timing of each depth is kept on search_report,
+    and the counters of the play on stats
+
+    A stop event set from another thread aborts the play
+    like the deadline, even on the first depth, so the
+    movement can be NOPE_MOVE. Worker processes of a
+    parallel search only stop at their deadline
+
     Params:
-      board : Base board where the bot will search
-              the best movement
-      color : Color which the bot must search for
+      board      : Base board where the bot will search
+                   the best movement
+      color      : Color which the bot must search for
+      time_limit : Seconds of wall clock available for
+                   the search
+      stop       : threading.Event that aborts the play
+
+    Defaults:
+      time_limit : None, search until max_depth
+      stop       : None, the play can not be stopped
+
+    Return:
+      The best movement for the color
+    '''
+
+    start = wall_clock()
+
+    self.stats = SearchStats()
+    self.stop_event = stop
+
+    try:
+      if self.profile:
+        move, self.stats.profile = profile_call( self.search_move, board, color, time_limit )
+      else:
+        move = self.search_move( board, color, time_limit )
+    finally:
+      self.stop_event = None
+
+    time_lapse = wall_clock() - start
+
+    self.stats.finish( self, time_lapse )
+
+    if self.stats.source != "book":
+      self.log( "Time lapse:  %s" % time_lapse )
+
+    return move
+
+  def search_move( self, board, color, time_limit ):
+    '''
+    Find the movement of a play, see play
+
+    Params:
+      board      : Base board where the bot will search
+                   the best movement
+      color      : Color which the bot must search for
+      time_limit : Seconds of wall clock available for
+                   the search, or None
 
     Return:
       The best movement for the color
@@ -605,18 +1629,232 @@ class DunkBot(object):
 
     color = self.transform_color( color )
 
-    root_node = self.create_node(
-      board = board,
-      parent = None,
-      action = None,
-      move = None
-    )
+    black, white = self.create_bitboard( board )
+
+    self.reset_nodes()
+    self.search_report = []
+
+    if self.book is not None:
+      found, move = self.play_book( black, white, color )
+
+      if found:
+        self.stats.source = "book"
+        return move
+
+    if self.transposition_table is not None:
 
-    start = time.clock()
+      # Stored values are from the view of the color
+      # that started the search
+      if self.transposition_color != color:
+        self.transposition_table.clear()
+        self.transposition_color = color
 
-    move = self.select_move( root_node, color )
+      self.transposition_table.new_search()
+      self.transposition_table.reset_counters()
+
+    self.ordering.new_search()
+
+    start = wall_clock()
+
+    deadline = start + time_limit if time_limit is not None else None
+    self.root_move = None
+
+    self.root_color = color
+
+    # No need to search deeper than the empty squares
+    empties = 64 - bitboard.count( black | white )
+
+    move = self.NOPE_MOVE
+
+    if empties <= self.endgame_empties:
+      solved, move = self.solve_endgame( black, white, color, empties, deadline )
+
+      if solved:
+        self.stats.source = "endgame"
+        return move
+
+    try:
+      for depth in xrange( 1, min( self.max_depth, max( empties, 1 ) ) + 1 ):
+        depth_start = wall_clock()
+        depth_nodes = self.nodes
+
+        self.search_depth = depth
+        self.root_best = None
+
+        # The first depth always completes, so there
+        # is a movement to return
+        self.deadline = deadline if depth > 1 else None
+
+        self.search_board.reset( black, white )
+
+        try:
+          value, square = self.search_root( color )
+          completed = True
 
-    time_lapse = time.clock() - start
-    print "Time lapse: ", time_lapse
+        except SearchTimeout:
+
+          # Root movements already searched are exact,
+          # the first one is the previous best movement
+          value, square = self.root_best if self.root_best else ( None, None )
+          completed = False
+
+        if square is not None:
+          move = np.array( bitboard.square_position( square ) )
+          self.root_move = square
+
+        if completed:
+          self.ordering.new_iteration()
+
+        self.search_report.append( {
+          "depth": depth,
+          "completed": completed,
+          "move": tuple( move ),
+          "value": value,
+          "pv": [ bitboard.square_position( pv_square ) if pv_square is not None else None
+                  for pv_square in self.ordering.principal_variation() ],
+          "nodes": self.nodes - depth_nodes,
+          "time": wall_clock() - depth_start
+        } )
+
+        if not completed or square is None: break
+
+    finally:
+      self.search_depth = self.max_depth
+      self.deadline = None
+
+    self.stats.source = "search"
 
     return move
+
+  def play_book( self, black, white, color ):
+    '''
+    Search the root board on the opening book
+
+    The book movement is kept on search_report with
+    depth 0
+
+    Params:
+      black : Black bitboard of the root
+      white : White bitboard of the root
+      color : Color to play
+
+    Return:
+      A tuple with two values:
+        found : True if the board is on the book
+        move  : Book movement for the color
+    '''
+
+    own, opp = ( black, white ) if color == self.BLACK else ( white, black )
+
+    start = wall_clock()
+    square = self.book.lookup( own, opp )
+
+    # A damaged book must not play illegal movements
+    if square is None or not bitboard.get_moves( own, opp ) & ( 1 << square ):
+      return False, self.NOPE_MOVE
+
+    move = np.array( bitboard.square_position( square ) )
+
+    self.search_report.append( {
+      "depth": 0,
+      "completed": True,
+      "move": tuple( move ),
+      "value": None,
+      "pv": [ tuple( move ) ],
+      "nodes": 0,
+      "time": wall_clock() - start
+    } )
+
+    return True, move
+
+  def book_stats( self ):
+    '''
+    Counters of the opening book
+
+    Return:
+      Dictionary with the book counters, or None
+      without book
+    '''
+
+    if self.book is None:
+      return None
+
+    return self.book.stats()
+
+  def solve_endgame( self, black, white, color, empties, deadline ):
+    '''
+    Solve the root board until the end of the game
+
+    The result is kept on search_report with the amount
+    of empty squares as depth
+
+    Params:
+      black    : Black bitboard of the root
+      white    : White bitboard of the root
+      color    : Color to play
+      empties  : Amount of empty squares
+      deadline : Wall clock deadline, or None
+
+    Return:
+      A tuple with two values:
+        solved : False if the deadline was reached
+        move   : Best movement for the color
+    '''
+
+    own, opp = ( black, white ) if color == self.BLACK else ( white, black )
+
+    start = wall_clock()
+    start_nodes = self.nodes
+
+    self.deadline = deadline
+    move = self.NOPE_MOVE
+
+    try:
+      value, square = self.endgame.solve( own, opp )
+      solved = True
+
+    except SearchTimeout:
+      value, square = None, None
+      solved = False
+
+    finally:
+      self.deadline = None
+
+    if square is not None:
+      move = np.array( bitboard.square_position( square ) )
+
+    self.search_report.append( {
+      "depth": empties,
+      "completed": solved,
+      "move": tuple( move ),
+      "value": value,
+      "pv": [ bitboard.square_position( square ) ] if square is not None else [],
+      "nodes": self.nodes - start_nodes,
+      "time": wall_clock() - start
+    } )
+
+    return solved, move
+
+  def print_report( self ):
+    '''
+    Pretty print the timing of each depth
+    of the last search
+    '''
+
+    for report in self.search_report:
+      line = "Depth %(depth)2d %(move)s value %(value)s nodes %(nodes)d time %(time).4f" % report
+      self.log( line if report["completed"] else line + " (aborted)" )
+
+  def transposition_stats( self ):
+    '''
+    Counters of the transposition table on the last search
+
+    Return:
+      Dictionary with the table counters, or None when
+      the table is disabled
+    '''
+
+    if self.transposition_table is None:
+      return None
+
+    return self.transposition_table.stats()
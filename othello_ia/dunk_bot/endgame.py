@@ -0,0 +1,415 @@
+'''
+Endgame
+
+Exact solver for the last empty squares. The search goes
+until the end of the game and scores the final disc
+difference, with the empty squares counted for the winner
+
+Two modes are available:
+
+  exact : Exact disc difference, window ( -64, 64 )
+  wld   : Only win, loss or draw, window ( -1, 1 ), much
+          faster since most movements are cut at once
+
+Movements are ordered fastest-first, fewer replies of the
+opponent first, while many squares are empty. Near the end
+only the parity of the quadrants is used, squares on
+quadrants with an odd amount of empties first. The last
+1, 2 and 3 empties are searched over the empty squares
+without the movement generation
+
+Bounds of the positions with many empties are kept on a
+table, with the best square searched first when they are
+found again
+'''
+
+from bitboard import FULL, count, iter_squares, get_moves, get_flips
+
+# Squares of each quadrant of the board
+QUADRANTS = (
+  0x000000000F0F0F0F,
+  0x00000000F0F0F0F0,
+  0x0F0F0F0F00000000,
+  0xF0F0F0F000000000,
+)
+
+# Quadrant mask of each square
+SQUARE_QUADRANT = tuple(
+  [ quadrant for quadrant in QUADRANTS if quadrant & ( 1 << square ) ][0]
+  for square in xrange(64)
+)
+
+def final_score(own, opp):
+  '''
+  Score of a finished game, the empty squares
+  are given to the winner
+
+  Params:
+    own : Bitboard of the color to play
+    opp : Bitboard of the opposity color
+
+  Return:
+    Disc difference from the view of own
+  '''
+
+  own_count = count( own )
+  opp_count = count( opp )
+  diff = own_count - opp_count
+
+  if diff > 0:
+    return diff + 64 - own_count - opp_count
+  if diff < 0:
+    return diff - 64 + own_count + opp_count
+
+  return 0
+
+def parity_order(squares, empties):
+  '''
+  Order squares by the parity of their quadrant
+
+  Params:
+    squares : List of square indexes
+    empties : Bitboard of the empty squares
+
+  Return:
+    List of squares, the ones on quadrants with an
+    odd amount of empties first
+  '''
+
+  odd = []
+  even = []
+
+  for square in squares:
+    if count( empties & SQUARE_QUADRANT[ square ] ) & 1:
+      odd.append( square )
+    else:
+      even.append( square )
+
+  return odd + even
+
+class EndgameSolver(object):
+  """
+  EndgameSolver
+
+  Negamax alpha-beta search until the end of the game
+  """
+
+  # Solver modes
+  MODE_EXACT = "exact"
+  MODE_WLD = "wld"
+
+  # Min amount of empties ordered by the replies of the
+  # opponent, below it only the parity is used
+  FASTEST_FIRST_EMPTIES = 7
+
+  # Amount of empties searched without movement generation
+  SMALL_EMPTIES = 3
+
+  # Min amount of empties kept on the table of bounds
+  TABLE_EMPTIES = 7
+
+  def __init__(self, mode = MODE_EXACT, count_node = None):
+    '''
+    EndgameSolver Constructor
+
+    Params:
+      mode       : MODE_EXACT or MODE_WLD
+      count_node : Function called on each searched node,
+                   can raise an exception to stop the search
+
+    Defaults:
+      mode       : MODE_EXACT
+      count_node : None, only count the nodes
+    '''
+
+    if mode not in ( self.MODE_EXACT, self.MODE_WLD ):
+      raise ValueError( "Unknown endgame mode: %s" % mode )
+
+    self.mode = mode
+    self.nodes = 0
+    self.node_callback = count_node
+
+    # Bounds of the solved positions, indexed by ( own, opp ),
+    # with tuples ( lower, upper, move )
+    self.table = {}
+
+  def count_node(self):
+    '''
+    Count a searched node
+    '''
+
+    self.nodes += 1
+
+    if self.node_callback is not None:
+      self.node_callback()
+
+  def solve(self, own, opp):
+    '''
+    Solve a position
+
+    Params:
+      own : Bitboard of the color to play
+      opp : Bitboard of the opposity color
+
+    Return:
+      A tuple with two values:
+        value : Final disc difference from the view of own
+                on MODE_EXACT, 1, 0 or -1 for win, draw or
+                loss on MODE_WLD
+        move  : Best square, None without legal movements
+    '''
+
+    self.nodes = 0
+    self.table = {}
+
+    if self.mode == self.MODE_EXACT:
+      alpha, beta = -64, 64
+    else:
+      alpha, beta = -1, 1
+
+    empties = ~( own | opp ) & FULL
+    empty_count = count( empties )
+    moves = get_moves( own, opp )
+
+    self.count_node()
+
+    if not moves:
+      if not get_moves( opp, own ):
+        value = final_score( own, opp )
+      else:
+        value = -self.search( opp, own, -beta, -alpha, empty_count, True )
+
+      return self.result( value ), None
+
+    best_value = -65
+    best_move = None
+
+    for square, flips in self.order_moves( own, opp, moves, empties, empty_count ):
+      value = -self.search(
+        opp & ~flips, own | flips | ( 1 << square ), -beta, -max( alpha, best_value ), empty_count - 1, False
+      )
+
+      if value > best_value:
+        best_value = value
+        best_move = square
+
+        if value >= beta:
+          break
+
+    return self.result( best_value ), best_move
+
+  def result(self, value):
+    '''
+    Convert a search value to the value of the mode
+    '''
+
+    if self.mode == self.MODE_WLD:
+      return ( value > 0 ) - ( value < 0 )
+
+    return value
+
+  def order_moves(self, own, opp, moves, empties, empty_count, first = None):
+    '''
+    Order the legal movements of a position
+
+    Params:
+      own         : Bitboard of the color to play
+      opp         : Bitboard of the opposity color
+      moves       : Bitboard of the legal movements
+      empties     : Bitboard of the empty squares
+      empty_count : Amount of empty squares
+      first       : Square searched before the others
+
+    Defaults:
+      first       : None
+
+    Return:
+      List of tuples ( square, flips )
+    '''
+
+    squares = parity_order( list( iter_squares( moves ) ), empties )
+
+    children = [ ( square, get_flips( own, opp, square ) ) for square in squares ]
+
+    if empty_count >= self.FASTEST_FIRST_EMPTIES:
+
+      # Stable sort, the parity order breaks the ties
+      def replies(child):
+        square, flips = child
+        return count( get_moves( opp & ~flips, own | flips | ( 1 << square ) ) )
+
+      children.sort( key=replies )
+
+    if first is not None:
+      for idx, child in enumerate( children ):
+        if child[0] == first:
+          children.insert( 0, children.pop( idx ) )
+          break
+
+    return children
+
+  def search(self, own, opp, alpha, beta, empty_count, passed):
+    '''
+    Fail-soft negamax search until the end of the game
+
+    Params:
+      own         : Bitboard of the color to play
+      opp         : Bitboard of the opposity color
+      alpha       : Best value of the color to play
+      beta        : Best value of the opposity color, negated
+      empty_count : Amount of empty squares
+      passed      : True if the last movement was a pass
+
+    Return:
+      Final disc difference from the view of own, or
+      a bound of it outside of the window
+    '''
+
+    if empty_count <= self.SMALL_EMPTIES:
+      empties = ~( own | opp ) & FULL
+
+      if empty_count == 1:
+        self.count_node()
+        return self.solve_last( own, opp, empties.bit_length() - 1 )
+
+      squares = list( iter_squares( empties ) )
+
+      if empty_count == 3:
+        squares = parity_order( squares, empties )
+
+      return self.search_small( own, opp, alpha, beta, squares, passed )
+
+    self.count_node()
+
+    moves = get_moves( own, opp )
+
+    if not moves:
+      if passed:
+        return final_score( own, opp )
+
+      return -self.search( opp, own, -beta, -alpha, empty_count, True )
+
+    key = None
+    first = None
+
+    if empty_count >= self.TABLE_EMPTIES:
+      key = ( own, opp )
+      entry = self.table.get( key )
+
+      if entry is not None:
+        lower, upper, first = entry
+
+        if lower >= beta: return lower
+        if upper <= alpha: return upper
+        if lower == upper: return lower
+
+        alpha = max( alpha, lower )
+        beta = min( beta, upper )
+
+    alpha_start = alpha
+    empties = ~( own | opp ) & FULL
+    best_value = -65
+    best_move = None
+
+    for square, flips in self.order_moves( own, opp, moves, empties, empty_count, first ):
+      value = -self.search(
+        opp & ~flips, own | flips | ( 1 << square ), -beta, -max( alpha, best_value ), empty_count - 1, False
+      )
+
+      if value > best_value:
+        best_value = value
+        best_move = square
+
+        if value >= beta:
+          break
+
+    if key is not None:
+      lower, upper, move = self.table.get( key, ( -64, 64, None ) )
+
+      if best_value >= beta:
+        lower = best_value
+      elif best_value <= alpha_start:
+        upper = best_value
+      else:
+        lower = upper = best_value
+
+      self.table[ key ] = ( lower, upper, best_move )
+
+    return best_value
+
+  def search_small(self, own, opp, alpha, beta, squares, passed):
+    '''
+    Search of the last 2 and 3 empties, trying each empty
+    square directly instead of generating the movements
+
+    Params:
+      own     : Bitboard of the color to play
+      opp     : Bitboard of the opposity color
+      alpha   : Best value of the color to play
+      beta    : Best value of the opposity color, negated
+      squares : List of the empty squares, in search order
+      passed  : True if the last movement was a pass
+
+    Return:
+      Final disc difference from the view of own, or
+      a bound of it outside of the window
+    '''
+
+    self.count_node()
+
+    best_value = -65
+
+    for idx, square in enumerate( squares ):
+      flips = get_flips( own, opp, square )
+
+      if not flips: continue
+
+      new_own = own | flips | ( 1 << square )
+      new_opp = opp & ~flips
+
+      if len( squares ) == 2:
+        self.count_node()
+        value = -self.solve_last( new_opp, new_own, squares[ 1 - idx ] )
+      else:
+        value = -self.search_small(
+          new_opp, new_own, -beta, -max( alpha, best_value ), squares[ :idx ] + squares[ idx + 1: ], False
+        )
+
+      if value > best_value:
+        best_value = value
+
+        if value >= beta:
+          return best_value
+
+    if best_value > -65:
+      return best_value
+
+    if passed:
+      return final_score( own, opp )
+
+    return -self.search_small( opp, own, -beta, -alpha, squares, True )
+
+  def solve_last(self, own, opp, square):
+    '''
+    Exact score of the last empty square
+
+    Params:
+      own    : Bitboard of the color to play
+      opp    : Bitboard of the opposity color
+      square : The empty square
+
+    Return:
+      Final disc difference from the view of own
+    '''
+
+    flips = get_flips( own, opp, square )
+
+    if flips:
+      return final_score( own | flips | ( 1 << square ), opp & ~flips )
+
+    flips = get_flips( opp, own, square )
+
+    if flips:
+      return final_score( own & ~flips, opp | flips | ( 1 << square ) )
+
+    return final_score( own, opp )
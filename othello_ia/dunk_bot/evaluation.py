@@ -0,0 +1,690 @@
+'''
+Evaluation
+
+Vectorized evaluation of many boards at once. Boards are
+stacked on a ( N, 64 ) int8 array, with 1 for black pieces,
+-1 for white pieces and 0 for empty squares, or given as
+arrays of black and white bitboards
+
+Evaluators implement the Evaluator interface. The
+FeatureEvaluator sums weighted feature terms, with one
+weight table for each phase of the game, loaded from a
+JSON weight file:
+
+  {
+    "phases": 3,
+    "weights": {
+      "discs": [ 0.0, 0.5, 2.0 ],
+      "mobility": 2.0,
+      ...
+    },
+    "position": [ 64 weights ] or [ [ 64 weights ], ... ]
+  }
+
+A single value is used on all phases. Terms missing on
+the file have weight 0 and are not computed
+'''
+
+import json
+import os
+
+import numpy as np
+
+import bitboard
+
+FULL = np.uint64( 0xFFFFFFFFFFFFFFFF )
+
+# Columns that receive pieces wrapped from the other
+# side of the board on horizontal shifts
+NOT_A = np.uint64( 0xFEFEFEFEFEFEFEFE )
+NOT_H = np.uint64( 0x7F7F7F7F7F7F7F7F )
+
+# Shift amounts and the masks applied after the shift, with
+# one row for each direction. Left shifts go DOWN, RIGHT,
+# DOWN_RIGHT and DOWN_LEFT, right shifts go UP, LEFT, UP_LEFT
+# and UP_RIGHT
+LEFT_AMOUNTS = np.array( [ 8, 1, 9, 7 ], dtype=np.uint64 ).reshape( 4, 1 )
+LEFT_MASKS = np.array( [ FULL, NOT_A, NOT_A, NOT_H ], dtype=np.uint64 ).reshape( 4, 1 )
+
+RIGHT_AMOUNTS = np.array( [ 8, 1, 9, 7 ], dtype=np.uint64 ).reshape( 4, 1 )
+RIGHT_MASKS = np.array( [ FULL, NOT_H, NOT_H, NOT_A ], dtype=np.uint64 ).reshape( 4, 1 )
+
+# Squares without a neighbour on each direction pair, with
+# the same rows of the shift amounts
+BORDERS = np.array( [
+  0xFF000000000000FF, 0x8181818181818181, 0xFF818181818181FF, 0xFF818181818181FF
+], dtype=np.uint64 ).reshape( 4, 1 )
+
+CORNERS = np.uint64( 0x8100000000000081 )
+
+# First bit of each row and each column
+ROW_BITS = np.uint64( 0x0101010101010101 )
+COLUMN_BITS = np.uint64( 0xFF )
+
+# Amount of setted bits of each byte value
+POPCOUNT = np.array( [ bin( value ).count( "1" ) for value in xrange(256) ], dtype=np.int32 )
+
+def count(bits):
+  '''
+  Count the setted bits of each bitboard
+
+  Params:
+    bits : Array of uint64 bitboards
+
+  Return:
+    Array of int32 counts
+  '''
+
+  bits = np.ascontiguousarray( bits, dtype='<u8' )
+
+  return POPCOUNT[ bits.view( np.uint8 ) ].reshape( -1, 8 ).sum( axis=1 )
+
+def get_moves(own, opp):
+  '''
+  Legal movements of many boards at once, same
+  result of bitboard.get_moves for each board
+
+  All directions are filled together, on a ( 4, N )
+  array for each shift side
+
+  Params:
+    own : Array of bitboards of the color to play
+    opp : Array of bitboards of the opposity color
+
+  Return:
+    Array of bitboards with the legal movements
+  '''
+
+  own = np.asarray( own, dtype=np.uint64 )
+  opp = np.asarray( opp, dtype=np.uint64 )
+
+  # Left shifts
+  masked = opp & LEFT_MASKS
+  t = masked & ( own << LEFT_AMOUNTS )
+  t |= masked & ( t << LEFT_AMOUNTS ); t |= masked & ( t << LEFT_AMOUNTS )
+  t |= masked & ( t << LEFT_AMOUNTS ); t |= masked & ( t << LEFT_AMOUNTS )
+  t |= masked & ( t << LEFT_AMOUNTS )
+  moves = np.bitwise_or.reduce( ( t << LEFT_AMOUNTS ) & LEFT_MASKS, axis=0 )
+
+  # Right shifts
+  masked = opp & RIGHT_MASKS
+  t = masked & ( own >> RIGHT_AMOUNTS )
+  t |= masked & ( t >> RIGHT_AMOUNTS ); t |= masked & ( t >> RIGHT_AMOUNTS )
+  t |= masked & ( t >> RIGHT_AMOUNTS ); t |= masked & ( t >> RIGHT_AMOUNTS )
+  t |= masked & ( t >> RIGHT_AMOUNTS )
+  moves |= np.bitwise_or.reduce( ( t >> RIGHT_AMOUNTS ) & RIGHT_MASKS, axis=0 )
+
+  return moves & ~( own | opp )
+
+def get_neighbours(bits):
+  '''
+  Squares around the pieces of many bitboards
+
+  Params:
+    bits : Array of uint64 bitboards
+
+  Return:
+    Array of bitboards with the squares touching
+    at least one piece
+  '''
+
+  bits = np.asarray( bits, dtype=np.uint64 )
+
+  neighbours = np.bitwise_or.reduce( ( bits << LEFT_AMOUNTS ) & LEFT_MASKS, axis=0 )
+  neighbours |= np.bitwise_or.reduce( ( bits >> RIGHT_AMOUNTS ) & RIGHT_MASKS, axis=0 )
+
+  return neighbours
+
+def get_full_lines(occupied):
+  '''
+  Squares on completely filled columns and rows
+
+  Params:
+    occupied : Array of bitboards of the occupied squares
+
+  Return:
+    Array of ( 4, N ) bitboards, with the rows of the
+    shift amounts. Filled diagonals are not searched
+  '''
+
+  occupied = np.asarray( occupied, dtype=np.uint64 )
+
+  # First bit of each row holds the AND of the row
+  rows = occupied & ( occupied >> np.uint64(4) )
+  rows &= rows >> np.uint64(2)
+  rows &= rows >> np.uint64(1)
+  rows = ( rows & ROW_BITS ) * np.uint64( 0xFF )
+
+  # First row holds the AND of each column
+  columns = occupied & ( occupied >> np.uint64(32) )
+  columns &= columns >> np.uint64(16)
+  columns &= columns >> np.uint64(8)
+  columns = ( columns & COLUMN_BITS ) * ROW_BITS
+
+  zeros = np.zeros_like( occupied )
+
+  return np.array( [ columns, rows, zeros, zeros ] )
+
+def get_stable(own, opp, iterations = 16):
+  '''
+  Conservative count of the stable pieces, that can not be
+  flipped for the rest of the game. A piece is stable when,
+  on each of the 4 lines through it, a neighbour is the
+  border or a stable piece of the same color, or the line
+  is filled. Stable pieces grow from the corners until
+  nothing changes
+
+  Params:
+    own        : Array of bitboards of a color
+    opp        : Array of bitboards of the opposity color
+    iterations : Max amount of growing steps
+
+  Defaults:
+    iterations : 16
+
+  Return:
+    Array of bitboards with the stable pieces of own
+  '''
+
+  own = np.asarray( own, dtype=np.uint64 )
+  opp = np.asarray( opp, dtype=np.uint64 )
+
+  fixed = BORDERS | get_full_lines( own | opp )
+  stable = np.zeros_like( own )
+
+  for _ in xrange( iterations ):
+    safe = fixed | ( ( stable << LEFT_AMOUNTS ) & LEFT_MASKS ) | ( ( stable >> RIGHT_AMOUNTS ) & RIGHT_MASKS )
+    grown = own & np.bitwise_and.reduce( safe, axis=0 )
+
+    if np.array_equal( grown, stable ):
+      break
+
+    stable = grown
+
+  return stable
+
+def get_phases(black, white, phases):
+  '''
+  Phase of the game of each board, by the amount of pieces
+
+  Params:
+    black  : Array of uint64 black bitboards
+    white  : Array of uint64 white bitboards
+    phases : Amount of phases
+
+  Return:
+    Array of phase indexes, from 0 to phases - 1
+  '''
+
+  pieces = count( np.asarray( black, dtype=np.uint64 ) | np.asarray( white, dtype=np.uint64 ) )
+
+  return np.clip( ( pieces - 4 ) * phases // 61, 0, phases - 1 )
+
+def pack_boards(boards):
+  '''
+  Convert a ( N, 64 ) int8 array of boards to
+  black and white bitboard arrays
+
+  Params:
+    boards : Array of int8 boards
+
+  Return:
+    A tuple with two arrays:
+      black : uint64 bitboards of the black pieces
+      white : uint64 bitboards of the white pieces
+  '''
+
+  boards = np.asarray( boards ).reshape( -1, 8, 8 )
+
+  def pack(mask):
+    # packbits puts the first square on the high bit
+    packed = np.packbits( mask[ :, :, ::-1 ], axis=2 )
+    return np.ascontiguousarray( packed.reshape( -1, 8 ) ).view( '<u8' ).reshape( -1 ).astype( np.uint64 )
+
+  return pack( boards == 1 ), pack( boards == -1 )
+
+def unpack_boards(black, white):
+  '''
+  Convert black and white bitboards to a ( N, 64 )
+  int8 array of boards
+
+  Params:
+    black : Black bitboards, array or list of integers
+    white : White bitboards, array or list of integers
+
+  Return:
+    Array of int8 boards
+  '''
+
+  def unpack(bits):
+    bits = np.asarray( bits, dtype='<u8' ).reshape( -1 )
+    unpacked = np.unpackbits( bits.view( np.uint8 ).reshape( -1, 8, 1 ), axis=2 )
+    return unpacked[ :, :, ::-1 ].reshape( -1, 64 ).astype( np.int8 )
+
+  return unpack( black ) - unpack( white )
+
+class Evaluator(object):
+  """
+  Evaluator
+
+  Interface of the evaluators of DunkBot. Boards are
+  evaluated on batches, unless the evaluator is
+  incremental: then each leaf of the search is
+  evaluated alone, on the board created by
+  create_search_board
+  """
+
+  # True to evaluate the leaves one by one
+  # with evaluate_board
+  incremental = False
+
+  def create_search_board(self):
+    '''
+    Create the board changed in place by the search
+
+    Return:
+      A SearchBoard instance
+    '''
+
+    return bitboard.SearchBoard( 0, 0 )
+
+  def evaluate_board(self, board, black_view = True, black_to_move = None):
+    '''
+    Evaluate a single search board
+
+    Params:
+      board         : Board created by create_search_board
+      black_view    : True to score from the black view,
+                      False from the white view
+      black_to_move : True if black plays next, False if
+                      white plays, None if unknown
+
+    Defaults:
+      black_view    : True
+      black_to_move : None
+
+    Return:
+      Float score
+    '''
+
+    return self.evaluate_bitboards( [ board.black ], [ board.white ], black_view, black_to_move )[0]
+
+  def evaluate_bitboards(self, black, white, black_view = True, black_to_move = None):
+    '''
+    Evaluate boards given as bitboard arrays
+
+    Params:
+      black         : Array of uint64 black bitboards
+      white         : Array of uint64 white bitboards
+      black_view    : True to score from the black view,
+                      False from the white view
+      black_to_move : True if black plays next on all boards,
+                      False if white plays, None if unknown
+
+    Defaults:
+      black_view    : True
+      black_to_move : None
+
+    Return:
+      Array of float scores, one for each board
+    '''
+
+    raise NotImplementedError
+
+  def evaluate(self, boards, black_view = True, black_to_move = None):
+    '''
+    Evaluate a ( N, 64 ) int8 array of boards
+
+    Params:
+      boards        : Array of int8 boards
+      black_view    : True to score from the black view,
+                      False from the white view
+      black_to_move : True if black plays next on all boards,
+                      False if white plays, None if unknown
+
+    Defaults:
+      black_view    : True
+      black_to_move : None
+
+    Return:
+      Array of float scores, one for each board
+    '''
+
+    black, white = pack_boards( boards )
+
+    return self.evaluate_bitboards( black, white, black_view, black_to_move )
+
+class BatchEvaluator(Evaluator):
+  """
+  BatchEvaluator
+
+  Linear evaluation of positional weights, disc count,
+  mobility and frontier pieces, computed for a whole
+  batch of boards with NumPy operations
+  """
+
+  def __init__(self, position_weights, disc_weight = 1.0, mobility_weight = 2.0, frontier_weight = 1.0):
+    '''
+    BatchEvaluator Constructor
+
+    Params:
+      position_weights : 64 weights, one for each square
+      disc_weight      : Weight of the disc difference
+      mobility_weight  : Weight of the difference of
+                         legal movements
+      frontier_weight  : Weight of the difference of
+                         pieces touching empty squares
+
+    Defaults:
+      disc_weight      : 1.0
+      mobility_weight  : 2.0
+      frontier_weight  : 1.0
+    '''
+
+    self.position_weights = np.asarray( position_weights, dtype=np.float64 ).reshape( 64 )
+    self.disc_weight = disc_weight
+    self.mobility_weight = mobility_weight
+    self.frontier_weight = frontier_weight
+
+    # Sum of the position weights for each value of
+    # each byte of a bitboard
+    self.byte_weights = np.array( [
+      [
+        sum( self.position_weights[ byte * 8 + bit ] for bit in xrange(8) if value & ( 1 << bit ) )
+        for value in xrange(256)
+      ]
+      for byte in xrange(8)
+    ] )
+
+  def position_score(self, bits):
+    '''
+    Sum of the position weights of the pieces
+
+    Params:
+      bits : Array of uint64 bitboards
+
+    Return:
+      Array of float scores
+    '''
+
+    bits = np.ascontiguousarray( bits, dtype='<u8' )
+    values = bits.view( np.uint8 ).reshape( -1, 8 )
+
+    return self.byte_weights[ np.arange(8), values ].sum( axis=1 )
+
+  def evaluate_bitboards(self, black, white, black_view = True, black_to_move = None):
+    '''
+    Evaluate boards given as bitboard arrays, see
+    Evaluator.evaluate_bitboards. The color to
+    move is not used
+    '''
+
+    if black_view:
+      own, opp = black, white
+    else:
+      own, opp = white, black
+
+    own = np.asarray( own, dtype=np.uint64 )
+    opp = np.asarray( opp, dtype=np.uint64 )
+
+    score = self.position_score( own ) - self.position_score( opp )
+
+    if self.disc_weight:
+      score += self.disc_weight * ( count( own ) - count( opp ) )
+
+    if self.mobility_weight:
+      # Both colors on a single batch
+      size = len( own )
+      moves = count( get_moves( np.concatenate( (own, opp) ), np.concatenate( (opp, own) ) ) )
+      score += self.mobility_weight * ( moves[ :size ] - moves[ size: ] )
+
+    if self.frontier_weight:
+      frontier = get_neighbours( ~( own | opp ) )
+      score += self.frontier_weight * ( count( opp & frontier ) - count( own & frontier ) )
+
+    return score
+
+# Weight file of the FeatureEvaluator shipped with the bot
+DEFAULT_WEIGHTS = os.path.join( os.path.dirname( os.path.abspath(__file__) ), "weights", "features.json" )
+
+def load_weights(path = DEFAULT_WEIGHTS):
+  '''
+  Load a weight file of the FeatureEvaluator
+
+  Params:
+    path : Path of the JSON weight file
+
+  Defaults:
+    path : DEFAULT_WEIGHTS
+
+  Return:
+    Dictionary with the weights
+  '''
+
+  weight_file = open( path, "r" )
+
+  try:
+    return json.load( weight_file )
+  finally:
+    weight_file.close()
+
+def save_weights(weights, path):
+  '''
+  Write a weight file of the FeatureEvaluator
+
+  Params:
+    weights : Dictionary with the weights
+    path    : Path of the JSON weight file
+  '''
+
+  weight_file = open( path, "w" )
+
+  try:
+    json.dump( weights, weight_file, indent=2, sort_keys=True )
+  finally:
+    weight_file.close()
+
+class FeatureEvaluator(Evaluator):
+  """
+  FeatureEvaluator
+
+  Weighted sum of feature terms, all of them as the
+  difference between the view color and the other:
+
+    position           : Position weights of the pieces
+    discs              : Pieces
+    mobility           : Legal movements
+    potential_mobility : Empty squares next to the other
+                         color pieces
+    frontier           : Pieces next to empty squares,
+                         counted against the color
+    stable             : Pieces that can not be flipped
+    corners            : Pieces on the corners
+    parity             : 1 when the color should make the
+                         last movement of the game, -1
+                         otherwise. Needs the color to move
+
+  Each term has one weight for each phase of the game
+  """
+
+  TERMS = (
+    "discs", "mobility", "potential_mobility", "frontier", "stable", "corners", "parity"
+  )
+
+  def __init__(self, weights = None):
+    '''
+    FeatureEvaluator Constructor
+
+    Params:
+      weights : Dictionary with the weights, on the same
+                format of the weight files
+
+    Defaults:
+      weights : Weights of DEFAULT_WEIGHTS
+    '''
+
+    if weights is None:
+      weights = load_weights()
+
+    self.phases = int( weights.get( "phases", 1 ) )
+
+    term_weights = weights.get( "weights", {} )
+
+    for term in term_weights:
+      if term not in self.TERMS:
+        raise ValueError( "Unknown evaluation term: %s" % term )
+
+    # Weights indexed by term and phase
+    self.weights = dict(
+      ( term, self.phase_weights( term_weights[ term ] ) )
+      for term in self.TERMS
+      if np.any( self.phase_weights( term_weights.get( term, 0.0 ) ) )
+    )
+
+    position = np.asarray( weights.get( "position", np.zeros( 64 ) ), dtype=np.float64 )
+    position = np.broadcast_to( position.reshape( -1, 64 ), ( self.phases, 64 ) )
+
+    # Sum of the position weights for each phase and each
+    # value of each byte of a bitboard
+    self.byte_weights = None
+
+    if np.any( position ):
+      bits = ( ( np.arange(256).reshape( 256, 1 ) >> np.arange(8) ) & 1 ).astype( np.float64 )
+      self.byte_weights = np.einsum( "vb,pyb->pyv", bits, position.reshape( self.phases, 8, 8 ) )
+
+  def phase_weights(self, value):
+    '''
+    Convert the weight of a term to one weight per phase
+
+    Params:
+      value : Single weight or list with one per phase
+
+    Return:
+      Array of weights
+    '''
+
+    value = np.asarray( value, dtype=np.float64 ).reshape( -1 )
+
+    if value.size == 1:
+      return np.repeat( value, self.phases )
+
+    if value.size != self.phases:
+      raise ValueError( "Expected %d phase weights, found %d" % ( self.phases, value.size ) )
+
+    return value
+
+  def position_score(self, bits, phase):
+    '''
+    Sum of the position weights of the pieces
+
+    Params:
+      bits  : Array of uint64 bitboards
+      phase : Array of phase indexes
+
+    Return:
+      Array of float scores
+    '''
+
+    values = np.ascontiguousarray( bits, dtype='<u8' ).view( np.uint8 ).reshape( -1, 8 )
+
+    return self.byte_weights[ phase.reshape( -1, 1 ), np.arange(8), values ].sum( axis=1 )
+
+  def features(self, black, white, black_view = True, black_to_move = None):
+    '''
+    Compute the feature terms with a non zero weight. The
+    pieces of all terms are counted on a single batch
+
+    Params:
+      black         : Array of uint64 black bitboards
+      white         : Array of uint64 white bitboards
+      black_view    : True to compute from the black view
+      black_to_move : True if black plays next on all boards,
+                      False if white plays, None if unknown
+
+    Defaults:
+      black_view    : True
+      black_to_move : None
+
+    Return:
+      A tuple with two values:
+        empties  : Array with the empty squares of each board
+        features : Dictionary of arrays, one value for
+                   each board
+    '''
+
+    own, opp = ( black, white ) if black_view else ( white, black )
+    size = len( own )
+
+    weights = self.weights
+    empty = ~( own | opp )
+
+    # Term and the pieces counted for and against it
+    pairs = []
+
+    if "discs" in weights:
+      pairs.append( ( "discs", own, opp ) )
+
+    if "mobility" in weights:
+      moves = get_moves( np.concatenate( (own, opp) ), np.concatenate( (opp, own) ) )
+      pairs.append( ( "mobility", moves[ :size ], moves[ size: ] ) )
+
+    if "potential_mobility" in weights or "frontier" in weights:
+      neighbours = get_neighbours( np.concatenate( (opp, own, empty) ) )
+
+      if "potential_mobility" in weights:
+        pairs.append( ( "potential_mobility", neighbours[ :size ] & empty, neighbours[ size:2 * size ] & empty ) )
+
+      if "frontier" in weights:
+        frontier = neighbours[ 2 * size: ]
+        pairs.append( ( "frontier", opp & frontier, own & frontier ) )
+
+    if "stable" in weights:
+      stable = get_stable( np.concatenate( (own, opp) ), np.concatenate( (opp, own) ) )
+      pairs.append( ( "stable", stable[ :size ], stable[ size: ] ) )
+
+    if "corners" in weights:
+      pairs.append( ( "corners", own & CORNERS, opp & CORNERS ) )
+
+    counts = count( np.concatenate( [ empty ] + [ bits for pair in pairs for bits in pair[1:] ] ) ).reshape( -1, size )
+
+    empties = counts[0]
+    features = {}
+
+    for idx, ( term, own_bits, opp_bits ) in enumerate( pairs ):
+      features[ term ] = counts[ 2 * idx + 1 ] - counts[ 2 * idx + 2 ]
+
+    if "parity" in weights:
+      if black_to_move is None:
+        features["parity"] = np.zeros( size )
+      else:
+        # The color to move makes the last movement when
+        # the amount of empties is odd, without passes
+        sign = 1 if black_to_move == black_view else -1
+        features["parity"] = np.where( empties == 0, 0, np.where( empties & 1, sign, -sign ) )
+
+    return empties, features
+
+  def evaluate_bitboards(self, black, white, black_view = True, black_to_move = None):
+    '''
+    Evaluate boards given as bitboard arrays, see
+    Evaluator.evaluate_bitboards
+    '''
+
+    black = np.asarray( black, dtype=np.uint64 ).reshape( -1 )
+    white = np.asarray( white, dtype=np.uint64 ).reshape( -1 )
+
+    empties, features = self.features( black, white, black_view, black_to_move )
+
+    # Same phases of get_phases
+    phase = np.minimum( ( 60 - empties ) * self.phases // 61, self.phases - 1 )
+
+    score = np.zeros( len( black ) )
+
+    if self.byte_weights is not None:
+      own, opp = ( black, white ) if black_view else ( white, black )
+      score += self.position_score( own, phase ) - self.position_score( opp, phase )
+
+    for term, value in features.iteritems():
+      score += self.weights[ term ][ phase ] * value
+
+    return score
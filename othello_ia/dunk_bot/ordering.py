@@ -0,0 +1,283 @@
+'''
+Ordering
+
+Move ordering policies of the search. Each policy can be
+switched on and off:
+
+  pv      : Principal variation of the previous depth first,
+            then the best square from the transposition table
+  killers : Two squares per ply that produced a cutoff
+  history : Score per color and square, raised by each cutoff
+  corners : Corner squares before the others
+
+The remaining children keep the order of their static score
+
+The root is ordered only by the principal variation, the
+corners and the static score. The killers, the history and
+the table depend on the subtrees searched so far, which are
+not the same when the root is split over worker processes,
+so the root order and the movement chosen among the ones of
+the same value do not depend on the amount of workers
+'''
+
+# Corner squares of the board
+CORNERS = frozenset( [ 0, 7, 56, 63 ] )
+
+class MoveOrdering(object):
+  """
+  MoveOrdering
+
+  Orders the children of the search nodes and counts
+  how often the first child produces the cutoff
+  """
+
+  def __init__(self, pv = True, killers = True, history = True, corners = True, max_ply = 128):
+    '''
+    MoveOrdering Constructor
+
+    Params:
+      pv      : Search the principal variation and the
+                transposition table square first
+      killers : Use two killer squares per ply
+      history : Use the history table
+      corners : Search the corners first
+      max_ply : Max depth of the search
+
+    Defaults:
+      pv      : True
+      killers : True
+      history : True
+      corners : True
+      max_ply : 128
+    '''
+
+    self.use_pv = pv
+    self.use_killers = killers
+    self.use_history = history
+    self.use_corners = corners
+    self.max_ply = max_ply
+
+    # History table indexed by color ( 0 black, 1 white )
+    # and square
+    self.history = [ [ 0 ] * 64, [ 0 ] * 64 ]
+
+    self.killers = [ [ None, None ] for _ in xrange( max_ply ) ]
+
+    # Triangular table of the principal variation of
+    # the current depth, and the complete one of the
+    # previous depth
+    self.pv_table = [ [] for _ in xrange( max_ply + 1 ) ]
+    self.previous_pv = []
+
+    self.reset_counters()
+
+  def reset_counters(self):
+    '''
+    Reset the cutoff counters
+    '''
+
+    self.cutoffs = 0
+    self.first_cutoffs = 0
+    self.ply_cutoffs = [ 0 ] * self.max_ply
+    self.ply_first_cutoffs = [ 0 ] * self.max_ply
+
+  def new_search(self):
+    '''
+    Prepare for the search of a new position. The killer
+    squares are removed and the history is aged
+    '''
+
+    for killers in self.killers:
+      killers[0] = killers[1] = None
+
+    for table in self.history:
+      for square in xrange(64):
+        table[ square ] >>= 1
+
+    self.previous_pv = []
+    self.reset_counters()
+
+  def new_iteration(self):
+    '''
+    Keep the principal variation of the last
+    completed depth
+    '''
+
+    if self.pv_table[0]:
+      self.previous_pv = list( self.pv_table[0] )
+
+  def principal_variation(self):
+    '''
+    Return:
+      List of squares of the principal variation of
+      the last completed depth
+    '''
+
+    return list( self.previous_pv )
+
+  def pv_move(self, ply, path):
+    '''
+    Square of the previous principal variation at a ply,
+    when the search is still following it
+
+    Params:
+      ply  : Depth of the node
+      path : Squares played from the root to the node
+
+    Return:
+      The square or None
+    '''
+
+    previous_pv = self.previous_pv
+
+    if not self.use_pv or ply >= len( previous_pv ):
+      return None
+
+    if path[ :ply ] != previous_pv[ :ply ]:
+      return None
+
+    return previous_pv[ ply ]
+
+  def order(self, children, color, ply, hash_move, pv_move, maximize):
+    '''
+    Order the children of a node, in place
+
+    Params:
+      children  : List of tuples ( score, square, flips )
+      color     : 0 for black, 1 for white
+      ply       : Depth of the node
+      hash_move : Best square from the transposition table
+      pv_move   : Square of the principal variation
+      maximize  : True on Max nodes, the highest static
+                  scores are searched first, False on Min
+                  nodes, the lowest static scores first
+    '''
+
+    sign = 1 if maximize else -1
+
+    # The root only by the inputs shared with a split
+    # search, see the module documentation
+    root = ply == 0
+
+    killer_first, killer_second = self.killers[ ply ] if self.use_killers and not root else ( None, None )
+    history = self.history[ color ] if self.use_history and not root else None
+    corners = CORNERS if self.use_corners else ()
+
+    def key(child):
+      score, square, flips = child
+
+      if square == killer_first:
+        killer = 2
+      elif square == killer_second:
+        killer = 1
+      else:
+        killer = 0
+
+      return (
+        killer,
+        square in corners,
+        history[ square ] if history else 0,
+        sign * score
+      )
+
+    children.sort( key=key, reverse=True )
+
+    if self.use_pv:
+      if not root:
+        self.order_first( children, hash_move )
+
+      self.order_first( children, pv_move )
+
+  def order_first(self, children, move):
+    '''
+    Move the child of a square to the beginning
+    of the children list
+
+    Params:
+      children : Ordered list of generated movements
+      move     : Square to be searched first
+    '''
+
+    if move is None: return
+
+    for idx, child in enumerate( children ):
+
+      if child[1] == move:
+        if idx:
+          children.insert( 0, children.pop( idx ) )
+        break
+
+  def record_cutoff(self, color, ply, square, depth, index):
+    '''
+    Record a child that produced a cutoff
+
+    Params:
+      color  : 0 for black, 1 for white
+      ply    : Depth of the node
+      square : Square of the child
+      depth  : Remaining depth of the node
+      index  : Position of the child on the ordered list
+    '''
+
+    self.cutoffs += 1
+    self.ply_cutoffs[ ply ] += 1
+
+    if index == 0:
+      self.first_cutoffs += 1
+      self.ply_first_cutoffs[ ply ] += 1
+
+    if self.use_killers:
+      killers = self.killers[ ply ]
+
+      if killers[0] != square:
+        killers[1] = killers[0]
+        killers[0] = square
+
+    if self.use_history:
+      self.history[ color ][ square ] += depth * depth
+
+  def clear_pv(self, ply):
+    '''
+    Clean the principal variation from a ply, when
+    the search enters a node
+
+    Params:
+      ply : Depth of the node
+    '''
+
+    self.pv_table[ ply ] = []
+
+  def update_pv(self, ply, square, leaf):
+    '''
+    Set a new best square of a node on the principal
+    variation, followed by the variation of its child
+
+    Params:
+      ply    : Depth of the node
+      square : New best square, None for a pass
+      leaf   : True if the child is at the max depth
+    '''
+
+    if leaf:
+      self.pv_table[ ply ] = [ square ]
+    else:
+      self.pv_table[ ply ] = [ square ] + self.pv_table[ ply + 1 ]
+
+  def stats(self):
+    '''
+    Counters of the cutoffs
+
+    Return:
+      Dictionary with the amount of cutoffs, the amount
+      produced by the first child and its rate
+    '''
+
+    used = max( [ ply + 1 for ply, value in enumerate( self.ply_cutoffs ) if value ] or [ 0 ] )
+
+    return {
+      "cutoffs": self.cutoffs,
+      "first_cutoffs": self.first_cutoffs,
+      "first_cutoff_rate": float( self.first_cutoffs ) / self.cutoffs if self.cutoffs else 0.0,
+      "ply_cutoffs": self.ply_cutoffs[ :used ],
+      "ply_first_cutoffs": self.ply_first_cutoffs[ :used ]
+    }
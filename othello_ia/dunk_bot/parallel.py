@@ -0,0 +1,163 @@
+'''
+Parallel
+
+Root splitting of the search over a pool of processes.
+Each worker keeps its own bot, with its own transposition
+table, and all workers share the best value found at the
+root so far, used as alpha when a root movement starts
+'''
+
+import multiprocessing
+
+# Bot and shared alpha of the worker process
+worker_bot = None
+worker_alpha = None
+worker_search = None
+
+def init_worker(bot_class, options, shared_alpha):
+  '''
+  Initializer of the pool processes
+
+  Params:
+    bot_class    : Class of the bot, DunkBot
+    options      : Constructor arguments of the bot
+    shared_alpha : multiprocessing.Value with the best
+                   value found at the root
+  '''
+
+  global worker_bot, worker_alpha
+
+  worker_bot = bot_class( **options )
+  worker_alpha = shared_alpha
+
+def search_root_move(task):
+  '''
+  Search a root movement on a worker process
+
+  Params:
+    task : Tuple with:
+             search_id : Identifier of the current search
+             black     : Black bitboard of the root
+             white     : White bitboard of the root
+             color     : Color playing at the root
+             square    : Square of the root movement
+             flips     : Pieces flipped by the movement
+             score     : Score of the movement
+             depth     : Depth of the search
+             deadline  : Wall clock deadline, or None
+             margin    : Value subtracted from the shared
+                         alpha, so ties are searched exactly
+
+  Return:
+    A tuple with three values:
+      value : Value of the movement, None if the
+              deadline was reached
+      alpha : Alpha used on the search, the value is only
+              exact when greater than alpha
+      nodes : Amount of searched nodes
+  '''
+
+  global worker_search
+
+  search_id, black, white, color, square, flips, score, depth, deadline, margin = task
+
+  # Imported here, the bot module imports this one
+  from dunk_bot import SearchTimeout
+
+  bot = worker_bot
+  table = bot.transposition_table
+
+  if table is not None:
+
+    if bot.transposition_color != color:
+      table.clear()
+      bot.transposition_color = color
+
+    if worker_search != search_id:
+      table.new_search()
+      worker_search = search_id
+
+  bot.root_color = color
+  bot.search_depth = depth
+  bot.deadline = deadline
+  bot.reset_nodes()
+
+  bot.search_board.reset( black, white )
+  bot.search_board.play( square, flips, color == bot.BLACK )
+
+  alpha = worker_alpha.value - margin
+
+  try:
+    value = bot.search_reply(
+      color = bot.opposity_color( color ),
+      alpha = alpha,
+      beta = float("inf"),
+      score = score
+    )
+
+  except SearchTimeout:
+    return None, alpha, bot.nodes
+
+  finally:
+    bot.deadline = None
+
+  if value > alpha:
+    with worker_alpha.get_lock():
+      if value > worker_alpha.value:
+        worker_alpha.value = value
+
+  return value, alpha, bot.nodes
+
+class RootSplitter(object):
+  """
+  RootSplitter
+
+  Pool of worker processes searching the root
+  movements of a bot
+  """
+
+  def __init__(self, bot_class, options, workers):
+    '''
+    RootSplitter Constructor
+
+    Params:
+      bot_class : Class of the bot created on each worker
+      options   : Constructor arguments of the worker bots
+      workers   : Amount of worker processes
+    '''
+
+    self.workers = workers
+    self.shared_alpha = multiprocessing.Value( 'd', float("-inf") )
+
+    self.pool = multiprocessing.Pool(
+      processes = workers,
+      initializer = init_worker,
+      initargs = ( bot_class, options, self.shared_alpha )
+    )
+
+  def search(self, tasks, alpha):
+    '''
+    Search root movements on the workers
+
+    Params:
+      tasks : List of tasks, see search_root_move
+      alpha : Best value already found at the root
+
+    Return:
+      List of results of search_root_move, on the
+      same order of the tasks
+    '''
+
+    self.shared_alpha.value = alpha
+
+    results = [ self.pool.apply_async( search_root_move, ( task, ) ) for task in tasks ]
+
+    return [ result.get() for result in results ]
+
+  def close(self):
+    '''
+    Stop the worker processes
+    '''
+
+    self.pool.terminate()
+    self.pool.join()
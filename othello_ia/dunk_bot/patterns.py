@@ -0,0 +1,423 @@
+'''
+Patterns
+
+Evaluation by pattern tables. A pattern is a list of squares,
+like an edge or a corner region, and each of its instances
+over the 8 symmetries of the board reads the squares as a
+base 3 number, 0 for empty, 1 for black and 2 for white. The
+score of a board is the sum of the table weights indexed by
+the numbers of all instances, with one table for each phase
+of the game
+
+Indices are kept on a PatternBoard, a SearchBoard that
+updates them on each play and undo, so the search evaluates
+its leaves without reading the board again
+
+Weights are stored on a binary file, a header ( magic,
+phases, size ) followed by a float32 array of phases x size
+values, read through mmap
+'''
+
+import struct
+
+import numpy as np
+
+import bitboard
+import symmetry
+from evaluation import Evaluator, count
+
+MAGIC = "DPW1"
+
+HEADER = struct.Struct( "<4sII" )
+
+# Squares of the base patterns, as ( x, y ). The other
+# instances are the symmetries of these ones
+PATTERNS = (
+  ( "edge_2x", [ ( x, 0 ) for x in xrange(8) ] + [ ( 1, 1 ), ( 6, 1 ) ] ),
+  ( "corner_3x3", [ ( x, y ) for y in xrange(3) for x in xrange(3) ] ),
+  ( "corner_2x5", [ ( x, y ) for y in xrange(2) for x in xrange(5) ] ),
+  ( "line_2", [ ( x, 1 ) for x in xrange(8) ] ),
+  ( "line_3", [ ( x, 2 ) for x in xrange(8) ] ),
+  ( "line_4", [ ( x, 3 ) for x in xrange(8) ] ),
+  ( "diagonal_8", [ ( i, i ) for i in xrange(8) ] ),
+  ( "diagonal_7", [ ( i, i + 1 ) for i in xrange(7) ] ),
+  ( "diagonal_6", [ ( i, i + 2 ) for i in xrange(6) ] ),
+  ( "diagonal_5", [ ( i, i + 3 ) for i in xrange(5) ] ),
+  ( "diagonal_4", [ ( i, i + 4 ) for i in xrange(4) ] ),
+)
+
+def create_instances():
+  '''
+  Build the instances of all patterns
+
+  Return:
+    A tuple with three values:
+      instances : List of tuples ( pattern, squares ), with
+                  the index of the pattern on PATTERNS and
+                  the squares in digit order
+      offsets   : List with the first table entry of each
+                  pattern
+      size      : Amount of table entries of all patterns
+  '''
+
+  instances = []
+  offsets = []
+  size = 0
+
+  for pattern, ( name, positions ) in enumerate( PATTERNS ):
+    base = [ x + y * 8 for x, y in positions ]
+    seen = set()
+
+    for transform in xrange(8):
+      squares = tuple( symmetry.transform_square( square, transform ) for square in base )
+
+      if frozenset( squares ) not in seen:
+        seen.add( frozenset( squares ) )
+        instances.append( ( pattern, squares ) )
+
+    offsets.append( size )
+    size += 3 ** len( base )
+
+  return instances, offsets, size
+
+INSTANCES, PATTERN_OFFSETS, TABLE_SIZE = create_instances()
+
+# First table entry of each instance
+OFFSETS = np.array( [ PATTERN_OFFSETS[ pattern ] for pattern, squares in INSTANCES ], dtype=np.int64 )
+
+# Power of 3 of each square on each instance, 0 when
+# the square is not part of the instance
+SQUARE_POWERS = np.zeros( ( 64, len( INSTANCES ) ), dtype=np.int64 )
+
+for instance, ( pattern, squares ) in enumerate( INSTANCES ):
+  for digit, square in enumerate( squares ):
+    SQUARE_POWERS[ square, instance ] = 3 ** digit
+
+# Sum of the powers of the squares of each value
+# of each byte of a bitboard
+BYTE_POWERS = np.einsum(
+  "vb,ybi->yvi",
+  ( ( np.arange(256).reshape( 256, 1 ) >> np.arange(8) ) & 1 ),
+  SQUARE_POWERS.reshape( 8, 8, -1 )
+)
+
+def get_powers(bits):
+  '''
+  Sum of the square powers of the pieces of a bitboard
+
+  Params:
+    bits : Bitboard
+
+  Return:
+    Array with one value for each instance
+  '''
+
+  powers = 0
+  byte = 0
+
+  while bits:
+    if bits & 0xFF:
+      powers = powers + BYTE_POWERS[ byte, bits & 0xFF ]
+
+    bits >>= 8
+    byte += 1
+
+  if byte == 0:
+    return np.zeros( len( INSTANCES ), dtype=np.int64 )
+
+  return powers
+
+def get_indices(black, white):
+  '''
+  Table entries of all instances on many boards
+
+  Params:
+    black : Array of uint64 black bitboards
+    white : Array of uint64 white bitboards
+
+  Return:
+    Array ( N, instances ) of table entries
+  '''
+
+  def powers(bits):
+    values = np.ascontiguousarray( bits, dtype='<u8' ).view( np.uint8 ).reshape( -1, 8 )
+    return BYTE_POWERS[ np.arange(8), values ].sum( axis=1 )
+
+  return OFFSETS + powers( black ) + 2 * powers( white )
+
+def seed_weights(position_weights, phases = 4):
+  '''
+  Weights equal to a table of position weights. The weight
+  of each square is split between the instances over it
+
+  Params:
+    position_weights : Array of 64 weights, or ( 8, 8 )
+    phases           : Amount of game phases
+
+  Defaults:
+    phases           : 4
+
+  Return:
+    Array ( phases, TABLE_SIZE ) of float32 weights
+  '''
+
+  position_weights = np.asarray( position_weights, dtype=np.float64 ).reshape( 64 )
+  covers = ( SQUARE_POWERS > 0 ).sum( axis=1 )
+
+  table = np.zeros( TABLE_SIZE, dtype=np.float64 )
+
+  for pattern, squares in INSTANCES:
+    offset = PATTERN_OFFSETS[ pattern ]
+    size = 3 ** len( squares )
+
+    # Digits of every index, one column per square
+    digits = ( np.arange( size ).reshape( -1, 1 ) // 3 ** np.arange( len( squares ) ) ) % 3
+    signs = np.where( digits == 1, 1.0, np.where( digits == 2, -1.0, 0.0 ) )
+    square_weights = position_weights[ list( squares ) ] / covers[ list( squares ) ]
+
+    table[ offset:offset + size ] += signs.dot( square_weights )
+
+  # Instances of the same pattern share the table, so
+  # the weight was added once for each one
+  for pattern, ( name, positions ) in enumerate( PATTERNS ):
+    amount = sum( 1 for instance_pattern, squares in INSTANCES if instance_pattern == pattern )
+    offset = PATTERN_OFFSETS[ pattern ]
+    table[ offset:offset + 3 ** len( positions ) ] /= amount
+
+  return np.tile( table.astype( np.float32 ), ( phases, 1 ) )
+
+def load_pattern_weights(path):
+  '''
+  Map a pattern weight file
+
+  Params:
+    path : Path of the binary weight file
+
+  Return:
+    Read only array ( phases, TABLE_SIZE ) of float32 weights
+  '''
+
+  weight_file = open( path, "rb" )
+
+  try:
+    header = weight_file.read( HEADER.size )
+  finally:
+    weight_file.close()
+
+  if len( header ) != HEADER.size:
+    raise ValueError( "Invalid pattern weight file: %s" % path )
+
+  magic, phases, size = HEADER.unpack( header )
+
+  if magic != MAGIC or size != TABLE_SIZE:
+    raise ValueError( "Invalid pattern weight file: %s" % path )
+
+  return np.memmap( path, dtype='<f4', mode='r', offset=HEADER.size, shape=( phases, size ) )
+
+def save_pattern_weights(weights, path):
+  '''
+  Write a pattern weight file
+
+  Params:
+    weights : Array ( phases, TABLE_SIZE ) of weights
+    path    : Path of the binary weight file
+  '''
+
+  weights = np.ascontiguousarray( weights, dtype='<f4' )
+
+  if weights.ndim != 2 or weights.shape[1] != TABLE_SIZE:
+    raise ValueError( "Expected weights of shape ( phases, %d )" % TABLE_SIZE )
+
+  weight_file = open( path, "wb" )
+
+  try:
+    weight_file.write( HEADER.pack( MAGIC, weights.shape[0], TABLE_SIZE ) )
+    weight_file.write( weights.tobytes() )
+  finally:
+    weight_file.close()
+
+class PatternBoard(bitboard.SearchBoard):
+  """
+  PatternBoard
+
+  SearchBoard that keeps the table entries of all
+  instances, updated on each play and restored on
+  each undo
+  """
+
+  __slots__ = ( "indices", "stack" )
+
+  def __init__(self, black, white, max_ply = 128):
+    '''
+    PatternBoard Constructor, see SearchBoard
+    '''
+
+    bitboard.SearchBoard.__init__( self, black, white, max_ply )
+
+    self.stack = [ None ] * max_ply
+    self.indices = get_indices( [ black ], [ white ] )[0]
+
+  def reset(self, black, white):
+    '''
+    Set a new position, cleaning the stacked movements
+
+    Params:
+      black : Black bitboard
+      white : White bitboard
+    '''
+
+    bitboard.SearchBoard.reset( self, black, white )
+
+    self.indices = get_indices( [ black ], [ white ] )[0]
+
+  def play(self, square, flips, black):
+    '''
+    Apply a movement on the board
+
+    Params:
+      square : Index of the square of the new piece
+      flips  : Bitboard of the pieces to change
+      black  : True if the black color is playing
+    '''
+
+    indices = self.indices
+    self.stack[ self.ply ] = indices
+
+    bitboard.SearchBoard.play( self, square, flips, black )
+
+    # The new piece goes from 0 to 1 or 2, the flipped
+    # ones from 2 to 1 for black and from 1 to 2 for white
+    if black:
+      self.indices = indices + SQUARE_POWERS[ square ] - get_powers( flips )
+    else:
+      self.indices = indices + 2 * SQUARE_POWERS[ square ] + get_powers( flips )
+
+  def play_pass(self, black):
+    '''
+    Stack a pass, the board does not change
+
+    Params:
+      black : True if the black color is passing
+    '''
+
+    self.stack[ self.ply ] = self.indices
+
+    bitboard.SearchBoard.play_pass( self, black )
+
+  def undo(self):
+    '''
+    Revert the last movement applied on the board
+    '''
+
+    bitboard.SearchBoard.undo( self )
+
+    self.indices = self.stack[ self.ply ]
+
+class PatternEvaluator(Evaluator):
+  """
+  PatternEvaluator
+
+  Sum of the pattern table weights, from the black view.
+  The white view is the negated score
+  """
+
+  incremental = True
+
+  def __init__(self, path = None, position_weights = None, phases = 4, weights = None):
+    '''
+    PatternEvaluator Constructor
+
+    Params:
+      path             : Path of a pattern weight file
+      position_weights : Array of 64 position weights used
+                         to seed the tables without a file
+      phases           : Amount of phases of the seeded tables
+      weights          : Array ( phases, TABLE_SIZE ) of
+                         tables, used instead of a file
+
+    Defaults:
+      path             : None, seed the tables
+      position_weights : None, only with a path or weights
+      phases           : 4
+      weights          : None
+    '''
+
+    if path is None and position_weights is None and weights is None:
+      raise ValueError( "A weight file, position weights or tables are required" )
+
+    self.path = path
+    self.position_weights = position_weights
+
+    if path is not None:
+      self.weights = load_pattern_weights( path )
+    elif weights is not None:
+      self.weights = np.asarray( weights, dtype=np.float32 ).reshape( -1, TABLE_SIZE )
+    else:
+      self.weights = seed_weights( position_weights, phases )
+
+    self.phases = self.weights.shape[0]
+
+    # Phase of each amount of empty squares, so the
+    # phase of a single board is found without numpy
+    self.empties_phase = [ int( phase ) for phase in self.get_phase( np.arange( 65 ) ) ]
+
+  def __getstate__(self):
+    # Worker processes map the file again instead
+    # of receiving a copy of the tables
+    if self.path is not None:
+      return { "path": self.path }
+
+    return self.__dict__
+
+  def __setstate__(self, state):
+    if "weights" not in state:
+      self.__init__( state["path"] )
+    else:
+      self.__dict__.update( state )
+
+  def create_search_board(self):
+    '''
+    Board of the search, see Evaluator.create_search_board
+    '''
+
+    return PatternBoard( 0, 0 )
+
+  def get_phase(self, empties):
+    '''
+    Phase of the game
+
+    Params:
+      empties : Amount of empty squares, or array of them
+
+    Return:
+      Index of the weight table
+    '''
+
+    return np.minimum( ( 60 - empties ) * self.phases // 61, self.phases - 1 )
+
+  def evaluate_board(self, board, black_view = True, black_to_move = None):
+    '''
+    Evaluate a PatternBoard with its stored indices, see
+    Evaluator.evaluate_board
+    '''
+
+    score = float( self.weights[ self.empties_phase[ board.empties ] ].take( board.indices ).sum() )
+
+    return score if black_view else -score
+
+  def evaluate_bitboards(self, black, white, black_view = True, black_to_move = None):
+    '''
+    Evaluate boards given as bitboard arrays, see
+    Evaluator.evaluate_bitboards
+    '''
+
+    black = np.asarray( black, dtype=np.uint64 ).reshape( -1 )
+    white = np.asarray( white, dtype=np.uint64 ).reshape( -1 )
+
+    indices = get_indices( black, white )
+    empties = 64 - count( black | white )
+
+    phase = self.get_phase( empties ).reshape( -1, 1 )
+    score = self.weights[ phase, indices ].sum( axis=1 ).astype( np.float64 )
+
+    return score if black_view else -score
@@ -0,0 +1,161 @@
+'''
+Ponder
+
+Search on the time of the opponent. While the opponent
+thinks, the reply of the bot to each of its movements is
+searched on a background thread, and the movement found
+for the board the opponent actually plays is used without
+a new search
+
+An interrupted search is not kept, but it leaves the
+transposition table and the move ordering of the bot warm,
+so the next search of the same board is still faster
+
+The bot must not be used by other threads while pondering,
+stop waits for the thread before giving the bot back
+'''
+
+import threading
+
+def board_key(board):
+  '''
+  Key of a board on the pondered results
+
+  Params:
+    board : Board array
+
+  Return:
+    String with the 64 characters of the board
+  '''
+
+  return "".join( board.reshape( -1 ).tolist() )
+
+class Ponderer(object):
+  """
+  Ponderer
+
+  Background searches of the replies of a bot
+  """
+
+  def __init__(self, bot, color):
+    '''
+    Ponderer Constructor
+
+    Params:
+      bot   : DunkBot instance
+      color : Color played by the bot
+    '''
+
+    self.bot = bot
+    self.color = bot.transform_color( color )
+    self.opponent_color = bot.opposity_color( self.color )
+
+    self.stop_event = threading.Event()
+    self.thread = None
+
+    # Movement and search report of each pondered
+    # board, by board_key
+    self.results = {}
+
+    self.hits = 0
+    self.misses = 0
+
+  def start(self, board):
+    '''
+    Start pondering the replies to all movements of the
+    opponent on a board. Does nothing if already running
+
+    Params:
+      board : Board with the opponent to play, it is
+              copied so it can change meanwhile
+    '''
+
+    if self.thread is not None:
+      return
+
+    board = board.copy()
+    moves = self.bot.list_moves( board, self.opponent_color )
+
+    self.stop_event.clear()
+    self.results = {}
+
+    self.thread = threading.Thread( target = self.ponder, args = ( board, moves ) )
+    self.thread.daemon = True
+    self.thread.start()
+
+  def ponder(self, board, moves):
+    '''
+    Thread function searching the reply to each
+    movement of the opponent
+
+    Params:
+      board : Board with the opponent to play
+      moves : Movements of the opponent
+    '''
+
+    bot = self.bot
+
+    for position in moves:
+      if self.stop_event.is_set(): break
+
+      child = board.copy()
+      bot.set_color_position( child, position, self.opponent_color )
+
+      # A pass of the bot needs no search
+      if bot.list_moves( child, self.color ).size == 0:
+        continue
+
+      move = bot.play( child, self.color, stop = self.stop_event )
+
+      if self.stop_event.is_set(): break
+
+      self.results[ board_key( child ) ] = ( move, bot.search_report )
+
+  def is_running(self):
+    '''
+    Check if the thread is still searching
+
+    Return:
+      True while pondering
+    '''
+
+    return self.thread is not None and self.thread.is_alive()
+
+  def stop(self):
+    '''
+    Abort the search in progress and wait for the
+    thread, the bot is free to use after it
+    '''
+
+    if self.thread is None:
+      return
+
+    self.stop_event.set()
+    self.thread.join()
+    self.thread = None
+
+  def take(self, board):
+    '''
+    Take the pondered movement of a board, forgetting
+    the other results. The pondering must be stopped
+
+    Params:
+      board : Board with the bot to play
+
+    Return:
+      A tuple with two values:
+        move   : Movement of the bot, or None if the
+                 board was not pondered
+        report : Search report of the movement
+    '''
+
+    move, report = self.results.get( board_key( board ), ( None, None ) )
+
+    self.results = {}
+
+    if move is None:
+      self.misses += 1
+    else:
+      self.hits += 1
+
+    return move, report
@@ -0,0 +1,392 @@
+'''
+Service
+
+Long running move server. Bots are built once on a pool of
+worker processes and kept warm between requests, with their
+transposition tables and opening book, so a move does not pay
+the process start, the imports and the bot construction
+
+The server listens on localhost TCP or on a Unix socket, and
+each connection is served by its own thread, so many games
+can be played at once. Requests and replies are JSON objects,
+one per line:
+
+  request : { "id": 1, "board": "...", "color": "black",
+              "time_limit": 3.7 }
+  reply   : { "id": 1, "move": [ x, y ], "stats": { ... } }
+            { "id": 1, "error": "..." }
+
+The board is the 64 characters of the board files, with
+or without line breaks, and the time limit is optional
+
+The time limit counts from the arrival of the request, so
+the time spent waiting for a free worker is charged to it.
+Requests without time limit get the default of the server,
+and no request searches beyond its max time limit
+'''
+
+import json
+import multiprocessing
+import os
+import socket
+import SocketServer
+import time
+
+import numpy as np
+
+from dunk_bot import DunkBot
+from book import OpeningBook
+
+# Default address of the server
+HOST = "127.0.0.1"
+PORT = 7650
+
+# Seconds of search of a request without time limit,
+# and max seconds of any request
+DEFAULT_TIME_LIMIT = 3.7
+MAX_TIME_LIMIT = 10.0
+
+# Bot of the worker process
+worker_bot = None
+
+def parse_board(text):
+  '''
+  Convert the text of a board to a board array
+
+  Params:
+    text : 64 characters of the board, line breaks
+           are ignored
+
+  Return:
+    Board array
+  '''
+
+  text = text.replace( "\n", "" ).replace( "\r", "" )
+
+  if len( text ) != 64 or set( text ) - set( ( DunkBot.BLACK, DunkBot.WHITE, DunkBot.EMPTY ) ):
+    raise ValueError( "Invalid board" )
+
+  return np.array( list( text ) )
+
+def init_worker(options, book_file):
+  '''
+  Initializer of the pool processes
+
+  Params:
+    options   : Constructor arguments of the bot
+    book_file : Path of the opening book, or None
+  '''
+
+  global worker_bot
+
+  book = OpeningBook( book_file ) if book_file and os.path.exists( book_file ) else None
+
+  worker_bot = DunkBot( book = book, use_logging = True, **options )
+
+def request_time_limit(request, default_time_limit, max_time_limit):
+  '''
+  Seconds of search of a request
+
+  Params:
+    request            : Dictionary of the request
+    default_time_limit : Seconds without time_limit on
+                         the request
+    max_time_limit     : Max seconds of any request
+
+  Return:
+    Seconds of search
+
+  Can raise a ValueError or TypeError if the time
+  limit is not a number
+  '''
+
+  time_limit = request.get( "time_limit" )
+
+  if time_limit is None:
+    time_limit = default_time_limit
+
+  return min( float( time_limit ), max_time_limit )
+
+def search_move(request, deadline):
+  '''
+  Search the movement of a request on the worker bot
+
+  Params:
+    request  : Dictionary with the board and color
+    deadline : time.time() when the reply is due, the
+               search gets the time left
+
+  Return:
+    Dictionary with the move and the stats, or
+    with the error
+  '''
+
+  bot = worker_bot
+
+  try:
+    board = parse_board( request["board"] )
+    color = bot.transform_color( request["color"] )
+
+  except ( KeyError, ValueError, TypeError, AttributeError ), e:
+    return { "error": "Invalid request: %s" % e }
+
+  # Without time left only the first depth is searched
+  move = bot.play( board, color, max( deadline - time.time(), 0.0 ) )
+
+  stats = bot.stats.as_dict()
+  stats["depths"] = [ dict( item ) for item in stats["depths"] ]
+
+  return { "move": [ int( value ) for value in move ], "stats": stats }
+
+class RequestHandler(SocketServer.StreamRequestHandler):
+  """
+  RequestHandler
+
+  Serves the requests of a connection, one line each
+  """
+
+  def handle(self):
+    for line in iter( self.rfile.readline, "" ):
+      if not line.strip(): continue
+
+      try:
+        request = json.loads( line )
+      except ValueError:
+        request = None
+
+      if not isinstance( request, dict ):
+        reply = { "error": "Invalid JSON request" }
+      else:
+        reply = self.search( request )
+
+        if "id" in request:
+          reply["id"] = request["id"]
+
+      self.wfile.write( json.dumps( reply ) + "\n" )
+      self.wfile.flush()
+
+  def search(self, request):
+    '''
+    Search a request on the pool, with the deadline
+    counted from now
+
+    Params:
+      request : Dictionary of the request
+
+    Return:
+      Dictionary of the reply
+    '''
+
+    server = self.server
+
+    try:
+      time_limit = request_time_limit( request, server.default_time_limit, server.max_time_limit )
+    except ( ValueError, TypeError ), e:
+      return { "error": "Invalid request: %s" % e }
+
+    deadline = time.time() + time_limit
+
+    try:
+      return server.pool.apply_async( search_move, ( request, deadline ) ).get()
+    except Exception, e:
+      return { "error": "Search failed: %s" % e }
+
+class MoveServer(SocketServer.ThreadingMixIn, SocketServer.TCPServer):
+  """
+  MoveServer
+
+  TCP server of movements with a pool of warm bots
+  """
+
+  daemon_threads = True
+  allow_reuse_address = True
+
+  def __init__(self, address, workers = 1, options = None, book_file = None,
+               default_time_limit = DEFAULT_TIME_LIMIT, max_time_limit = MAX_TIME_LIMIT):
+    '''
+    MoveServer Constructor
+
+    Params:
+      address            : Tuple ( host, port )
+      workers            : Amount of worker processes
+      options            : Constructor arguments of the bots
+      book_file          : Path of the opening book
+      default_time_limit : Seconds of the requests
+                           without time limit
+      max_time_limit     : Max seconds of any request
+
+    Defaults:
+      workers            : 1
+      options            : None, default bots
+      book_file          : None, without book
+      default_time_limit : DEFAULT_TIME_LIMIT
+      max_time_limit     : MAX_TIME_LIMIT
+    '''
+
+    self.default_time_limit = default_time_limit
+    self.max_time_limit = max_time_limit
+
+    # The pool is started before the server thread,
+    # so the workers do not inherit the socket
+    self.pool = create_pool( workers, options, book_file )
+
+    SocketServer.TCPServer.__init__( self, address, RequestHandler )
+
+  def server_close(self):
+    SocketServer.TCPServer.server_close( self )
+
+    self.pool.terminate()
+    self.pool.join()
+
+class UnixMoveServer(SocketServer.ThreadingMixIn, SocketServer.UnixStreamServer):
+  """
+  UnixMoveServer
+
+  MoveServer listening on a Unix socket
+  """
+
+  daemon_threads = True
+
+  def __init__(self, path, workers = 1, options = None, book_file = None,
+               default_time_limit = DEFAULT_TIME_LIMIT, max_time_limit = MAX_TIME_LIMIT):
+    '''
+    UnixMoveServer Constructor, see MoveServer
+
+    Params:
+      path : Path of the Unix socket
+    '''
+
+    self.default_time_limit = default_time_limit
+    self.max_time_limit = max_time_limit
+
+    self.pool = create_pool( workers, options, book_file )
+
+    if os.path.exists( path ):
+      os.remove( path )
+
+    SocketServer.UnixStreamServer.__init__( self, path, RequestHandler )
+
+  def server_close(self):
+    SocketServer.UnixStreamServer.server_close( self )
+
+    if os.path.exists( self.server_address ):
+      os.remove( self.server_address )
+
+    self.pool.terminate()
+    self.pool.join()
+
+def create_pool(workers, options, book_file):
+  '''
+  Start the pool of bots
+
+  Params:
+    workers   : Amount of worker processes
+    options   : Constructor arguments of the bots, or None
+    book_file : Path of the opening book, or None
+
+  Return:
+    multiprocessing.Pool instance
+  '''
+
+  return multiprocessing.Pool(
+    processes = workers,
+    initializer = init_worker,
+    initargs = ( options or {}, book_file )
+  )
+
+def parse_address(text):
+  '''
+  Convert an address text to a socket address
+
+  Params:
+    text : host:port for TCP, or a path for a Unix socket
+
+  Return:
+    Tuple ( host, port ), or the path
+  '''
+
+  host, separator, port = text.rpartition( ":" )
+
+  if separator and port.isdigit():
+    return ( host or HOST, int( port ) )
+
+  return text
+
+class MoveClient(object):
+  """
+  MoveClient
+
+  Connection to a move server
+  """
+
+  def __init__(self, address = ( HOST, PORT ), timeout = None):
+    '''
+    MoveClient Constructor
+
+    Params:
+      address : Tuple ( host, port ), or the path of
+                a Unix socket
+      timeout : Seconds to wait for the server
+
+    Defaults:
+      address : ( HOST, PORT )
+      timeout : None, wait forever
+    '''
+
+    if isinstance( address, tuple ):
+      self.connection = socket.create_connection( address, timeout )
+    else:
+      self.connection = socket.socket( socket.AF_UNIX, socket.SOCK_STREAM )
+      self.connection.settimeout( timeout )
+      self.connection.connect( address )
+
+    self.reader = self.connection.makefile( "r" )
+    self.next_id = 0
+
+  def play(self, board, color, time_limit = None):
+    '''
+    Ask the server for a movement
+
+    Params:
+      board      : Board text, or board array
+      color      : Color to play
+      time_limit : Seconds for the search
+
+    Defaults:
+      time_limit : None, default time limit of the server
+
+    Return:
+      Dictionary of the reply, with move and stats
+    '''
+
+    if not isinstance( board, basestring ):
+      board = "".join( np.asarray( board ).reshape( -1 ).tolist() )
+
+    self.next_id += 1
+
+    request = { "id": self.next_id, "board": board, "color": color }
+
+    if time_limit is not None:
+      request["time_limit"] = time_limit
+
+    self.connection.sendall( json.dumps( request ) + "\n" )
+
+    line = self.reader.readline()
+
+    if not line:
+      raise IOError( "Connection closed by the server" )
+
+    reply = json.loads( line )
+
+    if "error" in reply:
+      raise ValueError( reply["error"] )
+
+    return reply
+
+  def close(self):
+    '''
+    Close the connection
+    '''
+
+    self.reader.close()
+    self.connection.close()
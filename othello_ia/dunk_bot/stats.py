@@ -0,0 +1,200 @@
+'''
+Stats
+
+Counters of a single play of DunkBot, kept on the bot as
+bot.stats after each play. Counting the nodes, leaves and
+cutoffs is always on, measuring the time of the movement
+generation and of the evaluations needs the timing option
+of the bot, since it reads the clock twice on every node
+
+Searches split over worker processes only count the nodes
+of the workers, not their other counters
+'''
+
+import cProfile
+import pstats
+import StringIO
+
+class SearchStats(object):
+  """
+  SearchStats
+
+  Counters and timing of a play
+  """
+
+  def __init__(self):
+    # How the movement was found: book, endgame or search
+    self.source = None
+
+    self.nodes = 0
+    self.time = 0.0
+
+    # Nodes where the movements were generated and the
+    # amount of movements generated on them
+    self.expanded = 0
+    self.children = 0
+
+    # Boards scored at the max depth
+    self.leaf_evaluations = 0
+
+    # Seconds on the movement generation and on the
+    # evaluations, only with the timing option
+    self.movegen_time = 0.0
+    self.evaluation_time = 0.0
+
+    # List of dictionaries with the depth, nodes, time
+    # and completed flag of each iteration
+    self.depths = []
+
+    self.cutoffs = None
+    self.transposition = None
+    self.book = None
+
+    # pstats.Stats of the play, only with the profile option
+    self.profile = None
+
+  def finish(self, bot, seconds):
+    '''
+    Collect the counters of the bot after a play
+
+    Params:
+      bot     : DunkBot instance
+      seconds : Wall clock time of the play
+    '''
+
+    self.time = seconds
+    self.nodes = bot.nodes
+
+    self.depths = [
+      dict( ( key, report[ key ] ) for key in ( "depth", "nodes", "time", "completed" ) )
+      for report in bot.search_report
+    ]
+
+    self.cutoffs = bot.ordering.stats()
+    self.transposition = bot.transposition_stats()
+    self.book = bot.book_stats()
+
+  def branching_factor(self):
+    '''
+    Mean amount of movements of the expanded nodes
+
+    Return:
+      Float, 0 without expanded nodes
+    '''
+
+    return float( self.children ) / self.expanded if self.expanded else 0.0
+
+  def effective_branching_factor(self):
+    '''
+    Growth of the nodes between the last two
+    completed iterations
+
+    Return:
+      Float, or None with less than two iterations
+    '''
+
+    completed = [ item["nodes"] for item in self.depths if item["completed"] and item["nodes"] ]
+
+    if len( completed ) < 2:
+      return None
+
+    return float( completed[-1] ) / completed[-2]
+
+  def as_dict(self):
+    '''
+    All the counters as plain values
+
+    Return:
+      Dictionary with the counters
+    '''
+
+    return {
+      "source": self.source,
+      "nodes": self.nodes,
+      "time": self.time,
+      "nodes_per_second": self.nodes / self.time if self.time else 0.0,
+      "expanded": self.expanded,
+      "children": self.children,
+      "branching_factor": self.branching_factor(),
+      "effective_branching_factor": self.effective_branching_factor(),
+      "leaf_evaluations": self.leaf_evaluations,
+      "movegen_time": self.movegen_time,
+      "evaluation_time": self.evaluation_time,
+      "depths": self.depths,
+      "cutoffs": self.cutoffs,
+      "transposition": self.transposition,
+      "book": self.book
+    }
+
+  def report(self):
+    '''
+    Text summary of the counters
+
+    Return:
+      List of lines
+    '''
+
+    lines = [
+      "Source %s nodes %d time %.4f nodes/s %.0f" % (
+        self.source, self.nodes, self.time, self.nodes / self.time if self.time else 0.0 ),
+      "Expanded %d leaves %d branching %.2f" % (
+        self.expanded, self.leaf_evaluations, self.branching_factor() )
+    ]
+
+    if self.movegen_time or self.evaluation_time:
+      lines.append( "Move generation %.4f s evaluation %.4f s" % ( self.movegen_time, self.evaluation_time ) )
+
+    if self.cutoffs is not None:
+      lines.append( "Cutoffs %d first child %.1f%%" % (
+        self.cutoffs["cutoffs"], 100.0 * self.cutoffs["first_cutoff_rate"] ) )
+
+    if self.transposition is not None:
+      lines.append( "Transposition hits %d misses %d stores %d" % (
+        self.transposition["hits"], self.transposition["misses"], self.transposition["stores"] ) )
+
+    return lines
+
+  def profile_report(self, limit = 20, sort = "cumulative"):
+    '''
+    Text of the profile of the play
+
+    Params:
+      limit : Amount of functions listed
+      sort  : pstats sort key
+
+    Defaults:
+      limit : 20
+      sort  : cumulative
+
+    Return:
+      The profile text, or None without profile
+    '''
+
+    if self.profile is None:
+      return None
+
+    output = StringIO.StringIO()
+
+    self.profile.stream = output
+    self.profile.sort_stats( sort ).print_stats( limit )
+
+    return output.getvalue()
+
+def profile_call(function, *args):
+  '''
+  Run a function under cProfile
+
+  Params:
+    function : Function to run
+    args     : Arguments of the function
+
+  Return:
+    A tuple with two values:
+      result  : Value returned by the function
+      profile : pstats.Stats of the call
+  '''
+
+  profiler = cProfile.Profile()
+  result = profiler.runcall( function, *args )
+
+  return result, pstats.Stats( profiler )
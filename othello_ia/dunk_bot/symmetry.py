@@ -0,0 +1,238 @@
+'''
+Symmetry
+
+The 8 symmetries of the board, rotations and reflections
+of the grid indexed as ( x + y * 8 ). Bitboards are moved
+with delta swaps, three shift and mask steps for each
+reflection, and squares with a table for each symmetry
+
+Every symmetry is a composition of the transpose
+( x, y ) -> ( y, x ), the mirror x -> 7 - x and the
+flip y -> 7 - y:
+
+  0 : ( x, y )            identity
+  1 : ( 7 - x, y )        mirror
+  2 : ( x, 7 - y )        flip
+  3 : ( 7 - x, 7 - y )    mirror and flip
+  4 : ( y, x )            transpose
+  5 : ( 7 - y, x )        transpose and mirror
+  6 : ( y, 7 - x )        transpose and flip
+  7 : ( 7 - y, 7 - x )    transpose, mirror and flip
+'''
+
+from bitboard import FULL, iter_squares
+
+def mirror(bits):
+  '''
+  Reflect a bitboard on the vertical axis, x -> 7 - x
+
+  Params:
+    bits : Bitboard
+
+  Return:
+    The reflected bitboard
+  '''
+
+  bits = ( ( bits >> 1 ) & 0x5555555555555555 ) | ( ( bits & 0x5555555555555555 ) << 1 )
+  bits = ( ( bits >> 2 ) & 0x3333333333333333 ) | ( ( bits & 0x3333333333333333 ) << 2 )
+
+  return ( ( bits >> 4 ) & 0x0F0F0F0F0F0F0F0F ) | ( ( bits & 0x0F0F0F0F0F0F0F0F ) << 4 )
+
+def flip(bits):
+  '''
+  Reflect a bitboard on the horizontal axis, y -> 7 - y
+
+  Params:
+    bits : Bitboard
+
+  Return:
+    The reflected bitboard
+  '''
+
+  bits = ( ( bits >> 8 ) & 0x00FF00FF00FF00FF ) | ( ( bits & 0x00FF00FF00FF00FF ) << 8 )
+  bits = ( ( bits >> 16 ) & 0x0000FFFF0000FFFF ) | ( ( bits & 0x0000FFFF0000FFFF ) << 16 )
+
+  return ( bits >> 32 ) | ( ( bits << 32 ) & FULL )
+
+def transpose(bits):
+  '''
+  Reflect a bitboard on the main diagonal, ( x, y ) -> ( y, x )
+
+  Params:
+    bits : Bitboard
+
+  Return:
+    The reflected bitboard
+  '''
+
+  t = 0x0F0F0F0F00000000 & ( bits ^ ( bits << 28 ) )
+  bits ^= t ^ ( t >> 28 )
+  t = 0x3333000033330000 & ( bits ^ ( bits << 14 ) )
+  bits ^= t ^ ( t >> 14 )
+  t = 0x5500550055005500 & ( bits ^ ( bits << 7 ) )
+
+  return bits ^ t ^ ( t >> 7 )
+
+def create_transforms():
+  '''
+  Build the square tables of the 8 symmetries
+
+  Return:
+    Tuple of 8 tuples, indexed by square with the
+    square after the transform. The first one is
+    the identity
+  '''
+
+  functions = [
+    lambda x, y: ( x, y ),
+    lambda x, y: ( 7 - x, y ),
+    lambda x, y: ( x, 7 - y ),
+    lambda x, y: ( 7 - x, 7 - y ),
+    lambda x, y: ( y, x ),
+    lambda x, y: ( 7 - y, x ),
+    lambda x, y: ( y, 7 - x ),
+    lambda x, y: ( 7 - y, 7 - x ),
+  ]
+
+  transforms = []
+
+  for function in functions:
+    table = []
+
+    for square in xrange(64):
+      x, y = function( square % 8, square / 8 )
+      table.append( x + y * 8 )
+
+    transforms.append( tuple( table ) )
+
+  return tuple( transforms )
+
+TRANSFORMS = create_transforms()
+
+# Transform that undoes each transform
+INVERSES = tuple(
+  [ other for other, table in enumerate( TRANSFORMS )
+    if all( table[ TRANSFORMS[ idx ][ square ] ] == square for square in xrange(64) ) ][0]
+  for idx in xrange(8)
+)
+
+def transform_bits(bits, transform):
+  '''
+  Apply a symmetry to a bitboard
+
+  Params:
+    bits      : Bitboard
+    transform : Index of the symmetry
+
+  Return:
+    The transformed bitboard
+  '''
+
+  if transform & 4:
+    bits = transpose( bits )
+  if transform & 1:
+    bits = mirror( bits )
+  if transform & 2:
+    bits = flip( bits )
+
+  return bits
+
+def transform_bits_table(bits, transform):
+  '''
+  Apply a symmetry to a bitboard square by square,
+  reference of transform_bits
+
+  Params:
+    bits      : Bitboard
+    transform : Index of the symmetry
+
+  Return:
+    The transformed bitboard
+  '''
+
+  table = TRANSFORMS[ transform ]
+  result = 0
+
+  for square in iter_squares( bits ):
+    result |= 1 << table[ square ]
+
+  return result
+
+def transform_square(square, transform):
+  '''
+  Apply a symmetry to a square
+
+  Params:
+    square    : Index of the square
+    transform : Index of the symmetry
+
+  Return:
+    The transformed square
+  '''
+
+  return TRANSFORMS[ transform ][ square ]
+
+def symmetries(own, opp):
+  '''
+  All the 8 symmetries of a board
+
+  Params:
+    own : Bitboard of the color to play
+    opp : Bitboard of the opposity color
+
+  Return:
+    List of tuples ( own, opp ), indexed by transform
+  '''
+
+  boards = [ ( own, opp ) ]
+  boards.append( ( mirror( own ), mirror( opp ) ) )
+  boards.append( ( flip( own ), flip( opp ) ) )
+  boards.append( ( flip( boards[1][0] ), flip( boards[1][1] ) ) )
+
+  own, opp = transpose( own ), transpose( opp )
+
+  boards.append( ( own, opp ) )
+  boards.append( ( mirror( own ), mirror( opp ) ) )
+  boards.append( ( flip( own ), flip( opp ) ) )
+  boards.append( ( flip( boards[5][0] ), flip( boards[5][1] ) ) )
+
+  return boards
+
+def canonical(own, opp):
+  '''
+  Canonical form of a board, the smallest ( own, opp )
+  pair among the 8 symmetries
+
+  Params:
+    own : Bitboard of the color to play
+    opp : Bitboard of the opposity color
+
+  Return:
+    A tuple with three values:
+      own       : Canonical bitboard of the color to play
+      opp       : Canonical bitboard of the opposity color
+      transform : Symmetry applied to the board
+  '''
+
+  best_own, best_opp, best_transform = own, opp, 0
+
+  for transform, ( own, opp ) in enumerate( symmetries( own, opp ) ):
+    if own < best_own or ( own == best_own and opp < best_opp ):
+      best_own, best_opp, best_transform = own, opp, transform
+
+  return best_own, best_opp, best_transform
+
+def inverse_square(square, transform):
+  '''
+  Map a square of the canonical board back
+  to the original board
+
+  Params:
+    square    : Square on the canonical board
+    transform : Symmetry returned by canonical
+
+  Return:
+    The square on the original board
+  '''
+
+  return TRANSFORMS[ INVERSES[ transform ] ][ square ]
@@ -0,0 +1,507 @@
+'''
+Training
+
+Offline tuning of the evaluation weights. Games are played
+by DunkBot against itself on a pool of processes, and every
+position is streamed to a dataset file with the final result
+of its game. The weights are fitted on the dataset with
+NumPy least squares:
+
+  features : FeatureEvaluator weights, one ridge regression
+             for each phase. Position weights are shared by
+             the squares of each symmetry class
+  patterns : PatternEvaluator tables, fitted by gradient
+             steps over all the table entries at once
+
+The dataset file starts with a header ( magic, amount of
+records ) followed by fixed size records:
+
+  black         : uint64 bitboard of the black pieces
+  white         : uint64 bitboard of the white pieces
+  black_to_move : uint8 1 if black plays next
+  score         : int8 final disc difference of the
+                  game, from the black view
+'''
+
+import multiprocessing
+import os
+import random
+import struct
+import sys
+import time
+
+import numpy as np
+
+import bitboard
+import patterns
+import symmetry
+from endgame import final_score
+from evaluation import FeatureEvaluator, count, get_phases
+
+MAGIC = "DTS1"
+
+HEADER = struct.Struct( "<4sI" )
+RECORD = struct.Struct( "<QQBb" )
+
+RECORD_DTYPE = np.dtype( [
+  ( "black", "<u8" ), ( "white", "<u8" ), ( "black_to_move", "u1" ), ( "score", "i1" )
+] )
+
+# Pieces of the start position
+START_BLACK = bitboard.square_bit( 4, 3 ) | bitboard.square_bit( 3, 4 )
+START_WHITE = bitboard.square_bit( 3, 3 ) | bitboard.square_bit( 4, 4 )
+
+# Bot of the worker process
+worker_bot = None
+
+def init_worker(bot_class, options):
+  '''
+  Initializer of the pool processes
+
+  Params:
+    bot_class : Class of the bot, DunkBot
+    options   : Constructor arguments of the bot
+  '''
+
+  global worker_bot
+
+  # The bot reports each movement on the output
+  sys.stdout = open( os.devnull, "w" )
+
+  worker_bot = bot_class( **options )
+
+def play_game(task):
+  '''
+  Play a game of the worker bot against itself
+
+  Params:
+    task : Tuple with:
+             seed         : Seed of the random movements
+             random_plies : Amount of random movements at
+                            the start of the game
+             variety      : Chance of a random movement
+                            instead of the best one
+
+  Return:
+    A tuple with two values:
+      positions : List of tuples ( black, white, black_to_move )
+                  of the positions where a color played
+      score     : Final disc difference, from the black view
+  '''
+
+  seed, random_plies, variety = task
+
+  bot = worker_bot
+  generator = random.Random( seed )
+
+  black, white = START_BLACK, START_WHITE
+  color = bot.BLACK
+  positions = []
+
+  while True:
+    own, opp = ( black, white ) if color == bot.BLACK else ( white, black )
+    moves = bitboard.get_moves( own, opp )
+
+    if not moves:
+      if not bitboard.get_moves( opp, own ):
+        break
+
+      color = bot.opposity_color( color )
+      continue
+
+    positions.append( ( black, white, color == bot.BLACK ) )
+
+    if len( positions ) <= random_plies or generator.random() < variety:
+      square = generator.choice( list( bitboard.iter_squares( moves ) ) )
+    else:
+      x, y = bot.play( bot.create_board( ( black, white ) ), color )
+      square = int( x + y * 8 )
+
+    flips = bitboard.get_flips( own, opp, square )
+    own, opp = own | flips | ( 1 << square ), opp & ~flips
+
+    black, white = ( own, opp ) if color == bot.BLACK else ( opp, own )
+    color = bot.opposity_color( color )
+
+  return positions, final_score( black, white )
+
+class DatasetWriter(object):
+  """
+  DatasetWriter
+
+  Appends records to a dataset file, the amount
+  of records of the header is written on close
+  """
+
+  def __init__(self, path):
+    '''
+    DatasetWriter Constructor
+
+    Params:
+      path : Path of the dataset file, created or
+             appended when it exists
+    '''
+
+    self.size = 0
+
+    if os.path.exists( path ):
+      self.size = read_header( path )
+      self.data_file = open( path, "r+b" )
+      self.data_file.seek( 0, os.SEEK_END )
+    else:
+      self.data_file = open( path, "wb" )
+      self.data_file.write( HEADER.pack( MAGIC, 0 ) )
+
+  def add_game(self, positions, score):
+    '''
+    Append the positions of a game
+
+    Params:
+      positions : List of tuples ( black, white, black_to_move )
+      score     : Final disc difference, from the black view
+    '''
+
+    self.data_file.write( "".join(
+      RECORD.pack( black, white, black_to_move, score ) for black, white, black_to_move in positions
+    ) )
+
+    self.size += len( positions )
+
+  def close(self):
+    '''
+    Write the header and close the file
+    '''
+
+    self.data_file.seek( 0 )
+    self.data_file.write( HEADER.pack( MAGIC, self.size ) )
+    self.data_file.close()
+
+def read_header(path):
+  '''
+  Check the header of a dataset file
+
+  Params:
+    path : Path of the dataset file
+
+  Return:
+    Amount of records
+  '''
+
+  data_file = open( path, "rb" )
+
+  try:
+    header = data_file.read( HEADER.size )
+  finally:
+    data_file.close()
+
+  if len( header ) != HEADER.size:
+    raise ValueError( "Invalid dataset file: %s" % path )
+
+  magic, size = HEADER.unpack( header )
+
+  if magic != MAGIC or os.path.getsize( path ) != HEADER.size + size * RECORD.size:
+    raise ValueError( "Invalid dataset file: %s" % path )
+
+  return size
+
+def load_dataset(path):
+  '''
+  Map a dataset file
+
+  Params:
+    path : Path of the dataset file
+
+  Return:
+    Read only structured array with the fields of
+    the records
+  '''
+
+  size = read_header( path )
+
+  if size == 0:
+    return np.zeros( 0, dtype=RECORD_DTYPE )
+
+  return np.memmap( path, dtype=RECORD_DTYPE, mode='r', offset=HEADER.size, shape=( size, ) )
+
+def generate(path, bot_class, options, games, workers = 1, random_plies = 6, variety = 0.1, seed = 0,
+             callback = None):
+  '''
+  Play games on a pool of processes and stream
+  their positions to a dataset file
+
+  Params:
+    path         : Path of the dataset file
+    bot_class    : Class of the bot, DunkBot
+    options      : Constructor arguments of the bot
+    games        : Amount of games
+    workers      : Amount of processes
+    random_plies : Amount of random movements at the
+                   start of each game
+    variety      : Chance of a random movement
+    seed         : Seed of the first game, each game
+                   uses the next one
+    callback     : Function called after each game with
+                   the amount of games and positions
+
+  Defaults:
+    workers      : 1
+    random_plies : 6
+    variety      : 0.1
+    seed         : 0
+    callback     : None
+
+  Return:
+    A tuple with two values:
+      positions : Amount of positions written
+      seconds   : Wall clock time of the generation
+  '''
+
+  pool = multiprocessing.Pool(
+    processes = workers,
+    initializer = init_worker,
+    initargs = ( bot_class, options )
+  )
+
+  writer = DatasetWriter( path )
+  start = time.time()
+  written = 0
+
+  try:
+    tasks = [ ( seed + game, random_plies, variety ) for game in xrange( games ) ]
+
+    for game, ( positions, score ) in enumerate( pool.imap_unordered( play_game, tasks ) ):
+      writer.add_game( positions, score )
+      written += len( positions )
+
+      if callback is not None:
+        callback( game + 1, written )
+
+  finally:
+    writer.close()
+    pool.terminate()
+    pool.join()
+
+  return written, time.time() - start
+
+def split_dataset(data, validation = 0.1, seed = 0):
+  '''
+  Split the records in training and validation
+  sets, keeping the games of both apart
+
+  Params:
+    data       : Structured array of records
+    validation : Fraction of the validation set
+    seed       : Seed of the split
+
+  Defaults:
+    validation : 0.1
+    seed       : 0
+
+  Return:
+    A tuple with the training and validation arrays,
+    both empty for an empty dataset
+  '''
+
+  if not len( data ):
+    return data[:0], data[:0]
+
+  # Positions of a game are stored together, and a new
+  # game starts on each position with 4 pieces
+  games = np.cumsum( count( data["black"] | data["white"] ) == 4 )
+  selected = np.random.RandomState( seed ).rand( games.max() + 1 ) < validation
+
+  return data[ ~selected[ games ] ], data[ selected[ games ] ]
+
+def symmetry_classes():
+  '''
+  Group the squares moved to each other by the symmetries
+
+  Return:
+    List of bitboards, one for each class
+  '''
+
+  classes = {}
+
+  for square in xrange(64):
+    key = min( symmetry.transform_square( square, transform ) for transform in xrange(8) )
+    classes[ key ] = classes.get( key, 0 ) | ( 1 << square )
+
+  return [ classes[ key ] for key in sorted( classes ) ]
+
+SYMMETRY_CLASSES = np.array( symmetry_classes(), dtype=np.uint64 )
+
+def feature_matrix(data):
+  '''
+  Features of the FeatureEvaluator terms and the pieces
+  on each symmetry class, from the black view
+
+  Params:
+    data : Structured array of records
+
+  Return:
+    Array ( N, terms + classes ) of features
+  '''
+
+  black = np.ascontiguousarray( data["black"] ).astype( np.uint64 )
+  white = np.ascontiguousarray( data["white"] ).astype( np.uint64 )
+  black_to_move = data["black_to_move"] == 1
+
+  evaluator = FeatureEvaluator( {
+    "phases": 1,
+    "weights": dict( ( term, 1.0 ) for term in FeatureEvaluator.TERMS )
+  } )
+
+  columns = np.zeros( ( len( data ), len( FeatureEvaluator.TERMS ) ) )
+
+  # Parity needs the color to move of all boards
+  for to_move in ( True, False ):
+    selected = black_to_move == to_move
+
+    if not selected.any(): continue
+
+    empties, features = evaluator.features( black[ selected ], white[ selected ], True, to_move )
+    columns[ selected ] = np.column_stack( [ features[ term ] for term in FeatureEvaluator.TERMS ] )
+
+  pieces = [
+    count( black & mask ) - count( white & mask ) for mask in SYMMETRY_CLASSES
+  ]
+
+  return np.column_stack( [ columns ] + pieces ).astype( np.float64 )
+
+def fit_features(data, phases = 3, ridge = 1.0):
+  '''
+  Fit the FeatureEvaluator weights with a ridge
+  regression on each phase
+
+  Params:
+    data   : Structured array of records
+    phases : Amount of phases of the weights
+    ridge  : Penalty of the squared weights
+
+  Defaults:
+    phases : 3
+    ridge  : 1.0
+
+  Return:
+    Dictionary with the weights, on the format of
+    the weight files
+  '''
+
+  matrix = feature_matrix( data )
+  target = data["score"].astype( np.float64 )
+  phase = get_phases( data["black"], data["white"], phases )
+
+  terms = len( FeatureEvaluator.TERMS )
+  solutions = np.zeros( ( phases, matrix.shape[1] ) )
+
+  for idx in xrange( phases ):
+    selected = phase == idx
+
+    if not selected.any(): continue
+
+    features = matrix[ selected ]
+    system = features.T.dot( features ) + ridge * np.eye( features.shape[1] )
+    solutions[ idx ] = np.linalg.solve( system, features.T.dot( target[ selected ] ) )
+
+  position = np.zeros( ( phases, 64 ) )
+
+  for idx, mask in enumerate( SYMMETRY_CLASSES ):
+    for square in bitboard.iter_squares( int( mask ) ):
+      position[ :, square ] = solutions[ :, terms + idx ]
+
+  return {
+    "phases": phases,
+    "weights": dict(
+      ( term, solutions[ :, idx ].round( 4 ).tolist() ) for idx, term in enumerate( FeatureEvaluator.TERMS )
+    ),
+    "position": position.round( 4 ).tolist()
+  }
+
+def fit_patterns(data, phases = 4, epochs = 100, ridge = 1.0, weights = None):
+  '''
+  Fit the PatternEvaluator tables. Each epoch moves all
+  the table entries by the mean residual of the positions
+  where they appear. Every position is also added with
+  the colors swapped and the score negated
+
+  Params:
+    data    : Structured array of records
+    phases  : Amount of phases of the tables
+    epochs  : Amount of gradient steps
+    ridge   : Added to the amount of positions of each
+              entry, so rare entries move less
+    weights : Initial tables, ( phases, TABLE_SIZE )
+
+  Defaults:
+    phases  : 4
+    epochs  : 100
+    ridge   : 1.0
+    weights : None, start from zero
+
+  Return:
+    Array ( phases, TABLE_SIZE ) of float32 weights
+  '''
+
+  black = np.ascontiguousarray( data["black"] ).astype( np.uint64 )
+  white = np.ascontiguousarray( data["white"] ).astype( np.uint64 )
+
+  indices = np.concatenate( ( patterns.get_indices( black, white ), patterns.get_indices( white, black ) ) )
+  target = np.concatenate( ( data["score"], -data["score"] ) ).astype( np.float64 )
+
+  empties = np.tile( 64 - count( black | white ), 2 )
+  phase = np.minimum( ( 60 - empties ) * phases // 61, phases - 1 )
+
+  if weights is None:
+    weights = np.zeros( ( phases, patterns.TABLE_SIZE ) )
+  else:
+    weights = np.array( weights, dtype=np.float64 )
+
+  instances = indices.shape[1]
+
+  for idx in xrange( phases ):
+    selected = phase == idx
+
+    if not selected.any(): continue
+
+    phase_indices = indices[ selected ]
+    flat = phase_indices.ravel()
+    table = weights[ idx ]
+
+    # Each entry moves by its mean residual, split over
+    # the instances that add up the prediction
+    scale = 1.0 / ( ( np.bincount( flat, minlength=patterns.TABLE_SIZE ) + ridge ) * instances )
+
+    for epoch in xrange( epochs ):
+      residual = target[ selected ] - table[ phase_indices ].sum( axis=1 )
+      table += scale * np.bincount( flat, weights=np.repeat( residual, instances ), minlength=patterns.TABLE_SIZE )
+
+  return weights.astype( np.float32 )
+
+def prediction_error(evaluator, data):
+  '''
+  Root mean squared error of an evaluator predicting
+  the final scores
+
+  Params:
+    evaluator : Evaluator instance
+    data      : Structured array of records
+
+  Return:
+    Error on discs
+  '''
+
+  black = np.ascontiguousarray( data["black"] ).astype( np.uint64 )
+  white = np.ascontiguousarray( data["white"] ).astype( np.uint64 )
+  black_to_move = data["black_to_move"] == 1
+
+  error = 0.0
+
+  for to_move in ( True, False ):
+    selected = black_to_move == to_move
+
+    if not selected.any(): continue
+
+    predicted = evaluator.evaluate_bitboards( black[ selected ], white[ selected ], True, to_move )
+    error += ( ( predicted - data["score"][ selected ] ) ** 2 ).sum()
+
+  return np.sqrt( error / max( len( data ), 1 ) )
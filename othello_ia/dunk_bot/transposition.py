@@ -0,0 +1,238 @@
+'''
+Transposition Table
+
+Bounded table of already searched positions, indexed by
+the Zobrist hash of the bitboards
+'''
+
+import random
+
+def create_zobrist_tables(seed):
+  '''
+  Create the random keys used by the Zobrist hashing
+
+  The key of each square is folded on tables of 256 entries
+  by byte of the bitboard, so the hash of a full board is
+  computed with 8 lookups per color
+
+  Params:
+    seed : Seed of the random keys
+
+  Return:
+    A tuple with three values:
+      black_tables : 8 tables of 256 keys for the black bitboard
+      white_tables : 8 tables of 256 keys for the white bitboard
+      side_key     : Key of the black side to play
+  '''
+
+  generator = random.Random( seed )
+
+  def byte_tables():
+    square_keys = [ generator.getrandbits(64) for _ in xrange(64) ]
+    tables = []
+
+    for byte in xrange(8):
+      table = []
+
+      for value in xrange(256):
+        key = 0
+
+        for bit in xrange(8):
+          if value & ( 1 << bit ):
+            key ^= square_keys[ byte * 8 + bit ]
+
+        table.append( key )
+
+      tables.append( tuple( table ) )
+
+    return tuple( tables )
+
+  black_tables = byte_tables()
+  white_tables = byte_tables()
+  side_key = generator.getrandbits(64)
+
+  return black_tables, white_tables, side_key
+
+BLACK_TABLES, WHITE_TABLES, SIDE_KEY = create_zobrist_tables( 0x0D0C )
+
+def zobrist_hash(black, white, black_to_move):
+  '''
+  Zobrist hash of a position
+
+  Params:
+    black         : Black bitboard
+    white         : White bitboard
+    black_to_move : True if is the black turn
+
+  Return:
+    64 bits hash of the position
+  '''
+
+  b0, b1, b2, b3, b4, b5, b6, b7 = BLACK_TABLES
+  w0, w1, w2, w3, w4, w5, w6, w7 = WHITE_TABLES
+
+  key = SIDE_KEY if black_to_move else 0
+
+  key ^= b0[ black & 0xFF ] ^ b1[ (black >> 8) & 0xFF ] ^ b2[ (black >> 16) & 0xFF ] ^ b3[ (black >> 24) & 0xFF ]
+  key ^= b4[ (black >> 32) & 0xFF ] ^ b5[ (black >> 40) & 0xFF ] ^ b6[ (black >> 48) & 0xFF ] ^ b7[ black >> 56 ]
+  key ^= w0[ white & 0xFF ] ^ w1[ (white >> 8) & 0xFF ] ^ w2[ (white >> 16) & 0xFF ] ^ w3[ (white >> 24) & 0xFF ]
+  key ^= w4[ (white >> 32) & 0xFF ] ^ w5[ (white >> 40) & 0xFF ] ^ w6[ (white >> 48) & 0xFF ] ^ w7[ white >> 56 ]
+
+  return key
+
+class TranspositionTable(object):
+  """
+  TranspositionTable
+
+  Fixed size table of search results. Each slot holds
+  a single entry, chosen by the replacement policy
+  """
+
+  # Bound types of the stored values
+  EXACT = 0
+  LOWER = 1
+  UPPER = 2
+
+  # Replacement policies
+  REPLACE_DEPTH = "depth"
+  REPLACE_ALWAYS = "always"
+
+  def __init__(self, size = 2 ** 18, replacement = REPLACE_DEPTH):
+    '''
+    TranspositionTable Constructor
+
+    Params:
+      size        : Max number of entries, rounded down
+                    to a power of two
+      replacement : Replacement policy when a slot is
+                    already used, REPLACE_DEPTH keeps the
+                    deepest entry of the current search and
+                    REPLACE_ALWAYS keeps the newest entry
+
+    Defaults:
+      size        : 2 ** 18
+      replacement : REPLACE_DEPTH
+    '''
+
+    if replacement not in ( self.REPLACE_DEPTH, self.REPLACE_ALWAYS ):
+      raise ValueError( "Unknown replacement policy: %s" % replacement )
+
+    self.size = 1 << ( max( size, 1 ).bit_length() - 1 )
+    self.mask = self.size - 1
+    self.replacement = replacement
+
+    self.entries = [ None ] * self.size
+    self.generation = 0
+
+    # Amount of slots with an entry, kept by store and
+    # clear so the stats do not scan the whole table
+    self.used = 0
+
+    self.reset_counters()
+
+  def reset_counters(self):
+    '''
+    Reset the hit, miss and collision counters
+    '''
+
+    self.hits = 0
+    self.misses = 0
+    self.collisions = 0
+    self.stores = 0
+    self.replaced = 0
+
+  def clear(self):
+    '''
+    Remove all entries of the table
+    '''
+
+    self.entries = [ None ] * self.size
+    self.generation = 0
+    self.used = 0
+
+  def new_search(self):
+    '''
+    Mark the start of a new search. Entries of older
+    searches are always replaced by newer ones
+    '''
+
+    self.generation += 1
+
+  def probe(self, key):
+    '''
+    Search for the entry of a position
+
+    Params:
+      key : Zobrist hash of the position
+
+    Return:
+      Tuple ( depth, value, bound, move ) or None when
+      the position is not on the table
+    '''
+
+    entry = self.entries[ key & self.mask ]
+
+    if entry is None:
+      self.misses += 1
+      return None
+
+    if entry[0] != key:
+      self.misses += 1
+      self.collisions += 1
+      return None
+
+    self.hits += 1
+
+    return entry[1:5]
+
+  def store(self, key, depth, value, bound, move):
+    '''
+    Store the result of a search
+
+    Params:
+      key   : Zobrist hash of the position
+      depth : Remaining depth searched from the position
+      value : Value found by the search
+      bound : EXACT, LOWER or UPPER
+      move  : Best square found, or None
+    '''
+
+    index = key & self.mask
+    entry = self.entries[ index ]
+
+    if entry is None:
+      self.used += 1
+
+    else:
+
+      if self.replacement == self.REPLACE_DEPTH and entry[5] == self.generation and \
+         entry[1] > depth and entry[0] != key:
+        return
+
+      if entry[0] != key:
+        self.replaced += 1
+
+    self.stores += 1
+    self.entries[ index ] = ( key, depth, value, bound, move, self.generation )
+
+  def stats(self):
+    '''
+    Counters of the table usage
+
+    Return:
+      Dictionary with the counters and the amount
+      of used slots
+    '''
+
+    probes = self.hits + self.misses
+
+    return {
+      "size": self.size,
+      "used": self.used,
+      "hits": self.hits,
+      "misses": self.misses,
+      "collisions": self.collisions,
+      "stores": self.stores,
+      "replaced": self.replaced,
+      "hit_rate": float( self.hits ) / probes if probes else 0.0
+    }
@@ -1,11 +1,26 @@
 
+import logging
+import os
 import sys
 import utils
 from dunk_bot.dunk_bot import DunkBot
+from dunk_bot.book import OpeningBook
 
-import time
+# Seconds available for each move, with a margin
+# for the process start and the move output
+TIME_BUDGET = 4.0
+TIME_MARGIN = 0.3
 
-def run( args ):
+# Opening book, built with runner_book.py
+BOOK_FILE = os.path.join( os.path.dirname( os.path.abspath(__file__) ), "book.bin" )
+
+# Optional switches of production runs: DUNKBOT_LOG sends the
+# messages of the bot to a log file, with the counters of the
+# search, and DUNKBOT_PROFILE writes the cProfile of the move
+LOG_FILE = os.environ.get( "DUNKBOT_LOG" )
+PROFILE_FILE = os.environ.get( "DUNKBOT_PROFILE" )
+
+def run( args, time_limit = TIME_BUDGET - TIME_MARGIN ):
     board_file = None
     color = None
 
@@ -24,35 +39,31 @@ def run( args ):
     board = utils.convert_board_from_file( board_file )
 
     # Play the game!
-    nope_move = DunkBot.NOPE_MOVE
-    last_move = nope_move
-
-    total_time = 0.0
+    # The bot deepens the search until the time
+    # limit and keeps the best complete move
+    book = OpeningBook( BOOK_FILE ) if os.path.exists( BOOK_FILE ) else None
 
-    for depth in xrange(3, 6):
-        print "--------------------------------"
-        print "New try..."
+    if LOG_FILE:
+        logging.basicConfig( filename = LOG_FILE, level = logging.INFO,
+            format = "%(asctime)s %(name)s %(message)s" )
 
-        start = time.clock()
+    bot = DunkBot( max_depth = 64, book = book, profile = PROFILE_FILE is not None,
+        use_logging = LOG_FILE is not None )
+    move = tuple( bot.play( board, color, time_limit = time_limit ) )
 
-        bot = DunkBot( max_depth = depth )
-        move = tuple( bot.play( board, color ) )
+    bot.print_report()
 
-        if (move == nope_move).all() and (last_move != nope_move).all():
-            move = last_move
+    if LOG_FILE:
+        for line in bot.stats.report():
+            bot.log( line )
 
-        print "Selected move: ", move
+    if PROFILE_FILE:
+        bot.stats.profile.dump_stats( PROFILE_FILE )
 
-        utils.write_move( move )
+    print "Selected move: ", move
 
-        total_time += time.clock() - start
-
-        print "Total time: ", total_time
-        if total_time > 4: break
-
-        last_move = move
+    utils.write_move( move )
 
 if __name__ == "__main__":
     run( sys.argv )
 
-
@@ -0,0 +1,33 @@
+
+import json
+import sys
+from dunk_bot import analysis
+
+def run( args ):
+    input_name = args[1] if len( args ) > 1 else "-"
+    workers = int( args[2] ) if len( args ) > 2 else 2
+    depth = int( args[3] ) if len( args ) > 3 else 6
+    time_limit = float( args[4] ) if len( args ) > 4 and args[4] != "none" else None
+    max_pending = int( args[5] ) if len( args ) > 5 else None
+
+    input_file = sys.stdin if input_name == "-" else open( input_name, "r" )
+
+    errors = 0
+
+    try:
+        positions = analysis.read_positions( input_file )
+
+        for result in analysis.analyse_stream( positions, workers, { "max_depth": depth }, time_limit, max_pending ):
+            errors += "error" in result
+
+            sys.stdout.write( json.dumps( result, sort_keys = True ) + "\n" )
+            sys.stdout.flush()
+
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+
+    return errors == 0
+
+if __name__ == "__main__":
+    sys.exit( 0 if run( sys.argv ) else 1 )
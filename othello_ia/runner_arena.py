@@ -0,0 +1,35 @@
+
+import sys
+from dunk_bot import arena
+
+def run( args ):
+    if len( args ) < 3:
+        print "Usage: runner_arena.py <config 1> <config 2> [openings] [workers] [plies]"
+        print "       config: depth=4,time=0.5,evaluator=patterns:weights.bin,algorithm=pvs"
+        return False
+
+    names = args[1:3]
+    configs = [ arena.parse_config( text ) for text in names ]
+
+    amount = int( args[3] ) if len( args ) > 3 else 10
+    workers = int( args[4] ) if len( args ) > 4 else 2
+    plies = int( args[5] ) if len( args ) > 5 else 4
+
+    openings = arena.create_openings( amount, plies )
+
+    def report( games, score ):
+        print "Game %3d/%d: %+d" % ( games, 2 * len( openings ), score )
+
+    result, stats = arena.play_match( configs, openings, workers, report )
+
+    print "%(wins)d wins, %(draws)d draws, %(losses)d losses, score %(score).3f" % result
+    print "Elo %+.1f [%+.1f, %+.1f]" % ( result["elo"], result["elo_low"], result["elo_high"] )
+
+    for name, item in zip( names, stats ):
+        print "%s: %d moves, %.0f nodes/s, %.3f s/move" % (
+            name, item["moves"], item["nodes_per_second"], item["seconds_per_move"] )
+
+    return True
+
+if __name__ == "__main__":
+    sys.exit( 0 if run( sys.argv ) else 1 )
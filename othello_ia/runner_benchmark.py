@@ -0,0 +1,646 @@
+
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+from dunk_bot.dunk_bot import DunkBot
+from dunk_bot import bitboard
+from dunk_bot.evaluation import BatchEvaluator, FeatureEvaluator, load_weights
+from dunk_bot.endgame import EndgameSolver
+from dunk_bot.book import BookBuilder, OpeningBook, START_BLACK, START_WHITE, format_move
+from dunk_bot.patterns import PatternEvaluator, save_pattern_weights
+from benchmark import positions
+from benchmark import movegen
+from benchmark import expand
+from benchmark import memory
+from benchmark import evaluation
+from benchmark import parallel
+from benchmark import ordering
+from benchmark import pvs
+from benchmark import endgame
+from benchmark import book
+from benchmark import symmetry
+from benchmark import passes
+from benchmark import patterns
+from benchmark import suite
+from benchmark import perft
+from benchmark import ponder
+from benchmark import counts
+from dunk_bot.symmetry import canonical
+
+def run_movegen( args ):
+    games = int( args[0] ) if args else 50
+
+    bot = DunkBot()
+
+    # Fixed corpus plus all the plies of random games
+    corpus = [ ( board, color ) for name, board, color in positions.load_positions() ]
+    random_corpus = list( movegen.random_positions( bot, games ) )
+
+    checked, mismatches = movegen.verify( bot, corpus + random_corpus )
+
+    print "Positions checked: ", checked
+    print "Mismatches: ", len( mismatches )
+
+    for board, color, reason in mismatches[:10]:
+        print "--------------------------------"
+        print "Color: ", color, " ", reason
+        bot.print_board( board )
+
+    reference_rate, bitboard_rate = movegen.measure( bot, corpus )
+
+    print "Reference positions/s: %.1f" % reference_rate
+    print "Bitboard positions/s: %.1f" % bitboard_rate
+    print "Speedup: %.1fx" % ( bitboard_rate / reference_rate )
+
+    return len( mismatches ) == 0
+
+def run_expand( args ):
+    depth = int( args[0] ) if args else 2
+
+    bot = DunkBot()
+
+    totals = dict.fromkeys( [ "generated", "unique", "legacy_nodes", "legacy_time", "nodes", "time" ], 0 )
+
+    print "%-12s %9s %6s %12s %12s %10s %10s" % (
+        "position", "generated", "unique", "tree before", "tree after", "before n/s", "after n/s" )
+
+    for name, board, color in positions.load_positions( "midgame" ):
+        result = expand.measure( bot, board, color, depth )
+
+        print "%-12s %9d %6d %12d %12d %10.0f %10.0f" % ( name,
+            result["generated"], result["unique"], result["legacy_nodes"], result["nodes"],
+            result["legacy_rate"], result["rate"] )
+
+        for key in totals:
+            totals[ key ] += result[ key ]
+
+
+    print "Branching inflation: %.2fx" % ( float( totals["generated"] ) / totals["unique"] )
+    print "Tree inflation at depth %d: %.2fx" % ( depth, float( totals["legacy_nodes"] ) / totals["nodes"] )
+    print "Nodes/s before: %.0f after: %.0f" % (
+        totals["legacy_nodes"] / totals["legacy_time"], totals["nodes"] / totals["time"] )
+
+    return True
+
+def run_memory( args ):
+    max_depth = int( args[0] ) if args else 5
+
+    bot = DunkBot( tt_size = 0 )
+
+    print "Peak memory in %s" % memory.unit()
+    print "%-12s %5s %10s %10s %10s %10s" % ( "position", "depth", "copy peak", "copy nodes", "peak", "nodes" )
+
+    for name, board, color in positions.load_positions( "midgame" )[:4]:
+        for depth in xrange( 3, max_depth + 1 ):
+            result = memory.measure( bot, board, color, depth )
+
+            print "%-12s %5d %10d %10d %10d %10d" % ( name, depth,
+                result["copy_peak"], result["copy_nodes"], result["peak"], result["nodes"] )
+
+    return True
+
+def run_evaluation( args ):
+    depth = int( args[0] ) if args else 4
+
+    bot = DunkBot( max_depth = depth )
+    evaluator = BatchEvaluator( DunkBot.POSITION_MODIFIER )
+
+    bitboards = [ bot.create_bitboard( board ) for board, color in movegen.random_positions( bot, 40 ) ]
+    black = np.array( [ b for b, w in bitboards ], dtype=np.uint64 )
+    white = np.array( [ w for b, w in bitboards ], dtype=np.uint64 )
+
+    for batch_size in ( 1, 4, 8, 16, 64, 256 ):
+        print "Batch %3d: %8.2f us/board" % ( batch_size, evaluation.measure( evaluator, black, white, batch_size ) )
+
+    boards = [ ( board, color ) for name, board, color in positions.load_positions( "midgame" ) ]
+
+    for name, search_evaluator in ( ( "calculate_score", None ), ( "batch", evaluator ) ):
+        search_bot = DunkBot( max_depth = depth, evaluator = search_evaluator )
+        nodes, seconds = evaluation.measure_search( search_bot, boards )
+
+        print "Search with %-15s depth %d: %8d nodes %7.3f s %8.0f nodes/s" % (
+            name, depth, nodes, seconds, nodes / seconds )
+
+    return True
+
+def run_parallel( args ):
+    depth = int( args[0] ) if args else 6
+    worker_counts = [ int( arg ) for arg in args[1:] ] or [ 1, 2, 4, 8, 16 ]
+
+    boards = [ ( board, color ) for name, board, color in positions.load_positions( "midgame" ) ]
+
+    serial_moves = None
+    serial_time = None
+    same = True
+
+    print "%7s %10s %8s %8s %10s" % ( "workers", "nodes", "time", "speedup", "same move" )
+
+    for workers in worker_counts:
+        moves, nodes, seconds = parallel.measure( DunkBot, boards, depth, workers )
+
+        if serial_moves is None:
+            serial_moves, serial_time = moves, seconds
+
+        matches = sum( 1 for move, serial_move in zip( moves, serial_moves ) if move == serial_move )
+        same = same and matches == len( moves )
+
+        print "%7d %10d %8.2f %7.2fx %5d/%d" % ( workers, nodes, seconds, serial_time / seconds,
+            matches, len( moves ) )
+
+    return same
+
+def run_ordering( args ):
+    depth = int( args[0] ) if args else 5
+
+    boards = [ ( board, color ) for name, board, color in positions.load_positions( "midgame" ) ]
+
+    print "%-8s %10s %8s %9s %12s" % ( "ordering", "nodes", "time", "cutoffs", "first cutoff" )
+
+    for name, policies in ordering.CONFIGURATIONS:
+        result = ordering.measure( DunkBot, boards, depth, policies )
+
+        print "%-8s %10d %8.2f %9d %11.1f%%" % ( name, result["nodes"], result["time"], result["cutoffs"],
+            100.0 * result["first_cutoffs"] / max( result["cutoffs"], 1 ) )
+
+    return True
+
+def run_pvs( args ):
+    depth = int( args[0] ) if args else 5
+
+    boards = [ ( board, color ) for name, board, color in positions.load_positions() ]
+
+    same = True
+
+    print "%-8s %-8s %10s %8s %12s" % ( "table", "search", "nodes", "time", "same value" )
+
+    for table, tt_size in ( ( "off", 0 ), ( "on", 2 ** 18 ) ):
+        minimax_values = None
+
+        for algorithm in ( DunkBot.ALGORITHM_MINIMAX, DunkBot.ALGORITHM_PVS ):
+            values, nodes, seconds = pvs.measure( DunkBot, boards, depth, algorithm, tt_size )
+
+            if minimax_values is None:
+                minimax_values = values
+
+            matches = sum( 1 for value, minimax_value in zip( values, minimax_values )
+                if abs( value - minimax_value ) < 1e-9 )
+
+            # Without table both searches must give the exact same values
+            if not tt_size:
+                same = same and matches == len( values )
+
+            print "%-8s %-8s %10d %8.2f %7d/%d" % ( table, algorithm, nodes, seconds, matches, len( values ) )
+
+    return same
+
+def run_endgame( args ):
+    max_empties = int( args[0] ) if args else 16
+
+    bot = DunkBot()
+    correct = True
+
+    print "%-12s %7s %5s %6s %10s %8s %10s %8s %9s" % ( "position", "empties", "wld", "exact", "nodes", "time",
+        "nodes/s", "move", "reference" )
+
+    for name, board, color in positions.load_positions( "endgame" ):
+        black, white = bot.create_bitboard( board )
+        empties = 64 - bitboard.count( black | white )
+
+        if empties > max_empties: continue
+
+        own, opp = ( black, white ) if bot.transform_color( color ) == bot.BLACK else ( white, black )
+
+        wld = endgame.measure( own, opp, EndgameSolver.MODE_WLD )
+        exact = endgame.measure( own, opp, EndgameSolver.MODE_EXACT )
+
+        correct = correct and wld["value"] == ( exact["value"] > 0 ) - ( exact["value"] < 0 )
+
+        reference = "-"
+
+        if empties <= endgame.REFERENCE_EMPTIES:
+            reference_value = endgame.reference_solve( own, opp )
+            correct = correct and reference_value == exact["value"]
+            reference = str( reference_value )
+
+        print "%-12s %7d %5d %6d %10d %8.2f %10.0f %8s %9s" % ( name, empties, wld["value"], exact["value"],
+            exact["nodes"], exact["time"], exact["rate"],
+            bitboard.square_position( exact["move"] ) if exact["move"] is not None else "-", reference )
+
+        print "%-12s %7s %5s %6s %10d %8.2f %10.0f   (wld)" % ( "", "", "", "", wld["nodes"], wld["time"], wld["rate"] )
+
+    return correct
+
+def run_book( args ):
+    plies = int( args[0] ) if args else 8
+    book_file = args[1] if len( args ) > 1 else None
+    depth = 6
+
+    bot = DunkBot( max_depth = depth )
+
+    # Without a book file a small one is built by self-play
+    if book_file is None:
+        handle, book_file = tempfile.mkstemp( suffix = ".bin" )
+        os.close( handle )
+
+        builder = BookBuilder()
+        builder.add_self_play( bot, 60, plies, variety = 0.5 )
+        builder.write( book_file )
+
+    opening_book = OpeningBook( book_file )
+
+    # First plies of random games
+    boards = [ ( board, color ) for board, color in movegen.random_positions( bot, 30, seed = 1 )
+        if ( board != bot.EMPTY ).sum() <= 4 + plies ]
+
+    bitboards = []
+
+    for board, color in boards:
+        black, white = bot.create_bitboard( board )
+        bitboards.append( ( black, white ) if bot.transform_color( color ) == bot.BLACK else ( white, black ) )
+
+    print "Book positions: ", opening_book.size
+    print "Lookup: %.1f us/position" % book.measure_lookup( opening_book, bitboards )
+
+    opening_book.reset_counters()
+    book_results = book.measure_play( DunkBot( max_depth = depth, book = opening_book ), boards )
+    stats = opening_book.stats()
+
+    # Search of the same positions found on the book
+    hit_boards = [ board for board, result in zip( boards, book_results ) if result[2] ]
+    search_results = book.measure_play( bot, hit_boards )
+
+    book_time = sum( seconds for move, seconds, book_move in book_results if book_move )
+
+    print "Hits: %d misses: %d hit rate: %.1f%%" % ( stats["hits"], stats["misses"], 100.0 * stats["hit_rate"] )
+    print "Book move: %.1f us/move, search depth %d: %.1f us/move" % (
+        book_time * 1e6 / max( len( hit_boards ), 1 ), depth,
+        sum( result[1] for result in search_results ) * 1e6 / max( len( hit_boards ), 1 ) )
+
+    opening_book.close()
+
+    if len( args ) < 2:
+        os.remove( book_file )
+
+    return True
+
+def run_symmetry( args ):
+    games = int( args[0] ) if args else 20
+
+    bot = DunkBot()
+
+    bitboards = []
+
+    for board, color in [ ( board, color ) for name, board, color in positions.load_positions() ] + \
+            list( movegen.random_positions( bot, games ) ):
+        black, white = bot.create_bitboard( board )
+        bitboards.append( ( black, white ) if bot.transform_color( color ) == bot.BLACK else ( white, black ) )
+
+    failures = symmetry.verify( bitboards )
+
+    print "Positions checked: ", len( bitboards )
+    print "Failures: ", len( failures )
+
+    for failure in failures[:10]:
+        print failure
+
+    print "Canonical with tables: %.1f us/position" % symmetry.measure( symmetry.table_canonical, bitboards )
+    print "Canonical with delta swaps: %.1f us/position" % symmetry.measure( canonical, bitboards )
+
+    return len( failures ) == 0
+
+def run_passes( args ):
+    max_depth = int( args[0] ) if args else 4
+
+    reference_bot = DunkBot()
+    bots = [
+        ( "minimax", DunkBot( tt_size = 0, endgame_empties = 0 ) ),
+        ( "minimax tt", DunkBot( endgame_empties = 0 ) ),
+        ( "pvs", DunkBot( tt_size = 0, endgame_empties = 0, algorithm = DunkBot.ALGORITHM_PVS ) ),
+        ( "pvs tt", DunkBot( endgame_empties = 0, algorithm = DunkBot.ALGORITHM_PVS ) ),
+    ]
+
+    failures = 0
+
+    print "%-10s %5s %10s %s" % ( "position", "depth", "reference", "  ".join( name for name, bot in bots ) )
+
+    for name, board, color in positions.load_positions( "passes" ):
+        black, white = reference_bot.create_bitboard( board )
+        own, opp = ( black, white ) if reference_bot.transform_color( color ) == reference_bot.BLACK else ( white, black )
+
+        empties = 64 - bitboard.count( black | white )
+
+        # The play stops on the first depth without root movements
+        depths = min( max_depth, max( empties, 1 ) ) if bitboard.get_moves( own, opp ) else 1
+
+        for depth in xrange( 1, depths + 1 ):
+            reference = passes.reference_search( reference_bot, own, opp, True, depth )
+            values = [ passes.search_value( bot, board, color, depth )[0] for bot_name, bot in bots ]
+
+            same = all( value == reference for value in values )
+            failures += not same
+
+            print "%-10s %5d %10s %s %s" % ( name, depth, reference, "  ".join( str( value ) for value in values ),
+                "" if same else "MISMATCH" )
+
+        # No movement on the root
+        if not bitboard.get_moves( own, opp ):
+            move = tuple( bots[0][1].play( board, color ) )
+            failures += move != tuple( DunkBot.NOPE_MOVE )
+
+            print "%-10s root without movements, move %s" % ( name, move )
+
+    print "Failures: ", failures
+
+    return failures == 0
+
+def run_features( args ):
+    depth = int( args[0] ) if args else 4
+    weights = load_weights( args[1] ) if len( args ) > 1 else load_weights()
+
+    bot = DunkBot( max_depth = depth )
+
+    bitboards = [ bot.create_bitboard( board ) for board, color in movegen.random_positions( bot, 40 ) ]
+    black = np.array( [ b for b, w in bitboards ], dtype=np.uint64 )
+    white = np.array( [ w for b, w in bitboards ], dtype=np.uint64 )
+
+    for batch_size in ( 1, 8, 64 ):
+        print "Batch %3d: %8.2f us/board all terms" % ( batch_size,
+            evaluation.measure( FeatureEvaluator( weights ), black, white, batch_size ) )
+
+    print "Terms on batches of 8:"
+
+    for term, cost in evaluation.measure_terms( weights, black, white, 8 ):
+        print "  %-20s %8.2f us/board" % ( term, cost )
+
+    stable, violations = evaluation.verify_stable( bitboards[ ::10 ], 5 )
+
+    print "Stable pieces: %d, flipped on random games: %d" % ( stable, violations )
+
+    boards = [ ( board, color ) for name, board, color in positions.load_positions( "midgame" ) ]
+
+    for name, search_evaluator in ( ( "calculate_score", None ),
+            ( "batch", BatchEvaluator( DunkBot.POSITION_MODIFIER ) ), ( "features", FeatureEvaluator( weights ) ) ):
+        search_bot = DunkBot( max_depth = depth, evaluator = search_evaluator )
+        nodes, seconds = evaluation.measure_search( search_bot, boards )
+
+        print "Search with %-15s depth %d: %8d nodes %7.3f s %8.0f nodes/s" % (
+            name, depth, nodes, seconds, nodes / seconds )
+
+    return violations == 0
+
+def run_patterns( args ):
+    depth = int( args[0] ) if args else 4
+
+    bot = DunkBot( max_depth = depth )
+
+    bitboards = [ bot.create_bitboard( board ) for board, color in movegen.random_positions( bot, 40 ) ]
+    black = np.array( [ b for b, w in bitboards ], dtype=np.uint64 )
+    white = np.array( [ w for b, w in bitboards ], dtype=np.uint64 )
+
+    # Seeded tables against the position table alone
+    pattern_evaluator = PatternEvaluator( position_weights = DunkBot.POSITION_MODIFIER )
+    position_evaluator = BatchEvaluator( DunkBot.POSITION_MODIFIER, 0.0, 0.0, 0.0 )
+
+    error = np.abs( pattern_evaluator.evaluate_bitboards( black, white ) -
+        position_evaluator.evaluate_bitboards( black, white ) ).max()
+
+    print "Seeded tables, max difference with the position table: %g" % error
+
+    checks, failures = patterns.verify_indices( bitboards[ ::4 ], 12 )
+
+    print "Incremental indices: %d checks, %d failures" % ( checks, failures )
+
+    # Tables loaded from a weight file
+    handle, path = tempfile.mkstemp( suffix = ".bin" )
+    os.close( handle )
+
+    try:
+        save_pattern_weights( pattern_evaluator.weights, path )
+
+        start = time.time()
+        file_evaluator = PatternEvaluator( path )
+        print "Weight file: %d bytes, mapped in %.3f ms" % ( os.path.getsize( path ), ( time.time() - start ) * 1e3 )
+
+        error = np.abs( file_evaluator.evaluate_bitboards( black, white ) -
+            pattern_evaluator.evaluate_bitboards( black, white ) ).max()
+
+        print "Weight file, max difference with the seeded tables: %g" % error
+
+        del file_evaluator
+
+    finally:
+        os.remove( path )
+
+    play_cost, evaluate_cost = patterns.measure_board( pattern_evaluator, bitboards )
+
+    print "Play and undo: %.2f us, evaluation: %.2f us" % ( play_cost, evaluate_cost )
+
+    for batch_size in ( 1, 8, 64 ):
+        print "Batch %3d: %8.2f us/board" % ( batch_size,
+            evaluation.measure( pattern_evaluator, black, white, batch_size ) )
+
+    boards = [ ( board, color ) for name, board, color in positions.load_positions( "midgame" ) ]
+
+    for name, search_evaluator in ( ( "calculate_score", None ),
+            ( "batch", BatchEvaluator( DunkBot.POSITION_MODIFIER ) ), ( "features", FeatureEvaluator() ),
+            ( "patterns", pattern_evaluator ) ):
+        search_bot = DunkBot( max_depth = depth, evaluator = search_evaluator )
+        nodes, seconds = evaluation.measure_search( search_bot, boards )
+
+        print "Search with %-15s depth %d: %8d nodes %7.3f s %8.0f nodes/s" % (
+            name, depth, nodes, seconds, nodes / seconds )
+
+    return failures == 0 and error < 1e-3
+
+def run_stats( args ):
+    depth = int( args[0] ) if args else 5
+
+    boards = [ ( board, color ) for name, board, color in positions.load_positions( "midgame" ) ]
+
+    for timing in ( False, True ):
+        bot = DunkBot( max_depth = depth, timing = timing )
+        nodes, seconds = evaluation.measure_search( bot, boards )
+
+        print "Timing %-5s depth %d: %8d nodes %7.3f s %8.0f nodes/s" % ( timing, depth, nodes, seconds, nodes / seconds )
+
+    for line in bot.stats.report():
+        print line
+
+    bot = DunkBot( max_depth = depth, profile = True )
+    bot.play( *boards[0] )
+
+    print bot.stats.profile_report( 10 )
+
+    return True
+
+def run_suite( args ):
+    depth = int( args[0] ) if args else 5
+    report_file = args[1] if len( args ) > 1 else None
+    baseline_file = args[2] if len( args ) > 2 else None
+
+    report = suite.run( DunkBot, depth, repeat = 3 )
+
+    print "%-10s %10s %8s %10s  %s" % ( "category", "nodes", "time", "nodes/s", "time to depth" )
+
+    for category in suite.CATEGORIES:
+        item = report["categories"][ category ]
+        print "%-10s %10d %8.2f %10.0f  %s" % ( category, item["nodes"], item["time"], item["nodes_per_second"],
+            " ".join( "%.3f" % seconds for seconds in item["time_to_depth"] ) )
+
+    print "%-10s %10d %8.2f %10.0f" % ( "total", report["total"]["nodes"], report["total"]["time"],
+        report["total"]["nodes_per_second"] )
+
+    if report_file:
+        suite.save_report( report, report_file )
+
+    if baseline_file:
+        return compare_reports( report, suite.load_report( baseline_file ) )
+
+    return True
+
+def run_compare( args ):
+    if len( args ) < 2:
+        print "Missing the report and the baseline files"
+        return False
+
+    tolerance = float( args[2] ) if len( args ) > 2 else 0.1
+
+    return compare_reports( suite.load_report( args[0] ), suite.load_report( args[1] ), tolerance )
+
+def compare_reports( report, baseline, tolerance = 0.1 ):
+    regressions, changes = suite.compare( report, baseline, tolerance )
+
+    for line in changes:
+        print "Changed: ", line
+
+    for line in regressions:
+        print "Regression: ", line
+
+    print "%d regressions, %d changes" % ( len( regressions ), len( changes ) )
+
+    return not regressions
+
+def run_perft( args ):
+    depth = int( args[0] ) if args else 7
+    name = args[1] if len( args ) > 1 and args[1] != "start" else None
+    verbose = "verbose" in args[2:]
+
+    bot = DunkBot()
+
+    if name is None:
+        black, white, color = START_BLACK, START_WHITE, bot.BLACK
+    else:
+        color = bot.transform_color( dict( positions.POSITIONS )[ name ] )
+        black, white = bot.create_bitboard( positions.load_board( name ) )
+
+    failures = 0
+
+    print "%5s %10s %10s %10s %10s %12s" % ( "depth", "leaves", "expected", "search", "expand", "leaves/s" )
+
+    for current in xrange( 1, depth + 1 ):
+        leaves, seconds = perft.measure( bot, black, white, color, current, "bitboard" )
+        search_leaves, search_seconds = perft.measure( bot, black, white, color, current, "search" )
+
+        # The node tree is much slower, only for the first depths
+        expand_leaves = None
+        if current <= 5:
+            expand_leaves = perft.measure( bot, black, white, color, current, "expand" )[0]
+
+        expected = perft.KNOWN_COUNTS[ current ] if name is None and current < len( perft.KNOWN_COUNTS ) else None
+
+        failed = ( expected is not None and leaves != expected ) or search_leaves != leaves or \
+            ( expand_leaves is not None and expand_leaves != leaves )
+        failures += failed
+
+        print "%5d %10d %10s %10d %10s %12.0f%s" % ( current, leaves, expected if expected is not None else "-",
+            search_leaves, expand_leaves if expand_leaves is not None else "-",
+            leaves / seconds if seconds else 0.0, "  FAILED" if failed else "" )
+
+    print "Search board: %.0f leaves/s at depth %d" % ( search_leaves / search_seconds if search_seconds else 0.0, depth )
+
+    if verbose:
+        own, opp = ( black, white ) if color == bot.BLACK else ( white, black )
+
+        for square, leaves in perft.divide( own, opp, depth ):
+            print "%4s %10d" % ( format_move( square ) if square is not None else "pass", leaves )
+
+    print "Failures: ", failures
+
+    return failures == 0
+
+def run_ponder( args ):
+    depth = int( args[0] ) if args else 5
+    think_time = float( args[1] ) if len( args ) > 1 else 2.0
+
+    boards = [ ( board, color ) for name, board, color in positions.load_positions( "midgame" ) ]
+
+    result = ponder.measure( DunkBot, boards, depth, think_time )
+    count = max( result["boards"], 1 )
+
+    print "Depth %d think time %.1f s boards %d" % ( depth, think_time, result["boards"] )
+    print "Cold response   %.4f s" % ( result["cold"] / count )
+    print "Ponder response %.4f s, hits %d/%d" % ( result["ponder"] / count, result["hits"], result["boards"] )
+    print "Same value      %d/%d" % ( result["same"], result["boards"] )
+
+    return result["same"] == result["boards"]
+
+def run_counts( args ):
+    games = int( args[0] ) if args else 50
+    repeat = 20000
+
+    bot = DunkBot()
+    start = bot.create_board( ( START_BLACK, START_WHITE ) )
+
+    failures = counts.verify_counts( bot, start, games )
+
+    print "Random games %d, wrong counts: %d" % ( games, failures )
+
+    name, board, color = positions.load_positions( "midgame" )[0]
+
+    frame = counts.measure_frame( bot, board, repeat )
+
+    print "Score per frame: scan %.2f us, numpy %.2f us, board state %.2f us" % (
+        1e6 * frame["scan"], 1e6 * frame["numpy"], 1e6 * frame["state"] )
+
+    node = counts.measure_node( bitboard.SearchBoard( *bot.create_bitboard( board ) ), repeat )
+
+    print "Empties per node: popcount %.3f us, kept %.3f us" % ( 1e6 * node["popcount"], 1e6 * node["kept"] )
+
+    return failures == 0
+
+COMMANDS = {
+    "movegen": run_movegen,
+    "expand": run_expand,
+    "memory": run_memory,
+    "evaluation": run_evaluation,
+    "parallel": run_parallel,
+    "ordering": run_ordering,
+    "pvs": run_pvs,
+    "endgame": run_endgame,
+    "book": run_book,
+    "symmetry": run_symmetry,
+    "passes": run_passes,
+    "features": run_features,
+    "patterns": run_patterns,
+    "stats": run_stats,
+    "suite": run_suite,
+    "compare": run_compare,
+    "perft": run_perft,
+    "ponder": run_ponder,
+    "counts": run_counts,
+}
+
+def run( args ):
+    command = args[1] if len( args ) > 1 else "movegen"
+
+    if command not in COMMANDS:
+        print "Usage: runner_benchmark.py [%s] [options]" % "|".join( sorted( COMMANDS ) )
+        return False
+
+    return COMMANDS[ command ]( args[2:] )
+
+if __name__ == "__main__":
+    sys.exit( 0 if run( sys.argv ) else 1 )
+
@@ -0,0 +1,77 @@
+
+import os
+import sys
+from dunk_bot.dunk_bot import DunkBot
+from dunk_bot.book import BookBuilder, OpeningBook, parse_line
+
+# Book file read by runner.py
+BOOK_FILE = os.path.join( os.path.dirname( os.path.abspath(__file__) ), "book.bin" )
+
+def run_lines( args ):
+    lines_file = args[0]
+    book_file = args[1] if len( args ) > 1 else BOOK_FILE
+    max_plies = int( args[2] ) if len( args ) > 2 else None
+
+    builder = BookBuilder()
+
+    with open( lines_file, "r" ) as lines:
+        for number, line in enumerate( lines ):
+            squares = parse_line( line )
+
+            if not squares: continue
+
+            try:
+                builder.add_line( squares, max_plies )
+            except ValueError, e:
+                print "Line %d: %s" % ( number + 1, e )
+                return False
+
+    print "Positions: ", builder.write( book_file )
+
+    return True
+
+def run_self_play( args ):
+    book_file = args[0] if args else BOOK_FILE
+    games = int( args[1] ) if len( args ) > 1 else 100
+    plies = int( args[2] ) if len( args ) > 2 else 12
+    depth = int( args[3] ) if len( args ) > 3 else 6
+
+    bot = DunkBot( max_depth = depth )
+
+    builder = BookBuilder()
+    builder.add_self_play( bot, games, plies )
+
+    print "Positions: ", builder.write( book_file )
+
+    return True
+
+def run_stats( args ):
+    book_file = args[0] if args else BOOK_FILE
+
+    book = OpeningBook( book_file )
+
+    print "Positions: ", book.size
+
+    book.close()
+
+    return True
+
+COMMANDS = {
+    "lines": run_lines,
+    "self-play": run_self_play,
+    "stats": run_stats,
+}
+
+def run( args ):
+    command = args[1] if len( args ) > 1 else None
+
+    if command not in COMMANDS:
+        print "Usage: runner_book.py lines <moves file> [book file] [max plies]"
+        print "       runner_book.py self-play [book file] [games] [plies] [depth]"
+        print "       runner_book.py stats [book file]"
+        return False
+
+    return COMMANDS[ command ]( args[2:] )
+
+if __name__ == "__main__":
+    sys.exit( 0 if run( sys.argv ) else 1 )
@@ -0,0 +1,57 @@
+
+import os
+import socket
+import sys
+import time
+import utils
+import runner
+from dunk_bot import service
+
+# Address of the move server, host:port or a Unix socket path
+SERVICE_ADDRESS = os.environ.get( "DUNKBOT_SERVICE", "%s:%d" % ( service.HOST, service.PORT ) )
+
+# Seconds kept for the reply to come back from the server
+SERVICE_MARGIN = 0.2
+
+def time_left( start ):
+    # Seconds of the move budget not spent yet
+    return max( runner.TIME_BUDGET - runner.TIME_MARGIN - ( time.time() - start ), 0.0 )
+
+def run( args ):
+    start = time.time()
+
+    # Same arguments of runner.py, a board file and a color
+    try:
+        board_file = open( args[1], "r" )
+        color = args[2]
+    except Exception, e:
+        print "Input error"
+        return
+
+    board = board_file.read()
+    board_file.close()
+
+    try:
+        client = service.MoveClient( service.parse_address( SERVICE_ADDRESS ), timeout = max( time_left( start ), SERVICE_MARGIN ) )
+
+        try:
+            reply = client.play( board, color, max( time_left( start ) - SERVICE_MARGIN, 0.0 ) )
+        finally:
+            client.close()
+
+    except ( socket.error, IOError, ValueError ), e:
+        # Without server, or with an error or malformed reply,
+        # the move is searched on this process, with the time
+        # left of the budget
+        print "Service unavailable: ", e
+        runner.run( args, time_left( start ) )
+        return
+
+    move = tuple( reply["move"] )
+
+    print "Selected move: ", move
+
+    utils.write_move( move )
+
+if __name__ == "__main__":
+    run( sys.argv )
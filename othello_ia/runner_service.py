@@ -0,0 +1,30 @@
+
+import sys
+from dunk_bot import service
+from runner import BOOK_FILE
+
+def run( args ):
+    address = service.parse_address( args[1] ) if len( args ) > 1 else ( service.HOST, service.PORT )
+    workers = int( args[2] ) if len( args ) > 2 else 2
+    depth = int( args[3] ) if len( args ) > 3 else 64
+
+    options = { "max_depth": depth }
+
+    if isinstance( address, tuple ):
+        server = service.MoveServer( address, workers, options, BOOK_FILE )
+    else:
+        server = service.UnixMoveServer( address, workers, options, BOOK_FILE )
+
+    print "Serving on %s with %d workers" % ( address, workers )
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+    return True
+
+if __name__ == "__main__":
+    sys.exit( 0 if run( sys.argv ) else 1 )
@@ -0,0 +1,104 @@
+
+import os
+import sys
+import time
+from dunk_bot.dunk_bot import DunkBot
+from dunk_bot import training
+from dunk_bot.evaluation import FeatureEvaluator, save_weights
+from dunk_bot.patterns import PatternEvaluator, save_pattern_weights
+
+# Dataset of the self-play games
+DATASET_FILE = os.path.join( os.path.dirname( os.path.abspath(__file__) ), "dataset.bin" )
+
+def run_generate( args ):
+    dataset_file = args[0] if args else DATASET_FILE
+    games = int( args[1] ) if len( args ) > 1 else 100
+    depth = int( args[2] ) if len( args ) > 2 else 2
+    workers = int( args[3] ) if len( args ) > 3 else 2
+
+    options = { "max_depth": depth, "endgame_empties": 8 }
+
+    def report( game, positions ):
+        if game % 10 == 0 or game == games:
+            print "Games %d/%d, positions %d" % ( game, games, positions )
+
+    positions, seconds = training.generate( dataset_file, DunkBot, options, games, workers, callback = report )
+
+    print "Positions: %d in %.2f s, %.1f positions/s" % ( positions, seconds, positions / seconds )
+
+    return True
+
+def run_fit( args ):
+    if len( args ) < 2:
+        print "Missing the dataset and the weight file"
+        return False
+
+    dataset_file, weight_file = args[0], args[1]
+    target = args[2] if len( args ) > 2 else "features"
+
+    data = training.load_dataset( dataset_file )
+
+    if not len( data ):
+        print "Empty dataset: %s" % dataset_file
+        return False
+
+    train, validation = training.split_dataset( data )
+
+    print "Positions: %d training, %d validation" % ( len( train ), len( validation ) )
+
+    start = time.time()
+
+    if target == "features":
+        weights = training.fit_features( train )
+        evaluator = FeatureEvaluator( weights )
+        save_weights( weights, weight_file )
+
+    elif target == "patterns":
+        weights = training.fit_patterns( train )
+        evaluator = PatternEvaluator( weights = weights )
+        save_pattern_weights( weights, weight_file )
+
+    else:
+        print "Unknown target: %s" % target
+        return False
+
+    seconds = time.time() - start
+
+    print "Fit in %.2f s, %.1f positions/s" % ( seconds, len( train ) / seconds )
+    print "Error on discs: %.2f training, %.2f validation" % (
+        training.prediction_error( evaluator, train ), training.prediction_error( evaluator, validation ) )
+
+    return True
+
+def run_stats( args ):
+    dataset_file = args[0] if args else DATASET_FILE
+
+    data = training.load_dataset( dataset_file )
+
+    print "Positions: ", len( data )
+
+    if len( data ):
+        print "Black to move: %.1f%%" % ( 100.0 * ( data["black_to_move"] == 1 ).mean() )
+        print "Mean score: %.2f" % data["score"].mean()
+
+    return True
+
+COMMANDS = {
+    "generate": run_generate,
+    "fit": run_fit,
+    "stats": run_stats,
+}
+
+def run( args ):
+    command = args[1] if len( args ) > 1 else None
+
+    if command not in COMMANDS:
+        print "Usage: runner_training.py generate [dataset file] [games] [depth] [workers]"
+        print "       runner_training.py fit <dataset file> <weight file> [features|patterns]"
+        print "       runner_training.py stats [dataset file]"
+        return False
+
+    return COMMANDS[ command ]( args[2:] )
+
+if __name__ == "__main__":
+    sys.exit( 0 if run( sys.argv ) else 1 )
@@ -18,8 +18,14 @@ def run( args ):
     # Create the BOT
     bot = DunkBot( max_depth = 5 )
 
+    # Options: full, draw the whole screen on every frame,
+    # noidle, keep ticking when nothing changed, and
+    # noponder, do not search on the human turn
+    render_mode = OthelloGame.RENDER_FULL if "full" in args[1:] else OthelloGame.RENDER_DIRTY
+
     # Start the Video Game
-    video_game = OthelloGame( board, bot, bot.transform_color( color ) )
+    video_game = OthelloGame( board, bot, bot.transform_color( color ),
+        ponder = "noponder" not in args[1:], render_mode = render_mode, idle = "noidle" not in args[1:] )
     video_game.start()
 
 if __name__ == "__main__":
@@ -5,6 +5,8 @@ import os
 import time
 import threading
 
+from dunk_bot.ponder import Ponderer
+
 class OthelloGame(object):
 
   # Constant Declarations
@@ -22,7 +24,22 @@ class OthelloGame(object):
     DRAW_GAME:  "Draw game!"
   }
 
-  def __init__(self, board, bot, human_color):
+  # Render modes
+  RENDER_FULL  = "full"
+  RENDER_DIRTY = "dirty"
+
+  # Colors
+  BACKGROUND_COLOR = (55,117,177)
+  GRID_COLOR       = (235, 248, 236, 1)
+  WHITE_COLOR      = (255,255,255)
+  BLACK_COLOR      = (0,0,0)
+  HINT_COLOR       = (147,147,147)
+  TEXT_COLOR       = (255,255,255)
+
+  # Content of a square of the board
+  HINT = "H"
+
+  def __init__(self, board, bot, human_color, ponder = True, render_mode = RENDER_DIRTY, idle = True):
     '''
     VideoGame Constructor
 
@@ -30,6 +47,18 @@ class OthelloGame(object):
       board       : Base board used to initilize the video game
       bot         : Bot used by the game
       human_color : Color of the human player
+      ponder      : Search the bot replies while the human
+                    thinks, see dunk_bot.ponder
+      render_mode : RENDER_FULL, draw the whole screen on
+                    every frame, or RENDER_DIRTY, blit cached
+                    surfaces only on the changed squares
+      idle        : With RENDER_DIRTY, wait for the next event
+                    instead of ticking when nothing changed
+
+    Defaults:
+      ponder      : True
+      render_mode : RENDER_DIRTY
+      idle        : True
     '''
 
     # Pygame Settings
@@ -45,6 +74,9 @@ class OthelloGame(object):
     # Game Settings
     self.board = board
     self.bot = bot
+
+    # Disc counts kept on each movement
+    self.board_state = self.bot.create_board_state( self.board )
     self.last_bot_move = self.bot.NOPE_MOVE
 
     self.human_color = human_color
@@ -61,21 +93,53 @@ class OthelloGame(object):
     # Bot Executor
     self.bot_thread = None
 
+    # Pondering on the human turn
+    self.ponderer = Ponderer( self.bot, self.bot_color ) if ponder else None
+
+    # Rendering
+    self.render_mode = render_mode
+    self.idle = idle and render_mode == self.RENDER_DIRTY
+
+    # Cached surfaces of the dirty rendering, see
+    # create_surfaces
+    self.background = None
+    self.sprites = None
+    self.labels = {}
+
+    # What is on the screen, None before the first frame
+    self.drawn_key = None
+    self.drawn_squares = None
+    self.drawn_texts = None
+
+    # Frame counters
+    self.frames = 0
+    self.drawn_frames = 0
+    self.frame_time = 0.0
+
   # ################################################
   # Draw Functions
 
-  def draw_board(self):
+  def draw_board(self, surface = None):
     '''
     Draw the board of the game
+
+    Params:
+      surface : Surface where the board is drawn
+
+    Defaults:
+      surface : None, the display
     '''
 
+    if surface is None:
+      surface = self.gameDisplay
+
     for x in xrange(0,8):
       for y in xrange(0,8):
         x_pos = (x * self.place_size) + self.offset_x
         y_pos = (y * self.place_size) + self.offset_y
 
         place = pygame.Rect( (x_pos, y_pos), (self.place_size, self.place_size) )
-        pygame.draw.rect( self.gameDisplay, (235, 248, 236, 1), place, 1 )
+        pygame.draw.rect( surface, self.GRID_COLOR, place, 1 )
 
   def draw_board_pieces(self):
     '''
@@ -88,9 +152,9 @@ class OthelloGame(object):
       y = (idx / 8) * self.place_size + self.offset_y + self.place_size / 2
 
       if place == self.bot.WHITE:
-        pygame.draw.circle( self.gameDisplay, (255,255,255), ( x, y ), 30 )
+        pygame.draw.circle( self.gameDisplay, self.WHITE_COLOR, ( x, y ), 30 )
       elif place == self.bot.BLACK:
-        pygame.draw.circle( self.gameDisplay, (0,0,0), ( x, y ), 30 )
+        pygame.draw.circle( self.gameDisplay, self.BLACK_COLOR, ( x, y ), 30 )
 
   def draw_possible_moves(self):
     '''
@@ -102,7 +166,7 @@ class OthelloGame(object):
         x = position[0] * self.place_size + self.offset_x + self.place_size / 2
         y = position[1] * self.place_size + self.offset_y + self.place_size / 2
 
-        pygame.draw.circle( self.gameDisplay, (147,147,147), ( x, y ), 30 )
+        pygame.draw.circle( self.gameDisplay, self.HINT_COLOR, ( x, y ), 30 )
 
   def draw_text(self, text, position):
     '''
@@ -113,7 +177,7 @@ class OthelloGame(object):
       position : Position of the text
     '''
 
-    label = self.text_font.render(text, 1, (255,255,255))
+    label = self.text_font.render(text, 1, self.TEXT_COLOR)
     label_rect = label.get_rect()
     label_rect.topleft = position
 
@@ -125,18 +189,231 @@ class OthelloGame(object):
     the current player
     '''
 
-    score_black, score_white = self.bot.count_board_score( self.board )
+    for text, position in self.get_messages():
+      self.draw_text( text, position )
+
+  def get_messages(self):
+    '''
+    List the texts of the messages
+
+    Return:
+      List of tuples ( text, position )
+    '''
 
-    self.draw_text("Current Score", (20, 10))
-    self.draw_text("WHITE: %d" % score_white, (20, 30))
-    self.draw_text("BLACK: %d" % score_black, (20, 45))
+    score_black, score_white = self.bot.count_board_score( self.board, self.board_state )
 
     message_position = ( self.size[0] - 120, 30 )
 
     if self.end_score:
-      self.draw_text( self.MESSAGES[ self.validate_score(score_black, score_white) ], message_position )
+      message = self.MESSAGES[ self.validate_score(score_black, score_white) ]
     else:
-      self.draw_text( self.MESSAGES[ self.state ], message_position )
+      message = self.MESSAGES[ self.state ]
+
+    return [
+      ( "Current Score", (20, 10) ),
+      ( "WHITE: %d" % score_white, (20, 30) ),
+      ( "BLACK: %d" % score_black, (20, 45) ),
+      ( message, message_position )
+    ]
+
+  # ################################################
+  # Render Functions
+
+  def create_surfaces(self):
+    '''
+    Create the cached surfaces of the dirty rendering:
+    the background with the board, and a sprite of a
+    square for each content
+    '''
+
+    self.background = pygame.Surface( self.size ).convert()
+    self.background.fill( self.BACKGROUND_COLOR )
+    self.draw_board( self.background )
+
+    contents = (
+      ( self.bot.EMPTY, None ),
+      ( self.bot.WHITE, self.WHITE_COLOR ),
+      ( self.bot.BLACK, self.BLACK_COLOR ),
+      ( self.HINT, self.HINT_COLOR )
+    )
+
+    self.sprites = {}
+
+    for content, color in contents:
+      sprite = pygame.Surface( ( self.place_size, self.place_size ) ).convert()
+      sprite.fill( self.BACKGROUND_COLOR )
+      pygame.draw.rect( sprite, self.GRID_COLOR, sprite.get_rect(), 1 )
+
+      if color is not None:
+        pygame.draw.circle( sprite, color, ( self.place_size / 2, self.place_size / 2 ), 30 )
+
+      self.sprites[ content ] = sprite
+
+    self.labels = {}
+
+  def get_label(self, text):
+    '''
+    Rendered surface of a text, cached since the
+    game only shows a few different texts
+
+    Params:
+      text : Text of the label
+
+    Return:
+      Surface of the label
+    '''
+
+    label = self.labels.get( text )
+
+    if label is None:
+      label = self.text_font.render( text, 1, self.TEXT_COLOR )
+      self.labels[ text ] = label
+
+    return label
+
+  def get_squares(self):
+    '''
+    Content of each square on the screen, a piece or
+    a possible movement of the human
+
+    Return:
+      List of the 64 contents
+    '''
+
+    squares = self.board.tolist()
+
+    if self.state == self.HUMAN_MOVE and not self.end_score:
+      for x, y in self.human_moves:
+        squares[ x + y * 8 ] = self.HINT
+
+    return squares
+
+  def render_full(self):
+    '''
+    Draw the whole screen
+
+    Return:
+      True, the screen is always drawn
+    '''
+
+    self.gameDisplay.fill( self.BACKGROUND_COLOR )
+    self.draw_board()
+    self.draw_board_pieces()
+    self.draw_possible_moves()
+    self.draw_messages()
+
+    pygame.display.update()
+
+    return True
+
+  def render_dirty(self):
+    '''
+    Draw only the squares and the messages changed
+    since the last frame
+
+    Return:
+      True if anything was drawn
+    '''
+
+    key = ( self.board.tostring(), np.asarray( self.human_moves ).tostring(), self.state, self.end_score )
+
+    if key == self.drawn_key:
+      return False
+
+    rects = []
+
+    if self.drawn_key is None:
+      self.gameDisplay.blit( self.background, ( 0, 0 ) )
+      self.drawn_squares = [ None ] * 64
+      self.drawn_texts = None
+      rects.append( self.gameDisplay.get_rect() )
+
+    self.drawn_key = key
+
+    for idx, content in enumerate( self.get_squares() ):
+      if content == self.drawn_squares[ idx ]: continue
+
+      position = ( (idx % 8) * self.place_size + self.offset_x, (idx / 8) * self.place_size + self.offset_y )
+
+      rects.append( self.gameDisplay.blit( self.sprites[ content ], position ) )
+      self.drawn_squares[ idx ] = content
+
+    # The labels overlap, so the header is
+    # drawn again as a whole
+    texts = self.get_messages()
+
+    if texts != self.drawn_texts:
+      header = pygame.Rect( 0, 0, self.size[0], self.offset_y )
+
+      self.gameDisplay.blit( self.background, header, header )
+
+      for text, position in texts:
+        self.gameDisplay.blit( self.get_label( text ), position )
+
+      rects.append( header )
+      self.drawn_texts = texts
+
+    pygame.display.update( rects )
+
+    return True
+
+  def render(self):
+    '''
+    Draw a frame with the render mode, counting
+    its time
+
+    Return:
+      True if anything was drawn
+    '''
+
+    start = time.time()
+
+    if self.render_mode == self.RENDER_FULL:
+      drawn = self.render_full()
+    else:
+      drawn = self.render_dirty()
+
+    self.frames += 1
+
+    if drawn:
+      self.drawn_frames += 1
+      self.frame_time += time.time() - start
+
+    return drawn
+
+  def frame_report(self):
+    '''
+    Text with the frame counters
+
+    Return:
+      String with the frames, the drawn frames and
+      the mean time of a drawn frame
+    '''
+
+    return "Frames %d drawn %d mean frame %.3f ms" % (
+      self.frames, self.drawn_frames, 1000.0 * self.frame_time / max( self.drawn_frames, 1 ) )
+
+  def wait_frame(self, drawn):
+    '''
+    Wait for the next frame. When idle and nothing was
+    drawn, sleep until the next event, the bot thread
+    posts one when it is done
+
+    Params:
+      drawn : True if the frame drew anything
+
+    Return:
+      List of the events of the next frame, in
+      the order they happened
+    '''
+
+    if self.idle and not drawn:
+      # The event that woke the loop is the first one
+      return [ pygame.event.wait() ] + pygame.event.get()
+
+    self.clock.tick( self.clock_hz )
+
+    return pygame.event.get()
 
   # ################################################
   # Logic Functions
@@ -197,9 +474,19 @@ class OthelloGame(object):
       else:
         self.no_move_flag = False
 
-        self.last_bot_move = self.bot.play( self.board, self.bot_color )
+        move = None
+
+        if self.ponderer is not None:
+          move, report = self.ponderer.take( self.board )
+
+        if move is None:
+          move = self.bot.play( self.board, self.bot_color )
+        else:
+          print "Ponder hit"
+
+        self.last_bot_move = move
 
-        self.bot.set_color_position( self.board, self.last_bot_move, self.bot_color )
+        self.bot.set_color_position( self.board, self.last_bot_move, self.bot_color, self.board_state )
 
       # Change player to human
       self.state = self.HUMAN_MOVE
@@ -208,6 +495,33 @@ class OthelloGame(object):
       # Clean the thead holder
       self.bot_thread = None
 
+      # Wake up the idle game loop
+      if self.idle:
+        try:
+          pygame.event.post( pygame.event.Event( pygame.USEREVENT ) )
+        except pygame.error:
+          pass
+
+  def listen_ponder(self):
+    '''
+    Start pondering the bot replies on the human
+    turn, once the bot thread is done
+    '''
+
+    if self.ponderer is None or self.end_score: return
+
+    if self.state == self.HUMAN_MOVE and self.bot_thread is None:
+      self.ponderer.start( self.board )
+
+  def stop_pondering(self):
+    '''
+    Abort the pondering and wait for it, so the
+    bot and the board are free to change
+    '''
+
+    if self.ponderer is not None:
+      self.ponderer.stop()
+
   def update_human_movements(self):
     '''
     Update the current available movevents for
@@ -248,7 +562,9 @@ class OthelloGame(object):
 
         if click_position.tolist() in self.human_moves.tolist():
 
-          self.bot.set_color_position( self.board, click_position, self.human_color )
+          self.stop_pondering()
+
+          self.bot.set_color_position( self.board, click_position, self.human_color, self.board_state )
           self.state = self.BOT_MOVE
 
   def start(self):
@@ -260,7 +576,7 @@ class OthelloGame(object):
     pygame.font.init()
 
     self.gameDisplay = pygame.display.set_mode( self.size )
-    self.gameDisplay.fill( (55,117,177) )
+    self.gameDisplay.fill( self.BACKGROUND_COLOR )
 
     pygame.display.set_caption("Othello VideoGame")
 
@@ -268,8 +584,13 @@ class OthelloGame(object):
 
     self.text_font = pygame.font.Font("%s/assets/ubuntumono.ttf" % os.path.dirname(os.path.abspath(__file__)), 18)
 
+    if self.render_mode == self.RENDER_DIRTY:
+      self.create_surfaces()
+
+    events = pygame.event.get()
+
     while self.ok:
-      for event in pygame.event.get():
+      for event in events:
         if event.type == pygame.QUIT:
           self.ok = False
 
@@ -277,40 +598,39 @@ class OthelloGame(object):
         # its turn
         self.process_event( event )
 
-      # try:
-
       # Display update
-      self.gameDisplay.fill( (55,117,177) )
-      self.draw_board()
-      self.draw_board_pieces()
-      self.draw_possible_moves()
-      self.draw_messages()
+      drawn = self.render()
 
       # Execute the bot movevent if is
-      # its turn
+      # its turn, or ponder on the human turn
       self.listen_bot_movement()
-
-      pygame.display.update()
-      self.clock.tick( self.clock_hz )
+      self.listen_ponder()
 
       if self.end_score: break
 
+      # No frame to wait for after the quit event
+      if self.ok:
+        events = self.wait_frame( drawn )
+
+    self.stop_pondering()
+
     if self.end_score:
       print "End game"
 
+    events = pygame.event.get()
+
     while self.end_score:
 
-      for event in pygame.event.get():
+      for event in events:
         if event.type == pygame.QUIT:
           self.end_score = False
 
-      self.gameDisplay.fill( (55,117,177) )
-      self.draw_board()
-      self.draw_board_pieces()
-      self.draw_messages()
+      drawn = self.render()
+
+      if self.end_score:
+        events = self.wait_frame( drawn )
 
-      pygame.display.update()
-      self.clock.tick( self.clock_hz )
+    print self.frame_report()
 
     pygame.quit()
 